@@ -0,0 +1,55 @@
+"""
+bench_aggregate.py — aggregate_records() against the previous three-pass
+pipeline (parse, then a snapshot pass and a parties pass that each re-find
+winners with max()), on a real-sized and a 10× synthetic payload.
+
+Run with: python benchmarks/bench_aggregate.py
+"""
+
+import timeit
+
+from synthetic import REAL_CANDIDATES, synthetic_payload
+
+from scraper import aggregate_records, parse_candidates_json
+
+REPEAT = 7
+NUMBER = 3
+
+
+def best_ms(fn) -> float:
+    return min(timeit.repeat(fn, number=NUMBER, repeat=REPEAT)) / NUMBER * 1000
+
+
+def three_pass(payload: list[dict]) -> tuple:
+    constituencies = parse_candidates_json(payload)
+    constituencies.sort(key=lambda c: (c["province"], c["district"], c["name"]))
+
+    tally: dict[str, int] = {}
+    for c in constituencies:
+        if c["status"] == "DECLARED":
+            pid = max(c["candidates"], key=lambda x: x["votes"])["partyId"]
+            tally[pid] = tally.get(pid, 0) + 1
+
+    seats: dict[str, int] = {}
+    votes: dict[str, int] = {}
+    for c in constituencies:
+        for cand in c["candidates"]:
+            votes[cand["partyId"]] = votes.get(cand["partyId"], 0) + cand["votes"]
+        if c["status"] == "DECLARED":
+            pid = max(c["candidates"], key=lambda x: x["votes"])["partyId"]
+            seats[pid] = seats.get(pid, 0) + 1
+    return constituencies, tally, seats, votes
+
+
+def main() -> None:
+    print(f"{'records':>8}  {'3-pass':>10}  {'fused':>10}  {'change':>7}")
+    for scale in (1, 10):
+        payload = synthetic_payload(REAL_CANDIDATES * scale)
+        old_ms = best_ms(lambda: three_pass(payload))
+        new_ms = best_ms(lambda: aggregate_records(payload))
+        change = (new_ms - old_ms) / old_ms * 100
+        print(f"{len(payload):>8}  {old_ms:>8.2f}ms  {new_ms:>8.2f}ms  {change:>+6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+bench_loop_lag.py — Event-loop lag during one scrape cycle (aggregate +
+SQLite write + read-back), run inline on the loop versus on the parse thread
+and the writer thread as main._scraper_loop does.
+
+Run with: python benchmarks/bench_loop_lag.py
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from synthetic import advance, synthetic_payload
+
+from broadcast import StateFeed
+from database import Database, init_db
+from main import _persist_cycle
+from scraper import _aggregate_cycle, reset_fetch_state, run_parse
+from tests.loop_lag import LoopLagProbe
+
+SCALES = (1, 10)
+
+
+async def _cycle(db: Database, raw: list[dict], writer: ThreadPoolExecutor | None) -> None:
+    if writer is None:
+        aggregate, _ = _aggregate_cycle(raw)
+        _persist_cycle(db, aggregate, StateFeed())
+        return
+    aggregate, _ = await run_parse(_aggregate_cycle, raw)
+    await asyncio.get_running_loop().run_in_executor(writer, _persist_cycle, db, aggregate, StateFeed())
+
+
+async def _measure(raw: list[dict], offloaded: bool) -> LoopLagProbe:
+    reset_fetch_state()
+    db = Database(init_db(":memory:"))
+    writer = ThreadPoolExecutor(max_workers=1) if offloaded else None
+    await _cycle(db, raw, writer)  # first cycle inserts everything
+    async with LoopLagProbe(interval=0.001) as probe:
+        await _cycle(db, advance(raw), writer)
+    if writer:
+        writer.shutdown()
+    db.close()
+    return probe
+
+
+async def main() -> None:
+    print(f"{'candidates':>10}  {'mode':<10}  {'p50 lag':>9}  {'p99 lag':>9}  {'max lag':>9}")
+    for scale in SCALES:
+        raw = synthetic_payload(3406 * scale)
+        for offloaded in (False, True):
+            probe = await _measure(raw, offloaded)
+            print(
+                f"{len(raw):>10,}  {'offloaded' if offloaded else 'inline':<10}  "
+                f"{probe.percentile(50) * 1000:>7.1f}ms  {probe.percentile(99) * 1000:>7.1f}ms  "
+                f"{probe.max_lag * 1000:>7.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+"""
+bench_memory.py — Memory profile of the long-running worker's parse path.
+
+Replays CYCLES scrape cycles (5% of candidates gaining votes each time)
+through the same stages as worker.run_loop: ChangeTracker.update, the
+incremental aggregate_records() and JSON serialisation of constituencies.json.
+Each model variant runs in its own process:
+
+  plain        the models.py classes rebuilt without __slots__ (a per-instance
+               __dict__) and a fresh CandidateBio per candidate per cycle —
+               the baseline
+  slotted      models.py as shipped: slotted classes, bios interned per
+               CandidateID
+
+Reports, per variant:
+
+  retained     heap still held between cycles (tracker + parser state)
+  blocks       live allocated blocks between cycles (sys.getallocatedblocks)
+  cycle peak   highest traced heap during a cycle
+  max RSS      process peak resident set size (separate, untraced run)
+
+Run with: python benchmarks/bench_memory.py
+"""
+
+import gc
+import json
+import resource
+import subprocess
+import sys
+import tracemalloc
+
+from synthetic import advance, synthetic_payload
+
+import models
+import scraper
+
+CYCLES = 20
+VARIANTS = ("plain", "slotted")
+
+
+def _plain(cls: type) -> type:
+    """`cls` without __slots__: the same methods on a per-instance __dict__."""
+    namespace = {
+        name: value for name, value in vars(cls).items()
+        if name != "__slots__" and name not in cls.__slots__
+    }
+    return type(cls.__name__, (), namespace)
+
+
+def use_plain_models() -> None:
+    """Swap the baseline models into models.py and the scraper's imports."""
+    plain_bio = _plain(models.CandidateBio)
+    models.CandidateBio = plain_bio
+    # Globals, so restamped() and json_default() see the plain classes too.
+    models.Candidate = scraper.Candidate = _plain(models.Candidate)
+    models.Constituency = scraper.Constituency = _plain(models.Constituency)
+    scraper.intern_bio = lambda candidate_id, values: plain_bio(*values)
+
+
+def replay(traced: bool) -> dict[str, float]:
+    tracker = scraper.ChangeTracker()
+    parser = scraper.IncrementalParser()
+    payload = synthetic_payload()
+    peak = 0
+    if traced:
+        tracemalloc.start()
+    for cycle in range(CYCLES):
+        tracker.update(payload)
+        aggregate = scraper.aggregate_records(payload, parser=parser)
+        body = json.dumps(aggregate["constituencies"], ensure_ascii=False, default=models.json_default)
+        del aggregate, body
+        payload = advance(payload, seed=cycle)
+        if traced:
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+    del payload
+    gc.collect()
+    result = {"blocks": sys.getallocatedblocks()}
+    if traced:
+        result["retained"] = tracemalloc.get_traced_memory()[0]
+        result["peak"] = peak
+        tracemalloc.stop()
+    # keep the state alive until measured
+    result["_state"] = len(parser._cache) + len(tracker._records)
+    return result
+
+
+def run(variant: str, rss: bool) -> dict[str, float]:
+    """One variant in this process; with `rss`, only its peak RSS."""
+    if variant == "plain":
+        use_plain_models()
+    if rss:
+        replay(traced=False)
+        return {"rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+    baseline_blocks = sys.getallocatedblocks()
+    traced = replay(traced=True)
+    return {
+        "retained": traced["retained"],
+        "blocks":   traced["blocks"] - baseline_blocks,
+        "peak":     traced["peak"],
+    }
+
+
+def _child(variant: str, *flags: str) -> dict[str, float]:
+    out = subprocess.check_output([sys.executable, __file__, "--run", variant, *flags])
+    return json.loads(out)
+
+
+def main() -> None:
+    if sys.argv[1:2] == ["--run"]:
+        print(json.dumps(run(sys.argv[2], rss="--rss" in sys.argv[3:])))
+        return
+    results = {v: {**_child(v), **_child(v, "--rss")} for v in VARIANTS}
+    rows = (
+        ("retained",   "retained", 1e6,  "MB"),
+        ("blocks",     "blocks",   1e3,  "k "),
+        ("cycle peak", "peak",     1e6,  "MB"),
+        ("max RSS",    "rss_kib",  1024, "MB"),
+    )
+    print(f"cycles       {CYCLES}")
+    print(f"{'':<12} {'plain':>11} {'slotted':>11} {'change':>8}")
+    for label, key, scale, unit in rows:
+        before, after = results["plain"][key], results["slotted"][key]
+        change = (after - before) / before * 100
+        print(f"{label:<12} {before / scale:>8.2f} {unit} {after / scale:>8.2f} {unit} {change:>+7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+bench_parse.py — parse_candidates_json() with generic vs schema-specialised
+field extraction, on a real-sized (3,406 records) and a 10× synthetic payload.
+
+Both variants are warmed up first, then timed in alternating rounds so drift
+(frequency scaling, other load) hits them equally. Reports the median of
+ROUNDS rounds and the interquartile range of the per-round change; a change
+whose IQR straddles 0% is noise.
+
+Run with: python benchmarks/bench_parse.py
+"""
+
+import gc
+import statistics
+import timeit
+
+from synthetic import REAL_CANDIDATES, synthetic_payload
+
+from scraper import GENERIC_EXTRACTOR, extractor_for, parse_candidates_json
+
+WARMUP = 3
+ROUNDS = 31
+NUMBER = 3
+
+
+def round_ms(fn) -> float:
+    return timeit.timeit(fn, number=NUMBER) / NUMBER * 1000
+
+
+def main() -> None:
+    print(f"{'records':>8}  {'generic':>10}  {'specialised':>12}  {'change':>7}  {'IQR':>16}")
+    for scale in (1, 10):
+        payload = synthetic_payload(REAL_CANDIDATES * scale)
+        specialised = extractor_for(payload)
+        generic = lambda: parse_candidates_json(payload, extractor=GENERIC_EXTRACTOR)  # noqa: E731
+        special = lambda: parse_candidates_json(payload, extractor=specialised)  # noqa: E731
+        for _ in range(WARMUP):
+            generic()
+            special()
+        gc.collect()
+        generic_ms: list[float] = []
+        special_ms: list[float] = []
+        for i in range(ROUNDS):
+            # Alternate which variant goes first in a round.
+            pair = (generic_ms, generic), (special_ms, special)
+            for times, fn in (pair if i % 2 == 0 else pair[::-1]):
+                times.append(round_ms(fn))
+        changes = [(s - g) / g * 100 for g, s in zip(generic_ms, special_ms)]
+        q1, _, q3 = statistics.quantiles(changes, n=4)
+        print(
+            f"{len(payload):>8}  {statistics.median(generic_ms):>8.2f}ms  "
+            f"{statistics.median(special_ms):>10.2f}ms  {statistics.median(changes):>+6.1f}%  "
+            f"{q1:>+6.1f}% … {q3:>+6.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+bench_queries.py — SQL statements issued and latency of the read path
+(get_constituencies, get_parties, get_provinces, get_candidates — first
+page, and half-way down the listing by OFFSET and by cursor) against a database holding
+a real-sized synthetic result set.
+
+Run with: python benchmarks/bench_queries.py
+"""
+
+import timeit
+
+from synthetic import synthetic_payload
+
+from database import (
+    get_candidates,
+    get_constituencies,
+    get_parties,
+    get_provinces,
+    init_db,
+    save_constituency_results,
+)
+from scraper import aggregate_records, map_party_key
+
+REPEAT = 5
+NUMBER = 5
+
+
+def populated_db(n_candidates: int = 3406):
+    conn = init_db(":memory:")
+    rows = []
+    for c in aggregate_records(synthetic_payload(n_candidates))["constituencies"]:
+        c = c.to_dict()
+        rows.append({
+            "code":         c["code"],
+            "name":         c["name"],
+            "province":     c["province"],
+            "district":     c["district"],
+            "status":       c["status"],
+            "last_updated": c["lastUpdated"],
+            "candidates": [
+                {
+                    "candidateId": cand["candidateId"],
+                    "name":        cand["name"],
+                    "party":       map_party_key(cand["partyName"]),
+                    "votes":       cand["votes"],
+                }
+                for cand in c["candidates"]
+            ],
+        })
+    save_constituency_results(conn, rows)
+    return conn
+
+
+def count_statements(conn, fn) -> int:
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+    try:
+        fn()
+    finally:
+        conn.set_trace_callback(None)
+    return sum(1 for s in statements if s.lstrip().upper().startswith(("SELECT", "WITH")))
+
+
+def main() -> None:
+    print(f"{'candidates':>10}  {'call':<20}  {'queries':>7}  {'latency':>10}")
+    for n_candidates in (3406, 34060):
+        conn = populated_db(n_candidates)
+        deep_page = n_candidates // 50 // 2
+        cursor = None
+        for _ in range(deep_page - 1):
+            cursor = get_candidates(conn, page_size=50, cursor=cursor)["next"]
+        calls = {
+            "get_constituencies": lambda: get_constituencies(conn),
+            "get_parties":        lambda: get_parties(conn),
+            "get_provinces":      lambda: get_provinces(conn),
+            "get_candidates":     lambda: get_candidates(conn, page=1, page_size=50),
+            f"  page {deep_page} offset": lambda: get_candidates(conn, page=deep_page, page_size=50),
+            f"  page {deep_page} cursor": lambda: get_candidates(conn, cursor=cursor, page_size=50),
+        }
+        for name, fn in calls.items():
+            queries = count_statements(conn, fn)
+            ms = min(timeit.repeat(fn, number=NUMBER, repeat=REPEAT)) / NUMBER * 1000
+            print(f"{n_candidates:>10,}  {name:<20}  {queries:>7}  {ms:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
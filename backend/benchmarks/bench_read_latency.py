@@ -0,0 +1,121 @@
+"""
+bench_read_latency.py — /api read latency while scrape cycles are writing.
+
+Compares the old layout (one shared connection, rollback journal, reads and
+writes serialised on it) with Database (WAL, writer + read-only pool). A
+writer thread replays scrape cycles back to back; reader threads time
+get_parties / get_candidates calls, once idle and once under writes.
+
+Run with: python benchmarks/bench_read_latency.py
+"""
+
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from synthetic import advance, synthetic_payload
+
+from database import Database, get_candidates, get_parties, save_constituency_results
+from scraper import aggregate_records
+
+READERS = 4
+DURATION_S = 3.0
+
+
+class SharedConnection:
+    """Pre-WAL layout: a single connection for everything, behind a lock."""
+
+    def __init__(self, path: str) -> None:
+        self.writer = sqlite3.connect(path, check_same_thread=False)
+        self.writer.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        database = Database.open(path, readers=0)
+        database.writer.execute("PRAGMA journal_mode = DELETE")
+        database.close()
+
+    @contextmanager
+    def reader(self):
+        with self._lock:
+            yield self.writer
+
+    @contextmanager
+    def writing(self):
+        with self._lock:
+            yield self.writer
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def _cycles() -> list[list[dict]]:
+    payload = synthetic_payload()
+    cycles = []
+    for cycle in range(6):
+        cycles.append([c.to_dict() for c in aggregate_records(payload)["constituencies"]])
+        payload = advance(payload, seed=cycle)
+    return cycles
+
+
+def _measure(db, cycles, *, writing: bool) -> list[float]:
+    stop = threading.Event()
+    latencies: list[float] = []
+
+    def read() -> None:
+        i = 0
+        while not stop.is_set():
+            started = time.perf_counter()
+            with db.reader() as conn:
+                if i % 2:
+                    get_parties(conn)
+                else:
+                    get_candidates(conn, page=i % 20 + 1)
+            latencies.append((time.perf_counter() - started) * 1000)
+            i += 1
+
+    def write() -> None:
+        i = 0
+        while not stop.is_set():
+            with db.writing() as conn:
+                save_constituency_results(conn, cycles[i % len(cycles)])
+            i += 1
+
+    threads = [threading.Thread(target=read) for _ in range(READERS)]
+    if writing:
+        threads.append(threading.Thread(target=write))
+    for t in threads:
+        t.start()
+    time.sleep(DURATION_S)
+    stop.set()
+    for t in threads:
+        t.join()
+    return latencies
+
+
+def _row(label: str, latencies: list[float]) -> str:
+    q = statistics.quantiles(latencies, n=100)
+    return f"{label:<26}  {len(latencies):>7,}  {q[49]:>8.2f}ms  {q[98]:>8.2f}ms  {max(latencies):>8.2f}ms"
+
+
+def main() -> None:
+    cycles = _cycles()
+    print(f"{'layout / load':<26}  {'reads':>7}  {'p50':>10}  {'p99':>10}  {'max':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, factory in (
+            ("shared connection", SharedConnection),
+            ("WAL + reader pool", lambda path: Database.open(path, readers=READERS)),
+        ):
+            path = str(Path(tmp) / f"{name.split()[0]}.db")
+            db = factory(path)
+            with db.writing() as conn:
+                save_constituency_results(conn, cycles[0])
+            print(_row(f"{name}, idle", _measure(db, cycles, writing=False)))
+            print(_row(f"{name}, writing", _measure(db, cycles, writing=True)))
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+bench_response_cache.py — Cost of serving the whole-table endpoints: query
+plus JSON encode on every request (the old handlers) against a
+ResponseCache hit, and the one-off cost of compressing each body.
+
+Run with: python benchmarks/bench_response_cache.py
+"""
+
+import gzip
+import timeit
+
+from synthetic import REAL_CANDIDATES, synthetic_payload
+
+from database import Database, get_constituencies, get_parties, init_db, save_constituency_results
+from response_cache import ResponseCache, brotli, encode_json
+from scraper import aggregate_records
+
+REPEAT = 5
+NUMBER = 20
+
+
+def _us(fn) -> float:
+    return min(timeit.repeat(fn, number=NUMBER, repeat=REPEAT)) / NUMBER * 1e6
+
+
+def main() -> None:
+    conn = init_db(":memory:")
+    results = [c.to_dict() for c in aggregate_records(synthetic_payload(REAL_CANDIDATES))["constituencies"]]
+    save_constituency_results(conn, results)
+    db = Database(conn)
+    cache = ResponseCache()
+
+    def read(query):
+        with db.reader() as c:
+            return query(c)
+
+    print(f"{'endpoint':<16}  {'bytes':>9}  {'gzip':>8}  {'br':>8}  {'uncached':>10}  {'hit':>8}  {'gzip once':>10}")
+    for key, query in (("constituencies", get_constituencies), ("parties", get_parties)):
+        uncached = _us(lambda: encode_json(read(query)))
+        entry = cache.get(key, lambda: read(query))
+        hit = _us(lambda: cache.get(key, lambda: read(query)))
+        compress = _us(lambda: gzip.compress(entry.body, 6, mtime=0))
+        br = f"{len(entry.variant('br')):>8,}" if brotli is not None else f"{'—':>8}"
+        print(
+            f"{key:<16}  {len(entry.body):>9,}  {len(entry.variant('gzip')):>8,}  {br}"
+            f"  {uncached:>8.0f}µs  {hit:>6.2f}µs  {compress:>8.0f}µs"
+        )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
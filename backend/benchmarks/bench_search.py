@@ -0,0 +1,59 @@
+"""
+bench_search.py — /api/candidates?q= latency: the old `name LIKE '%q%'`
+scan against the candidate_search FTS5 index, at the real candidate volume
+and at 10×.
+
+Run with: python benchmarks/bench_search.py
+"""
+
+import timeit
+
+from synthetic import REAL_CANDIDATES, synthetic_payload
+
+from database import get_candidates, init_db, save_constituency_results
+from scraper import aggregate_records
+
+QUERIES = ("उम्मेदवार 1234", "काठमाडौं", "नेपाली कम्युनिष्ट")
+REPEAT = 5
+NUMBER = 5
+
+
+def populated_db(n_candidates: int):
+    conn = init_db(":memory:")
+    results = [c.to_dict() for c in aggregate_records(synthetic_payload(n_candidates))["constituencies"]]
+    save_constituency_results(conn, results)
+    return conn
+
+
+def like_search(conn, q: str, page_size: int = 50) -> list:
+    """The pre-FTS query: substring scan over names, ordered by votes."""
+    pattern = f"%{q}%"
+    conn.execute(
+        "SELECT COUNT(*) FROM candidate_profile p WHERE p.name LIKE ? OR p.name_np LIKE ?",
+        (pattern, pattern),
+    ).fetchone()
+    return conn.execute(
+        "SELECT p.id FROM candidate_votes v JOIN candidate_profile p ON p.id = v.candidate_id "
+        "WHERE p.name LIKE ? OR p.name_np LIKE ? ORDER BY v.votes DESC, v.candidate_id LIMIT ?",
+        (pattern, pattern, page_size),
+    ).fetchall()
+
+
+def _ms(fn) -> float:
+    return min(timeit.repeat(fn, number=NUMBER, repeat=REPEAT)) / NUMBER * 1000
+
+
+def main() -> None:
+    print(f"{'candidates':>10}  {'query':<20}  {'hits':>6}  {'LIKE':>10}  {'FTS5':>10}")
+    for n_candidates in (REAL_CANDIDATES, REAL_CANDIDATES * 10):
+        conn = populated_db(n_candidates)
+        for q in QUERIES:
+            hits = get_candidates(conn, q=q)["total"]
+            like_ms = _ms(lambda: like_search(conn, q))
+            fts_ms = _ms(lambda: get_candidates(conn, q=q))
+            print(f"{n_candidates:>10,}  {q:<20}  {hits:>6,}  {like_ms:>8.2f}ms  {fts_ms:>8.2f}ms")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
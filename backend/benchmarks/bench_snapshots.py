@@ -0,0 +1,67 @@
+"""
+bench_snapshots.py — /api/snapshots against a week of synthetic history
+(one snapshot every 30 s, 20,160 rows): the full replay a client had to do
+before, versus get_snapshot_history downsampled over the week and a day.
+
+Run with: python benchmarks/bench_snapshots.py
+"""
+
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from synthetic import synthetic_payload  # noqa: F401 — puts backend/ on sys.path
+
+from database import get_snapshot_history, init_db, save_snapshot
+from scraper import PARTY_MAP, map_party_key
+
+START = datetime(2026, 3, 5, 0, 0, tzinfo=timezone.utc)
+DAYS = 7
+INTERVAL_S = 30
+REPEAT = 5
+NUMBER = 3
+
+
+def populated_db():
+    conn = init_db(":memory:")
+    rng = random.Random(2082)
+    parties = sorted({map_party_key(name) for name in PARTY_MAP})
+    tally = {party: 0 for party in parties}
+    for i in range(DAYS * 86400 // INTERVAL_S):
+        if rng.random() < 0.01:
+            tally[rng.choice(parties)] += 1
+        save_snapshot(conn, {
+            "taken_at": (START + timedelta(seconds=INTERVAL_S * i)).isoformat(),
+            "declared_seats": sum(tally.values()),
+            "seat_tally": {party: {"fptp": n, "pr": 0} for party, n in tally.items()},
+        })
+    return conn
+
+
+def full_replay(conn) -> list:
+    return conn.execute(
+        "SELECT s.*, t.party, t.fptp, t.pr FROM snapshots s "
+        "LEFT JOIN snapshot_tally t ON t.snapshot_id = s.id ORDER BY s.id"
+    ).fetchall()
+
+
+def main() -> None:
+    conn = populated_db()
+    day = START + timedelta(days=3)
+    last_hour = START + timedelta(days=DAYS, hours=-1)
+    calls = {
+        "full replay (week)": lambda: full_replay(conn),
+        "week, step=1800":    lambda: get_snapshot_history(conn, step=1800),
+        "day, step=300":      lambda: get_snapshot_history(conn, start=day, end=day + timedelta(days=1), step=300),
+        "last hour, step=30": lambda: get_snapshot_history(conn, start=last_hour, step=30),
+    }
+    print(f"{'request':<22}  {'points':>7}  {'latency':>10}")
+    for name, fn in calls.items():
+        result = fn()
+        points = len({row["id"] for row in result}) if name.startswith("full") else len(result)
+        ms = min(timeit.repeat(fn, number=NUMBER, repeat=REPEAT)) / NUMBER * 1000
+        print(f"{name:<22}  {points:>7,}  {ms:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+bench_sse_resume.py — Cost of a reconnect storm on /api/stream: 10,000
+clients reconnecting at once after a blip, resuming from Last-Event-ID
+(replay from the ring) versus each being sent the full state, and bytes
+sent per client either way.
+
+Run with: python benchmarks/bench_sse_resume.py
+"""
+
+import asyncio
+import time
+
+from synthetic import REAL_CANDIDATES, advance, synthetic_payload
+
+from broadcast import StateFeed
+from database import Database, get_live_state, init_db
+from main import _persist_cycle
+from response_cache import ResponseCache
+from scraper import _aggregate_cycle, reset_fetch_state
+from stream import EventStream, sse_frame
+
+CLIENTS = 10_000
+MISSED = 2  # cycles missed during the blip
+
+
+def _setup() -> tuple[Database, EventStream, int]:
+    reset_fetch_state()
+    db = Database(init_db(":memory:"))
+    feed, hub = StateFeed(), EventStream()
+    raw = synthetic_payload(REAL_CANDIDATES)
+    _persist_cycle(db, _aggregate_cycle(raw)[0], feed)
+    held = feed.version
+    for cycle in range(MISSED):
+        raw = advance(raw, 0.01, seed=cycle)
+        hub.publish(_persist_cycle(db, _aggregate_cycle(raw)[0], feed)[1])
+    return db, hub, held
+
+
+async def _storm(hub: EventStream, last_event_id: str | None, state) -> tuple[float, int]:
+    start = time.perf_counter()
+    sent = 0
+    for _ in range(CLIENTS):
+        events = hub.events(last_event_id, state)
+        for _ in range(1 + (MISSED if last_event_id else 1)):
+            sent += len(await anext(events))
+        await events.aclose()
+    return time.perf_counter() - start, sent // CLIENTS
+
+
+async def main() -> None:
+    db, hub, held = _setup()
+    cache = ResponseCache()
+
+    def build(_version: int) -> tuple[int, bytes]:
+        with db.reader() as conn:
+            state = get_live_state(conn)
+        return state["version"], sse_frame({"type": "state", **state}, state["version"])
+
+    async def state() -> tuple[int, bytes]:
+        return cache.memo("sse-state", build)
+
+    print(f"{CLIENTS:,} clients reconnecting, {MISSED} cycles missed")
+    print(f"{'resume':<18}  {'total':>9}  {'per client':>11}  {'bytes/client':>13}")
+    for name, last_id in (("Last-Event-ID", str(held)), ("full state", None)):
+        elapsed, size = await _storm(hub, last_id, state)
+        print(f"{name:<18}  {elapsed * 1000:>7.0f}ms  {elapsed / CLIENTS * 1e6:>9.1f}µs  {size:>13,}")
+    db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
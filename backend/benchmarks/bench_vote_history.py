@@ -0,0 +1,55 @@
+"""
+bench_vote_history.py — Size of the change-only vote_history store over
+replayed scrape cycles (5% of candidates gaining votes per cycle), next to
+what full per-cycle copies of every count would take, plus the latency of
+the two history reads.
+
+Run with: python benchmarks/bench_vote_history.py
+"""
+
+import time
+import timeit
+
+from synthetic import advance, synthetic_payload
+
+from database import get_candidate_history, get_constituency_history, init_db, save_constituency_results
+from scraper import aggregate_records
+
+CYCLES = 240            # two hours at 30 s
+CYCLES_PER_DAY = 2880
+
+
+def _table_bytes(conn, name: str) -> int:
+    return conn.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = ?", (name,)).fetchone()[0]
+
+
+def main() -> None:
+    conn = init_db(":memory:")
+    payload = synthetic_payload()
+    started = time.perf_counter()
+    for cycle in range(CYCLES):
+        save_constituency_results(conn, [c.to_dict() for c in aggregate_records(payload)["constituencies"]])
+        payload = advance(payload, seed=cycle)
+    print(f"replayed {CYCLES} cycles in {time.perf_counter() - started:.1f}s")
+
+    rows = conn.execute("SELECT COUNT(*) FROM vote_history").fetchone()[0]
+    candidates = conn.execute("SELECT COUNT(*) FROM candidate_votes").fetchone()[0]
+    size = _table_bytes(conn, "vote_history")
+    per_row = size / rows
+    full_rows = candidates * CYCLES
+    print(f"{'store':<22}  {'rows':>10}  {'size':>10}  {'per day':>10}")
+    for label, n in (("change-only", rows), ("full per-cycle copies", full_rows)):
+        day = n / CYCLES * CYCLES_PER_DAY * per_row
+        print(f"{label:<22}  {n:>10,}  {n * per_row / 1e6:>8.2f}MB  {day / 1e6:>8.1f}MB")
+
+    cid, code = conn.execute("SELECT candidate_id, constituency_code FROM candidate_votes LIMIT 1").fetchone()
+    for label, fn in (
+        ("candidate history", lambda: get_candidate_history(conn, cid)),
+        ("constituency history", lambda: get_constituency_history(conn, code)),
+    ):
+        ms = min(timeit.repeat(fn, number=20, repeat=5)) / 20 * 1000
+        print(f"{label:<22}  {ms:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+bench_writes.py — Rows written and latency of save_constituency_results()
+over replayed scrape cycles (5% of candidates gaining votes per cycle).
+
+Run with: python benchmarks/bench_writes.py
+"""
+
+import time
+
+from synthetic import advance, synthetic_payload
+
+from database import init_db, save_constituency_results
+from scraper import aggregate_records
+
+CYCLES = 10
+
+
+def main() -> None:
+    conn = init_db(":memory:")
+    payload = synthetic_payload()
+    print(f"{'cycle':>5}  {'rows written':>12}  {'latency':>10}")
+    for cycle in range(CYCLES):
+        results = [c.to_dict() for c in aggregate_records(payload)["constituencies"]]
+        started = time.perf_counter()
+        written = save_constituency_results(conn, results)
+        ms = (time.perf_counter() - started) * 1000
+        print(f"{cycle:>5}  {sum(written.values()):>12,}  {ms:>8.2f}ms")
+        payload = advance(payload, seed=cycle)
+
+
+if __name__ == "__main__":
+    main()
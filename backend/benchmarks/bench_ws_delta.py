@@ -0,0 +1,48 @@
+"""
+bench_ws_delta.py — Bytes pushed to each WebSocket client per scrape cycle:
+the old full "snapshot" + "constituencies" re-broadcast against a
+constituency_patch, as the share of candidates whose votes moved grows.
+
+Run with: python benchmarks/bench_ws_delta.py
+"""
+
+import time
+
+from synthetic import REAL_CANDIDATES, advance, synthetic_payload
+
+from broadcast import StateFeed, encode_message
+from database import Database, get_constituencies, get_latest_snapshot, init_db
+from main import _persist_cycle
+from scraper import _aggregate_cycle, reset_fetch_state
+
+FRACTIONS = (0.001, 0.01, 0.05, 0.25)
+
+
+def main() -> None:
+    print(f"{'moved':>6}  {'changed':>8}  {'full push':>10}  {'patch':>9}  {'ratio':>6}  {'cycle':>7}")
+    for fraction in FRACTIONS:
+        reset_fetch_state()
+        db = Database(init_db(":memory:"))
+        feed = StateFeed()
+        raw = synthetic_payload(REAL_CANDIDATES)
+        _persist_cycle(db, _aggregate_cycle(raw)[0], feed)
+
+        aggregate, _ = _aggregate_cycle(advance(raw, fraction))
+        start = time.perf_counter()
+        patch = _persist_cycle(db, aggregate, feed)[1].message
+        elapsed = time.perf_counter() - start
+        with db.reader() as conn:
+            full = len(encode_message({"type": "snapshot", "data": get_latest_snapshot(conn)}).encode()) + len(
+                encode_message({"type": "constituencies", "data": get_constituencies(conn)}).encode()
+            )
+        size = len(encode_message(patch).encode())
+        changed = sum(len(c["candidates"]) for c in patch["constituencies"])
+        print(
+            f"{fraction:>6.1%}  {changed:>8,}  {full:>9,}B  {size:>8,}B"
+            f"  {full / size:>5.0f}×  {elapsed * 1000:>5.0f}ms"
+        )
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
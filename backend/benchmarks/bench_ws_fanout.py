@@ -0,0 +1,84 @@
+"""
+bench_ws_fanout.py — Broadcasting the full constituencies list to thousands
+of simulated WebSocket clients, 1% of them slow.
+
+"sequential" is the old ConnectionManager.broadcast: send_json to each socket
+in turn, which re-encodes the message per client and waits on every send.
+"queued" is broadcast.ConnectionManager: one encode, per-client queues and
+writer tasks. Reported: time until broadcast() returns, and until every
+healthy client has the frame.
+
+Run with: python benchmarks/bench_ws_fanout.py
+"""
+
+import asyncio
+import json
+import time
+
+from synthetic import REAL_CANDIDATES, synthetic_payload
+
+from broadcast import ConnectionManager
+from scraper import aggregate_records
+
+SLOW_EVERY = 100
+SLOW_DELAY_S = 0.5
+
+
+class SimulatedSocket:
+    def __init__(self, slow: bool) -> None:
+        self.slow = slow
+        self.received = 0
+
+    async def send_text(self, frame: str) -> None:
+        await asyncio.sleep(SLOW_DELAY_S if self.slow else 0)
+        self.received += 1
+
+    async def send_json(self, data: dict) -> None:
+        await self.send_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+def _sockets(n: int) -> list[SimulatedSocket]:
+    return [SimulatedSocket(slow=i % SLOW_EVERY == 0) for i in range(n)]
+
+
+async def _sequential(message: dict, n: int) -> tuple[float, float]:
+    sockets = _sockets(n)
+    start = time.perf_counter()
+    for ws in sockets:
+        await ws.send_json(message)
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+async def _queued(message: dict, n: int) -> tuple[float, float]:
+    sockets = _sockets(n)
+    manager = ConnectionManager()
+    for ws in sockets:
+        manager.register(ws)
+    healthy = [ws for ws in sockets if not ws.slow]
+    start = time.perf_counter()
+    await manager.broadcast(message)
+    returned = time.perf_counter() - start
+    while not all(ws.received for ws in healthy):
+        await asyncio.sleep(0.0005)
+    delivered = time.perf_counter() - start
+    await manager.close()
+    return returned, delivered
+
+
+async def main() -> None:
+    constituencies = [c.to_dict() for c in aggregate_records(synthetic_payload(REAL_CANDIDATES))["constituencies"]]
+    message = {"type": "constituencies", "data": constituencies}
+    print(f"{'clients':>8}  {'strategy':<10}  {'broadcast()':>12}  {'all healthy':>12}")
+    for n, strategies in ((1_000, (_sequential, _queued)), (5_000, (_queued,)), (10_000, (_queued,))):
+        for strategy in strategies:
+            returned, delivered = await strategy(message, n)
+            name = strategy.__name__.lstrip("_")
+            print(f"{n:>8,}  {name:<10}  {returned * 1000:>10.1f}ms  {delivered * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""
+bench_ws_topics.py — Routing one scrape cycle's constituency_patch to 10,000
+WebSocket clients with skewed subscriptions, against sending every client
+the whole patch.
+
+Subscriptions: 20% of clients follow nothing (national view, get
+everything); the rest follow 1–5 topics, constituencies drawn Zipf-like so
+a few hot seats dominate, plus some party and province pages. Reported:
+time in publish()/broadcast(), distinct frames encoded, bytes queued.
+
+Run with: python benchmarks/bench_ws_topics.py
+"""
+
+import asyncio
+import random
+import time
+
+from synthetic import REAL_CANDIDATES, advance, synthetic_payload
+
+from broadcast import ConnectionManager, StateFeed
+from database import Database, init_db
+from main import _persist_cycle
+from scraper import _aggregate_cycle, reset_fetch_state
+
+CLIENTS = 10_000
+UNFILTERED = 0.2
+FRACTION = 0.05
+
+
+class NullSocket:
+    def __init__(self) -> None:
+        self.bytes = 0
+
+    async def send_text(self, frame: str) -> None:
+        self.bytes += len(frame.encode())
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+def _patch():
+    reset_fetch_state()
+    db = Database(init_db(":memory:"))
+    feed = StateFeed()
+    raw = synthetic_payload(REAL_CANDIDATES)
+    state = _persist_cycle(db, _aggregate_cycle(raw)[0], feed)[1].message
+    patch = _persist_cycle(db, _aggregate_cycle(advance(raw, FRACTION))[0], feed)[1]
+    db.close()
+    return state["constituencies"], patch
+
+
+def _topics(rng: random.Random, constituencies: list[dict]) -> list[str]:
+    codes = [c["code"] for c in constituencies]
+    weights = [1 / (rank + 1) for rank in range(len(codes))]
+    parties = sorted({cand["party"] for c in constituencies for cand in c["candidates"]})
+    party_weights = [1 / (rank + 1) ** 2 for rank in range(len(parties))]
+    provinces = sorted({c["province"] for c in constituencies})
+    topics = [f"constituency:{code}" for code in rng.choices(codes, weights, k=rng.randint(1, 4))]
+    roll = rng.random()
+    if roll < 0.3:
+        topics.append(f"party:{rng.choices(parties, party_weights)[0]}")
+    elif roll < 0.4:
+        topics.append(f"province:{rng.choice(provinces)}")
+    return topics
+
+
+async def _run(routed: bool, constituencies: list[dict], patch) -> None:
+    rng = random.Random(7)
+    manager = ConnectionManager()
+    sockets = [NullSocket() for _ in range(CLIENTS)]
+    for ws in sockets:
+        manager.register(ws)
+        manager.send_frame(ws, "state", "", version=patch.message["base"])
+        if routed and rng.random() >= UNFILTERED:
+            manager.subscribe(ws, _topics(rng, constituencies))
+    await manager.drain()
+    for ws in sockets:
+        ws.bytes = 0
+
+    start = time.perf_counter()
+    if routed:
+        await manager.publish(patch)
+    else:
+        await manager.broadcast(patch.message)
+    queued = time.perf_counter() - start
+    frames = len({client.pending[-1][1] for client in manager._clients.values() if client.pending})
+    await manager.drain()
+    delivered = time.perf_counter() - start
+    await manager.close()
+
+    total = sum(ws.bytes for ws in sockets)
+    reached = sum(1 for ws in sockets if ws.bytes)
+    name = "topics" if routed else "everyone"
+    print(
+        f"{name:<9}  {queued * 1000:>7.1f}ms  {delivered * 1000:>8.1f}ms  {frames:>7,}"
+        f"  {reached:>8,}  {total / 1e6:>8.1f}MB"
+    )
+
+
+async def main() -> None:
+    constituencies, patch = _patch()
+    print(
+        f"{len(patch.message['constituencies'])} of {len(constituencies)} constituencies changed, "
+        f"{CLIENTS:,} clients"
+    )
+    print(f"{'routing':<9}  {'queued':>9}  {'delivered':>10}  {'frames':>7}  {'clients':>8}  {'bytes':>10}")
+    await _run(False, constituencies, patch)
+    await _run(True, constituencies, patch)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
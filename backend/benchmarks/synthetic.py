@@ -0,0 +1,84 @@
+"""
+synthetic.py — Realistic synthetic upstream payloads for the benchmarks.
+
+The real feed is ~3,406 candidate records across 165 constituencies in 77
+districts. synthetic_payload() reproduces that layout (same field names and
+value types as tests/fixtures/fptp_results.json) at any scale, so the
+benchmarks can also model 10× payloads and local-level elections.
+"""
+
+import copy
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Any
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from district_names import DISTRICT_EN  # noqa: E402
+from scraper import PARTY_MAP  # noqa: E402
+
+FIXTURE = BACKEND_DIR / "tests" / "fixtures" / "fptp_results.json"
+REAL_CANDIDATES = 3406
+REAL_CONSTITUENCIES = 165
+
+
+def _template() -> dict[str, Any]:
+    return json.loads(FIXTURE.read_text(encoding="utf-8"))[0]
+
+
+def synthetic_payload(
+    n_candidates: int = REAL_CANDIDATES,
+    n_constituencies: int | None = None,
+    *,
+    seed: int = 2082,
+) -> list[dict[str, Any]]:
+    """
+    Build `n_candidates` raw upstream records spread over `n_constituencies`
+    (scaled with the candidate count by default). Votes are random, about a
+    quarter of the constituencies have an official winner.
+    """
+    rng = random.Random(seed)
+    if n_constituencies is None:
+        n_constituencies = max(1, round(n_candidates * REAL_CONSTITUENCIES / REAL_CANDIDATES))
+    districts = list(dict.fromkeys(DISTRICT_EN))
+    parties = list(PARTY_MAP)
+    template = _template()
+
+    records: list[dict[str, Any]] = []
+    per_const = n_candidates // n_constituencies
+    extra = n_candidates % n_constituencies
+    for c in range(n_constituencies):
+        state_id = c % 7 + 1
+        district = districts[c % len(districts)]
+        const_num = c // len(districts) + 1
+        declared = rng.random() < 0.25
+        size = per_const + (1 if c < extra else 0)
+        for i in range(size):
+            rec = copy.copy(template)
+            party = parties[rng.randrange(len(parties))]
+            rec.update(
+                CandidateID=100000 + len(records),
+                CandidateName=f"उम्मेदवार {len(records)}",
+                PoliticalPartyName=party,
+                SYMBOLCODE=1000 + parties.index(party),
+                STATE_ID=state_id,
+                DistrictName=district,
+                SCConstID=const_num,
+                TotalVoteReceived=rng.randrange(0, 40000),
+                R=i + 1,
+                E_STATUS="W" if declared and i == 0 else None,
+            )
+            records.append(rec)
+    return records
+
+
+def advance(records: list[dict[str, Any]], fraction: float = 0.05, *, seed: int = 1) -> list[dict[str, Any]]:
+    """Return a copy of `records` with `fraction` of candidates gaining votes."""
+    rng = random.Random(seed)
+    out = [dict(r) for r in records]
+    for rec in rng.sample(out, max(1, int(len(out) * fraction))):
+        rec["TotalVoteReceived"] += rng.randrange(1, 500)
+    return out
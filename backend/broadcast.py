@@ -0,0 +1,365 @@
+"""
+broadcast.py — WebSocket fan-out and the versioned delta protocol.
+
+Protocol. Versions are the database's data_version.
+  server → client  {"type": "state", "version", "snapshot", "constituencies"}
+                   on connect and on request: the full state, candidates
+                   carrying their ids.
+  server → client  {"type": "constituency_patch", "version", "base",
+                   "snapshot", "constituencies"} after each scrape cycle
+                   that changed something: only the constituencies that
+                   changed, each with only its changed candidates (and
+                   "removed" ids, when a candidate disappeared).
+  client → server  {"type": "resync", "version"} when a patch's base is not
+                   the version it holds; answered with a full state.
+  client → server  {"type": "subscribe" | "unsubscribe", "topics": [...]}
+                   with topics "constituency:<code>", "district:<name>",
+                   "province:<name>" or "party:<key>" — the party key
+                   candidates carry in "party" (as in /api/parties, e.g.
+                   "party:NC"; not the upstream partyId); acknowledged with
+                   {"type": "subscribed", "topics"}. A client with no topics
+                   gets every change; one with topics gets patches holding
+                   only the constituencies they match, and nothing for
+                   cycles that matched none. Rows for a newly added topic may
+                   be stale until they next change — fetch them over REST.
+A client ignores patches at or below its version and applies one whose base
+equals it; anything else is a gap. `base` is per client: the version of the
+last patch or state sent to it.
+
+Fan-out. broadcast() encodes each message once and hands the same text frame
+to every client; it never awaits a socket. Each client has its own bounded
+queue, drained by its own writer task, so a slow client only delays itself.
+A newer message of a type supersedes an older one still queued, so a client
+that falls behind keeps only the latest frame of each type; a dropped patch
+shows up as a gap and the client resyncs. A client that cannot take a frame
+within SEND_TIMEOUT_S, or whose queue is still full after coalescing, is
+disconnected; it reconnects and gets the current state.
+"""
+
+import asyncio
+import json
+from collections import deque
+from typing import Any
+
+from fastapi import WebSocket
+
+SEND_QUEUE_SIZE = 4
+SEND_TIMEOUT_S = 10.0
+# Close code for dropped slow consumers: "Try Again Later".
+SLOW_CONSUMER_CLOSE = 1013
+
+TOPIC_KINDS = ("constituency", "district", "province", "party")
+MAX_TOPICS = 256
+
+
+def encode_message(message: dict[str, Any]) -> str:
+    """Encode exactly like WebSocket.send_json."""
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+
+
+class Client:
+    """One connected socket: its pending frames and the task sending them."""
+
+    __slots__ = ("ws", "topics", "version", "pending", "wakeup", "task", "sending", "coalesced")
+
+    def __init__(self, ws: WebSocket) -> None:
+        self.ws = ws
+        self.topics: set[str] = set()
+        self.version: int | None = None  # last state/patch version queued
+        self.pending: deque[tuple[str, str]] = deque()  # (type, frame)
+        self.wakeup = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.sending = False
+        self.coalesced = 0
+
+    def offer(self, kind: str, frame: str) -> bool:
+        """Queue a frame without waiting. False means the client cannot keep up."""
+        if len(self.pending) >= SEND_QUEUE_SIZE:
+            # Behind: drop the queued frame this one supersedes.
+            before = len(self.pending)
+            self.pending = deque(item for item in self.pending if item[0] != kind)
+            self.coalesced += before - len(self.pending)
+            if len(self.pending) >= SEND_QUEUE_SIZE:
+                return False
+        self.pending.append((kind, frame))
+        self.wakeup.set()
+        return True
+
+
+class ConnectionManager:
+    def __init__(self) -> None:
+        self._clients: dict[WebSocket, Client] = {}
+        # Inverted index: topic → subscribed clients. Clients without any
+        # topic are in _unfiltered and get everything.
+        self._subscribers: dict[str, set[Client]] = {}
+        self._unfiltered: set[Client] = set()
+        self._closing: set[asyncio.Task] = set()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    async def connect(self, ws: WebSocket) -> None:
+        await ws.accept()
+        self.register(ws)
+
+    def register(self, ws: WebSocket) -> Client:
+        """Track an accepted socket and start its writer task."""
+        client = self._clients[ws] = Client(ws)
+        self._unfiltered.add(client)
+        client.task = asyncio.create_task(self._writer(client))
+        return client
+
+    def disconnect(self, ws: WebSocket) -> None:
+        client = self._clients.pop(ws, None)
+        if client is None:
+            return
+        self._unfiltered.discard(client)
+        self._unsubscribe(client, list(client.topics))
+        if client.task is not asyncio.current_task():
+            client.task.cancel()
+
+    def subscribe(self, ws: WebSocket, topics: list[str]) -> list[str]:
+        """Add well-formed topics (up to MAX_TOPICS); returns the client's topics."""
+        client = self._clients.get(ws)
+        if client is None:
+            return []
+        for topic in topics:
+            if len(client.topics) >= MAX_TOPICS:
+                break
+            if _valid_topic(topic) and topic not in client.topics:
+                client.topics.add(topic)
+                self._subscribers.setdefault(topic, set()).add(client)
+        if client.topics:
+            self._unfiltered.discard(client)
+        return sorted(client.topics)
+
+    def unsubscribe(self, ws: WebSocket, topics: list[str]) -> list[str]:
+        """Drop topics; a client left with none gets everything again."""
+        client = self._clients.get(ws)
+        if client is None:
+            return []
+        self._unsubscribe(client, topics)
+        if not client.topics:
+            self._unfiltered.add(client)
+        return sorted(client.topics)
+
+    def _unsubscribe(self, client: Client, topics: list[str]) -> None:
+        for topic in topics:
+            if topic not in client.topics:
+                continue
+            client.topics.discard(topic)
+            subscribers = self._subscribers[topic]
+            subscribers.discard(client)
+            if not subscribers:
+                del self._subscribers[topic]
+
+    def send_frame(self, ws: WebSocket, kind: str, frame: str, *, version: int | None = None) -> None:
+        """
+        Queue an encoded message of type `kind` for one client; `version`
+        when it is a state, so later patches are based on it.
+        """
+        client = self._clients.get(ws)
+        if client is None:
+            return
+        if version is not None:
+            client.version = version
+        if not client.offer(kind, frame):
+            self._drop(client)
+
+    async def broadcast(self, message: dict[str, Any]) -> None:
+        """Encode once and queue for every client; returns without awaiting any socket."""
+        kind, frame = message["type"], encode_message(message)
+        for client in list(self._clients.values()):
+            if not client.offer(kind, frame):
+                self._drop(client)
+
+    async def publish(self, patch: "Patch") -> None:
+        """
+        Route a patch: each client gets the changed constituencies matching
+        its topics (all of them when unfiltered), based on its own version.
+        Clients wanting the same subset from the same base share one frame;
+        frames are joined from constituencies encoded once each.
+        """
+        message = patch.message
+        entries = message["constituencies"]
+        matched: dict[str, list[int]] = {}
+        for i, topics in enumerate(patch.topics):
+            for topic in topics:
+                if topic in self._subscribers:
+                    matched.setdefault(topic, []).append(i)
+        wanted: dict[Client, set[int]] = {}
+        for topic, indices in matched.items():
+            for client in self._subscribers[topic]:
+                if client in wanted:
+                    wanted[client].update(indices)
+                else:
+                    wanted[client] = set(indices)
+
+        everything = tuple(range(len(entries)))
+        groups: dict[tuple[int | None, tuple[int, ...]], list[Client]] = {}
+        for client in self._unfiltered:
+            groups.setdefault((client.version, everything), []).append(client)
+        for client, indices in wanted.items():
+            groups.setdefault((client.version, tuple(sorted(indices))), []).append(client)
+
+        kind, version = message["type"], message["version"]
+        encoded = [encode_message(entry) for entry in entries]
+        head = encode_message({"type": kind, "version": version})[:-1]
+        snapshot = encode_message(message["snapshot"])
+        for (base, indices), clients in groups.items():
+            # == encode_message({**message, "base": base, "constituencies": subset})
+            frame = "".join((
+                head, ',"base":', encode_message(base), ',"snapshot":', snapshot,
+                ',"constituencies":[', ",".join([encoded[i] for i in indices]), "]}",
+            ))
+            for client in clients:
+                client.version = version
+                if not client.offer(kind, frame):
+                    self._drop(client)
+
+    async def drain(self) -> None:
+        """Wait until every client's queue is empty (tests and benchmarks)."""
+        while any(c.pending or c.sending for c in self._clients.values()):
+            await asyncio.sleep(0.001)
+
+    async def close(self) -> None:
+        """Stop every writer task (app shutdown)."""
+        tasks = [client.task for client in self._clients.values()] + list(self._closing)
+        self._clients.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _drop(self, client: Client) -> None:
+        self.dropped += 1
+        self.disconnect(client.ws)
+        task = asyncio.create_task(_close(client.ws, SLOW_CONSUMER_CLOSE))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _writer(self, client: Client) -> None:
+        ws = client.ws
+        try:
+            while True:
+                await client.wakeup.wait()
+                client.wakeup.clear()
+                while client.pending:
+                    _, frame = client.pending.popleft()
+                    client.sending = True
+                    async with asyncio.timeout(SEND_TIMEOUT_S):
+                        await ws.send_text(frame)
+                    client.sending = False
+        except asyncio.CancelledError:
+            raise
+        except TimeoutError:
+            self.dropped += 1
+            self.disconnect(ws)
+            await _close(ws, SLOW_CONSUMER_CLOSE)
+        except Exception:
+            self.disconnect(ws)
+
+
+def _valid_topic(topic: Any) -> bool:
+    if not isinstance(topic, str):
+        return False
+    kind, _, name = topic.partition(":")
+    return kind in TOPIC_KINDS and bool(name)
+
+
+async def _close(ws: WebSocket, code: int) -> None:
+    try:
+        await ws.close(code=code)
+    except Exception:
+        pass
+
+
+# ── Delta protocol ──────────────────────────────────────────────────────────
+
+_HEADER_FIELDS = ("province", "district", "code", "name", "status", "lastUpdated")
+
+
+class Patch:
+    """A constituency_patch message and, per changed constituency, its topics."""
+
+    __slots__ = ("message", "topics")
+
+    def __init__(self, message: dict[str, Any], topics: list[frozenset[str]]) -> None:
+        self.message = message
+        self.topics = topics
+
+
+class StateFeed:
+    """
+    The state last pushed to clients, kept to diff the next one against.
+    Not thread-safe: the scraper loop only touches it from the writer thread.
+    """
+
+    def __init__(self) -> None:
+        self.version: int | None = None
+        # code → (header values, candidate id → candidate dict)
+        self._constituencies: dict[str, tuple[tuple, dict[int, dict[str, Any]]]] = {}
+
+    def reset(self, state: dict[str, Any]) -> None:
+        """Adopt `state` (from get_live_state) as the base for the next patch."""
+        self.version = state["version"]
+        self._constituencies = {
+            c["code"]: (_header(c), {cand["id"]: cand for cand in c["candidates"]})
+            for c in state["constituencies"]
+        }
+
+    def advance(self, state: dict[str, Any], *, partial: bool = False) -> Patch | None:
+        """
+        The constituency_patch taking clients from the current base to
+        `state`, which becomes the new base. None when the version did not move.
+        With partial=True, `state` holds only the constituencies the cycle
+        changed (get_live_state(codes=...)); only those are diffed and the
+        rest of the base is kept as is.
+        """
+        if state["version"] == self.version:
+            return None
+        changed: list[dict[str, Any]] = []
+        topics: list[frozenset[str]] = []
+        index: dict[str, tuple[tuple, dict[int, dict[str, Any]]]] = (
+            self._constituencies if partial else {}
+        )
+        for c in state["constituencies"]:
+            header = _header(c)
+            candidates = {cand["id"]: cand for cand in c["candidates"]}
+            previous_header, previous = self._constituencies.get(c["code"], ((), {}))
+            index[c["code"]] = (header, candidates)
+            updated = [
+                cand for cid, cand in candidates.items() if previous.get(cid) != cand
+            ]
+            removed = previous.keys() - candidates.keys()
+            if header == previous_header and not updated and not removed:
+                continue
+            entry = dict(zip(_HEADER_FIELDS, header))
+            entry["candidates"] = updated
+            if removed:
+                entry["removed"] = sorted(removed)
+            changed.append(entry)
+            topics.append(_topics(c))
+        message = {
+            "type":           "constituency_patch",
+            "version":        state["version"],
+            "base":           self.version,
+            "snapshot":       state["snapshot"],
+            "constituencies": changed,
+        }
+        self.version, self._constituencies = state["version"], index
+        return Patch(message, topics)
+
+
+def _header(constituency: dict[str, Any]) -> tuple:
+    return tuple(constituency[field] for field in _HEADER_FIELDS)
+
+
+def _topics(constituency: dict[str, Any]) -> frozenset[str]:
+    """Every topic a change to this constituency is routed to."""
+    return frozenset((
+        f"constituency:{constituency['code']}",
+        f"district:{constituency['district']}",
+        f"province:{constituency['province']}",
+        *(f"party:{cand['party']}" for cand in constituency["candidates"]),
+    ))
@@ -1,16 +1,28 @@
+import base64
+import json
+import os
+import queue
 import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
 from typing import Any
 
+from scraper import Changeset, map_party_key
 
-PARTY_COLS: dict[str, tuple[str, str]] = {
-    "NC": ("nc_fptp", "nc_pr"),
-    "CPN-UML": ("uml_fptp", "uml_pr"),
-    "NCP": ("ncp_fptp", "ncp_pr"),
-    "RSP": ("rsp_fptp", "rsp_pr"),
-    "OTH": ("oth_fptp", "oth_pr"),
-}
 
-_SCHEMA = """
+# Parties always present in /api/snapshot's seatTally, even with no seats.
+# Party keys (map_party_key), like every other key in the tally; there is no
+# "OTH" bucket — unmapped parties keep their own name.
+DEFAULT_TALLY_PARTIES = ("NC", "CPN-UML", "NCP", "RSP")
+
+# ── Schema migrations ─────────────────────────────────────────────────────────
+# _MIGRATIONS[n] upgrades a database from PRAGMA user_version n to n + 1.
+# Append new migrations; never edit one that has shipped.
+
+_V1_INITIAL = """
 CREATE TABLE IF NOT EXISTS snapshots (
     id             INTEGER PRIMARY KEY AUTOINCREMENT,
     taken_at       TEXT    NOT NULL,
@@ -42,174 +54,977 @@ CREATE TABLE IF NOT EXISTS candidates (
 );
 """
 
+# Static/volatile split. Written once: constituencies (code, names, place) and
+# candidate_profile (names, party, bio). Rewritten as counts move:
+# constituency_status and candidate_votes. candidate_votes repeats the
+# (static) constituency_code so the per-constituency ranking and the
+# votes-ordered listings are served from its indexes alone.
+_V2_NORMALISED = """
+CREATE TABLE candidate_profile (
+    id                INTEGER PRIMARY KEY,      -- upstream CandidateID
+    constituency_code TEXT    NOT NULL REFERENCES constituencies(code),
+    name              TEXT    NOT NULL,
+    name_np           TEXT,
+    party             TEXT    NOT NULL,         -- party key (map_party_key)
+    party_id          TEXT,                     -- frontend partyId (SYMBOLCODE / IND)
+    party_name        TEXT,
+    gender            TEXT,
+    age               INTEGER,
+    father_name       TEXT,
+    spouse_name       TEXT,
+    qualification     TEXT,
+    institution       TEXT,
+    experience        TEXT,
+    address           TEXT
+);
+
+CREATE TABLE candidate_votes (
+    candidate_id      INTEGER PRIMARY KEY REFERENCES candidate_profile(id),
+    constituency_code TEXT    NOT NULL,
+    votes             INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE constituency_status (
+    code         TEXT PRIMARY KEY REFERENCES constituencies(code),
+    status       TEXT NOT NULL DEFAULT 'COUNTING',
+    votes_cast   INTEGER NOT NULL DEFAULT 0,
+    last_updated TEXT
+) WITHOUT ROWID;
+
+CREATE TABLE snapshot_tally (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id),
+    party       TEXT    NOT NULL,
+    fptp        INTEGER NOT NULL DEFAULT 0,
+    pr          INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (snapshot_id, party)
+) WITHOUT ROWID;
+
+INSERT INTO candidate_profile (id, constituency_code, name, party)
+SELECT id, constituency_code, name, party FROM candidates;
+INSERT INTO candidate_votes (candidate_id, constituency_code, votes)
+SELECT id, constituency_code, COALESCE(votes, 0) FROM candidates;
+INSERT INTO constituency_status (code, status, votes_cast, last_updated)
+SELECT con.code, COALESCE(con.status, 'COUNTING'),
+       (SELECT COALESCE(SUM(votes), 0) FROM candidates c WHERE c.constituency_code = con.code),
+       con.last_updated
+FROM constituencies con;
+INSERT INTO snapshot_tally (snapshot_id, party, fptp, pr)
+          SELECT id, 'NC',      nc_fptp,  nc_pr  FROM snapshots
+UNION ALL SELECT id, 'CPN-UML', uml_fptp, uml_pr FROM snapshots
+UNION ALL SELECT id, 'NCP',     ncp_fptp, ncp_pr FROM snapshots
+UNION ALL SELECT id, 'RSP',     rsp_fptp, rsp_pr FROM snapshots
+UNION ALL SELECT id, 'OTH',     oth_fptp, oth_pr FROM snapshots;
+
+DROP TABLE candidates;
+ALTER TABLE constituencies DROP COLUMN status;
+ALTER TABLE constituencies DROP COLUMN last_updated;
+ALTER TABLE snapshots DROP COLUMN nc_fptp;
+ALTER TABLE snapshots DROP COLUMN nc_pr;
+ALTER TABLE snapshots DROP COLUMN uml_fptp;
+ALTER TABLE snapshots DROP COLUMN uml_pr;
+ALTER TABLE snapshots DROP COLUMN ncp_fptp;
+ALTER TABLE snapshots DROP COLUMN ncp_pr;
+ALTER TABLE snapshots DROP COLUMN rsp_fptp;
+ALTER TABLE snapshots DROP COLUMN rsp_pr;
+ALTER TABLE snapshots DROP COLUMN oth_fptp;
+ALTER TABLE snapshots DROP COLUMN oth_pr;
+
+CREATE INDEX idx_candidate_votes_rank ON candidate_votes (constituency_code, votes DESC, candidate_id);
+CREATE INDEX idx_candidate_votes_votes ON candidate_votes (votes DESC, candidate_id);
+CREATE INDEX idx_candidate_profile_constituency ON candidate_profile (constituency_code, id);
+CREATE INDEX idx_candidate_profile_party ON candidate_profile (party, id);
+CREATE INDEX idx_constituency_status_status ON constituency_status (status, code);
+"""
+
+# Materialised aggregates, maintained by save_constituency_results from the
+# rows it changes. province_totals is the source of truth per (province,
+# party); party_totals is its per-party sum, kept alongside for /api/parties.
+# seats: DECLARED constituencies where the party's candidate ranks first;
+# leading: undeclared constituencies where it ranks first with votes > 0.
+_V3_MATERIALISED_TOTALS = """
+CREATE TABLE province_totals (
+    province   TEXT    NOT NULL,
+    party      TEXT    NOT NULL,
+    candidates INTEGER NOT NULL DEFAULT 0,
+    votes      INTEGER NOT NULL DEFAULT 0,
+    seats      INTEGER NOT NULL DEFAULT 0,
+    leading    INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (province, party)
+) WITHOUT ROWID;
+
+CREATE TABLE party_totals (
+    party      TEXT    PRIMARY KEY,
+    candidates INTEGER NOT NULL DEFAULT 0,
+    votes      INTEGER NOT NULL DEFAULT 0,
+    seats      INTEGER NOT NULL DEFAULT 0,
+    leading    INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+INSERT INTO province_totals (province, party, candidates, votes)
+SELECT con.province, p.party, COUNT(*), SUM(v.votes)
+FROM candidate_profile p
+JOIN candidate_votes v ON v.candidate_id = p.id
+JOIN constituencies con ON con.code = v.constituency_code
+GROUP BY con.province, p.party;
+
+UPDATE province_totals SET seats = l.seats, leading = l.leading
+FROM (
+    SELECT con.province, p.party,
+           SUM(s.status = 'DECLARED') AS seats,
+           SUM(s.status != 'DECLARED' AND r.votes > 0) AS leading
+    FROM (
+        SELECT candidate_id, constituency_code, votes,
+               ROW_NUMBER() OVER (
+                   PARTITION BY constituency_code ORDER BY votes DESC, candidate_id
+               ) AS rank
+        FROM candidate_votes
+    ) r
+    JOIN candidate_profile p ON p.id = r.candidate_id
+    JOIN constituencies con ON con.code = r.constituency_code
+    JOIN constituency_status s ON s.code = r.constituency_code
+    WHERE r.rank = 1
+    GROUP BY con.province, p.party
+) l
+WHERE province_totals.province = l.province AND province_totals.party = l.party;
+
+INSERT INTO party_totals (party, candidates, votes, seats, leading)
+SELECT party, SUM(candidates), SUM(votes), SUM(seats), SUM(leading)
+FROM province_totals
+GROUP BY party;
+"""
+
+# Devanagari vowel signs, virama and other combining marks. unicode61 treats
+# them as separators, which would break "शर्मा" into "श", "र", "म"; declared as
+# tokenchars, Nepali words index whole.
+_DEVANAGARI_MARKS = "".join(
+    chr(cp)
+    for start, end in ((0x0900, 0x0903), (0x093A, 0x093C), (0x093E, 0x094F), (0x0951, 0x0957), (0x0962, 0x0963))
+    for cp in range(start, end + 1)
+)
+
+# Full-text candidate search. Rows share candidate_profile's id as rowid and
+# are kept in sync by triggers, so whichever connection writes a profile
+# updates the index in the same transaction. `name` is the NEU English name
+# where known (see scraper._NEU); `constituency` includes the code, which
+# carries the Nepali district name.
+_FTS_ROW = """
+    {row}.name,
+    {row}.name_np,
+    trim({row}.party || ' ' || COALESCE({row}.party_name, '')),
+    (SELECT district FROM constituencies WHERE code = {row}.constituency_code),
+    (SELECT name || ' ' || code FROM constituencies WHERE code = {row}.constituency_code)
+"""
+_V4_CANDIDATE_SEARCH = f"""
+CREATE VIRTUAL TABLE candidate_search USING fts5(
+    name, name_np, party, district, constituency,
+    tokenize = 'unicode61 remove_diacritics 2 tokenchars ''{_DEVANAGARI_MARKS}''',
+    prefix = '2 3'
+);
+
+INSERT INTO candidate_search (rowid, name, name_np, party, district, constituency)
+SELECT p.id, {_FTS_ROW.format(row="p")} FROM candidate_profile p;
+
+CREATE TRIGGER candidate_search_insert AFTER INSERT ON candidate_profile BEGIN
+    INSERT INTO candidate_search (rowid, name, name_np, party, district, constituency)
+    VALUES (NEW.id, {_FTS_ROW.format(row="NEW")});
+END;
+
+CREATE TRIGGER candidate_search_update
+AFTER UPDATE OF name, name_np, party, party_name, constituency_code ON candidate_profile BEGIN
+    DELETE FROM candidate_search WHERE rowid = OLD.id;
+    INSERT INTO candidate_search (rowid, name, name_np, party, district, constituency)
+    VALUES (NEW.id, {_FTS_ROW.format(row="NEW")});
+END;
+
+CREATE TRIGGER candidate_search_delete AFTER DELETE ON candidate_profile BEGIN
+    DELETE FROM candidate_search WHERE rowid = OLD.id;
+END;
+"""
+
+# Monotonic counter bumped by every save_constituency_results that writes a
+# row: cursors and cached responses are pinned to it.
+_V5_DATA_VERSION = """
+CREATE TABLE data_version (
+    id      INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+INSERT INTO data_version (id, version) VALUES (1, 0);
+"""
+
+# Snapshot history range scans (get_snapshot_history).
+_V6_SNAPSHOT_HISTORY = """
+CREATE INDEX idx_snapshots_taken_at ON snapshots (taken_at);
+"""
+
+# Vote history, change-only: a vote_history row exists for a candidate at a
+# data version only when their count moved in it, so a multi-day count costs
+# one row per change rather than one per candidate per cycle. version_log
+# timestamps each data version. Existing counts seed the history.
+_V7_VOTE_HISTORY = """
+CREATE TABLE version_log (
+    version     INTEGER PRIMARY KEY,
+    recorded_at TEXT    NOT NULL
+);
+
+CREATE TABLE vote_history (
+    candidate_id INTEGER NOT NULL,
+    version      INTEGER NOT NULL,
+    votes        INTEGER NOT NULL,
+    PRIMARY KEY (candidate_id, version)
+) WITHOUT ROWID;
+
+INSERT INTO version_log (version, recorded_at)
+SELECT version, COALESCE((SELECT MAX(last_updated) FROM constituency_status), '')
+FROM data_version;
+
+INSERT INTO vote_history (candidate_id, version, votes)
+SELECT candidate_id, (SELECT version FROM data_version), votes FROM candidate_votes;
+"""
+
+_MIGRATIONS: list[str] = [
+    _V1_INITIAL,
+    _V2_NORMALISED,
+    _V3_MATERIALISED_TOTALS,
+    _V4_CANDIDATE_SEARCH,
+    _V5_DATA_VERSION,
+    _V6_SNAPSHOT_HISTORY,
+    _V7_VOTE_HISTORY,
+]
+SCHEMA_VERSION = len(_MIGRATIONS)
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Apply every migration newer than the database's PRAGMA user_version."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"database schema v{version} is newer than this code (v{SCHEMA_VERSION})"
+        )
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        try:
+            conn.executescript(
+                f"BEGIN;\n{_MIGRATIONS[target - 1]}\nPRAGMA user_version = {target};\nCOMMIT;"
+            )
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+
+# ── Connections ───────────────────────────────────────────────────────────────
+# WAL lets the read-only pool keep serving the last committed state while the
+# writer connection commits a scrape cycle; readers and the writer never block
+# each other. synchronous=NORMAL is durable across application crashes under
+# WAL (an OS crash can lose the last cycle, which the next scrape rewrites).
+
+READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "4"))
+MMAP_SIZE_BYTES = int(os.getenv("DB_MMAP_SIZE_BYTES", str(64 * 1024 * 1024)))
+CACHE_SIZE_KIB = int(os.getenv("DB_CACHE_SIZE_KIB", "16384"))
+BUSY_TIMEOUT_MS = 5000
+
+_COMMON_PRAGMAS = (
+    f"PRAGMA mmap_size = {MMAP_SIZE_BYTES}",
+    f"PRAGMA cache_size = -{CACHE_SIZE_KIB}",
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+    "PRAGMA temp_store = MEMORY",
+)
+_WRITER_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    *_COMMON_PRAGMAS,
+)
+_READER_PRAGMAS = ("PRAGMA query_only = ON", *_COMMON_PRAGMAS)
+
+
+def _is_memory(db_path: str) -> bool:
+    return db_path == ":memory:" or db_path.startswith("file::memory:")
+
 
 def init_db(db_path: str) -> sqlite3.Connection:
+    """Open the writer connection: WAL, tuned pragmas, schema migrated."""
     conn = sqlite3.connect(db_path, check_same_thread=False)
     conn.row_factory = sqlite3.Row
-    conn.executescript(_SCHEMA)
-    conn.commit()
+    for pragma in _WRITER_PRAGMAS:
+        conn.execute(pragma)
+    _migrate(conn)
     return conn
 
 
-def save_snapshot(conn: sqlite3.Connection, snap: dict[str, Any]) -> None:
-    t = snap["seat_tally"]
-    conn.execute(
+def open_reader(db_path: str) -> sqlite3.Connection:
+    """Open a read-only connection to an existing database file."""
+    uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    for pragma in _READER_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class Database:
+    """
+    One writer connection plus a bounded pool of read-only connections.
+
+    The writer belongs to the scraper (`with db.writing() as conn:`); request
+    handlers borrow a reader per request with `with db.reader() as conn:`. Readers are opened lazily up to
+    `readers`; further borrowers wait for one to be returned. An in-memory
+    database cannot be shared between connections, so there the writer also
+    serves reads, serialised by a lock.
+    """
+
+    def __init__(self, writer: sqlite3.Connection, db_path: str | None = None, *, readers: int = READ_POOL_SIZE) -> None:
+        self.writer = writer
+        self.path = db_path
+        self._pooled = db_path is not None and not _is_memory(db_path) and readers > 0
+        self._size = readers if self._pooled else 0
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._opened: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, db_path: str, *, readers: int = READ_POOL_SIZE) -> "Database":
+        return cls(init_db(db_path), db_path, readers=readers)
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        if not self._pooled:
+            with self._lock:
+                yield self.writer
+            return
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    @contextmanager
+    def writing(self) -> Iterator[sqlite3.Connection]:
         """
-        INSERT INTO snapshots (
-            taken_at, total_seats, declared_seats,
-            nc_fptp, nc_pr, uml_fptp, uml_pr,
-            ncp_fptp, ncp_pr, rsp_fptp, rsp_pr,
-            oth_fptp, oth_pr
-        ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
-        """,
-        (
-            snap["taken_at"], snap["total_seats"], snap["declared_seats"],
-            t["NC"]["fptp"],      t["NC"]["pr"],
-            t["CPN-UML"]["fptp"], t["CPN-UML"]["pr"],
-            t["NCP"]["fptp"],     t["NCP"]["pr"],
-            t["RSP"]["fptp"],     t["RSP"]["pr"],
-            t["OTH"]["fptp"],     t["OTH"]["pr"],
-        ),
-    )
-    conn.commit()
+        The writer connection, for the single writer thread. Without a pool
+        it also serves reads, so take the same lock the readers do.
+        """
+        if self._pooled:
+            yield self.writer
+            return
+        with self._lock:
+            yield self.writer
 
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._opened) < self._size:
+                conn = open_reader(self.path)
+                self._opened.append(conn)
+                return conn
+        return self._idle.get()
 
-def get_latest_snapshot(conn: sqlite3.Connection) -> dict[str, Any]:
-    row = conn.execute(
-        "SELECT * FROM snapshots ORDER BY id DESC LIMIT 1"
-    ).fetchone()
-    if not row:
+    def stats(self) -> dict[str, Any]:
         return {
-            "totalSeats": 275,
-            "declaredSeats": 0,
-            "lastUpdated": "",
-            "seatTally": {k: {"fptp": 0, "pr": 0} for k in PARTY_COLS},
+            "pooled":  self._pooled,
+            "readers": len(self._opened),
+            "idle":    self._idle.qsize(),
+            "maxReaders": self._size,
         }
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._opened:
+                conn.close()
+            self._opened.clear()
+        self.writer.close()
+
+
+# ── Snapshots ─────────────────────────────────────────────────────────────────
+
+def save_snapshot(conn: sqlite3.Connection, snap: dict[str, Any]) -> None:
+    """
+    Store a seat-tally snapshot. Accepts the scraper's snake_case snapshot
+    (taken_at, seat_tally) or the camelCase frontend Snapshot (lastUpdated,
+    seatTally); the tally may be keyed by any party identifier.
+    """
+    tally = snap.get("seat_tally") or snap.get("seatTally") or {}
+    with conn:
+        cur = conn.execute(
+            "INSERT INTO snapshots (taken_at, total_seats, declared_seats) VALUES (?,?,?)",
+            (
+                snap.get("taken_at") or snap.get("lastUpdated"),
+                snap.get("total_seats", snap.get("totalSeats", 275)),
+                snap.get("declared_seats", snap.get("declaredSeats", 0)),
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO snapshot_tally (snapshot_id, party, fptp, pr) VALUES (?,?,?,?)",
+            [
+                (cur.lastrowid, party, seats.get("fptp", 0), seats.get("pr", 0))
+                for party, seats in tally.items()
+            ],
+        )
+
+
+# Snapshot columns with its tally folded into one JSON object per row:
+# {party: {"fptp": n, "pr": n}} — cheaper than a row per party.
+_SNAPSHOT_COLUMNS = """
+    s.taken_at, s.total_seats, s.declared_seats,
+    (SELECT json_group_object(t.party, json_object('fptp', t.fptp, 'pr', t.pr))
+     FROM snapshot_tally t WHERE t.snapshot_id = s.id)
+"""
+
+
+def _snapshot_dict(row: tuple[Any, ...]) -> dict[str, Any]:
+    taken_at, total_seats, declared_seats, tally_json = row
+    tally = {k: {"fptp": 0, "pr": 0} for k in DEFAULT_TALLY_PARTIES}
+    if tally_json:
+        tally.update(json.loads(tally_json))
     return {
-        "totalSeats": row["total_seats"],
-        "declaredSeats": row["declared_seats"],
-        "lastUpdated": row["taken_at"],
-        "seatTally": {
-            "NC":      {"fptp": row["nc_fptp"],  "pr": row["nc_pr"]},
-            "CPN-UML": {"fptp": row["uml_fptp"], "pr": row["uml_pr"]},
-            "NCP":     {"fptp": row["ncp_fptp"], "pr": row["ncp_pr"]},
-            "RSP":     {"fptp": row["rsp_fptp"], "pr": row["rsp_pr"]},
-            "OTH":     {"fptp": row["oth_fptp"], "pr": row["oth_pr"]},
-        },
+        "totalSeats":    total_seats,
+        "declaredSeats": declared_seats,
+        "lastUpdated":   taken_at,
+        "seatTally":     tally,
     }
 
 
+def _utc_iso(moment: datetime) -> str:
+    """taken_at form of a datetime (naive means UTC), for range comparisons."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).isoformat()
+
+
+def get_snapshot_history(
+    conn: sqlite3.Connection,
+    *,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    step: int = 300,
+) -> list[dict[str, Any]]:
+    """
+    Seat-tally history between `start` (inclusive) and `end` (exclusive),
+    downsampled to one snapshot per `step`-second bucket — the last one taken
+    in it. Buckets are aligned to the Unix epoch, so the same step always
+    yields the same points. Oldest first, in get_latest_snapshot's shape.
+    """
+    if step < 1:
+        raise ValueError("step must be at least 1 second")
+    clauses: list[str] = []
+    params: list[Any] = []
+    if start is not None:
+        clauses.append("taken_at >= ?")
+        params.append(_utc_iso(start))
+    if end is not None:
+        clauses.append("taken_at < ?")
+        params.append(_utc_iso(end))
+    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    rows = _tuples(
+        conn,
+        f"""
+        WITH picked AS (
+            SELECT MAX(id) AS id
+            FROM snapshots
+            {where}
+            GROUP BY CAST(strftime('%s', taken_at) AS INTEGER) / ?
+        )
+        SELECT {_SNAPSHOT_COLUMNS}
+        FROM picked
+        JOIN snapshots s ON s.id = picked.id
+        ORDER BY s.id
+        """,
+        (*params, step),
+    )
+    return [_snapshot_dict(row) for row in rows]
+
+
+def get_latest_snapshot(conn: sqlite3.Connection) -> dict[str, Any]:
+    row = _tuples(
+        conn,
+        f"SELECT {_SNAPSHOT_COLUMNS} FROM snapshots s ORDER BY s.id DESC LIMIT 1",
+    ).fetchone()
+    if row is None:
+        return _snapshot_dict(("", 275, 0, None))
+    return _snapshot_dict(row)
+
+
+# ── Constituency results ──────────────────────────────────────────────────────
+
+# candidate_profile columns ← ConstituencyResult candidate keys (after
+# id, constituency_code, name and party, which every input shape carries).
+_PROFILE_FIELDS: tuple[tuple[str, str], ...] = (
+    ("name_np",       "nameNp"),
+    ("party_id",      "partyId"),
+    ("party_name",    "partyName"),
+    ("gender",        "gender"),
+    ("age",           "age"),
+    ("father_name",   "fatherName"),
+    ("spouse_name",   "spouseName"),
+    ("qualification", "qualification"),
+    ("institution",   "institution"),
+    ("experience",    "experience"),
+    ("address",       "address"),
+)
+_PROFILE_COLUMNS = ("constituency_code", "name", "party", *(col for col, _ in _PROFILE_FIELDS))
+_PROFILE_KEYS = tuple(key for _, key in _PROFILE_FIELDS)
+
+
+def _profile(code: str, c: dict[str, Any]) -> tuple[Any, ...]:
+    """candidate_profile values (in _PROFILE_COLUMNS order) for one input candidate."""
+    return (code, c["name"], _candidate_party(c), *map(c.get, _PROFILE_KEYS))
+
+
+def _tuples(conn: sqlite3.Connection, sql: str, params: tuple[Any, ...] = ()) -> sqlite3.Cursor:
+    """Run `sql` returning plain tuples — cheaper than sqlite3.Row for bulk reads."""
+    cur = conn.cursor()
+    cur.row_factory = None
+    return cur.execute(sql, params)
+
+
+# ── Materialised totals ───────────────────────────────────────────────────────
+
+# Rank-1 candidate of each listed constituency (idx_candidate_votes_rank).
+_LEADERS = """
+    SELECT con.province, s.status, p.party, v.votes
+    FROM json_each(?) j
+    JOIN constituency_status s ON s.code = j.value
+    JOIN constituencies con ON con.code = s.code
+    JOIN candidate_votes v ON v.candidate_id = (
+        SELECT candidate_id FROM candidate_votes
+        WHERE constituency_code = s.code
+        ORDER BY votes DESC, candidate_id
+        LIMIT 1
+    )
+    JOIN candidate_profile p ON p.id = v.candidate_id
+"""
+
+# Totals delta per (province, party): [candidates, votes, seats, leading].
+TotalsDelta = dict[tuple[str, str], list[int]]
+
+
+def _add_leaders(conn: sqlite3.Connection, codes: set[str], delta: TotalsDelta, sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) the seats/leads held in `codes`."""
+    if not codes:
+        return
+    for province, status, party, votes in _tuples(conn, _LEADERS, (json.dumps(sorted(codes)),)):
+        row = delta.setdefault((province, party), [0, 0, 0, 0])
+        if status == "DECLARED":
+            row[2] += sign
+        elif votes > 0:
+            row[3] += sign
+
+
+def _apply_totals(conn: sqlite3.Connection, delta: TotalsDelta) -> None:
+    """Fold a TotalsDelta into province_totals and party_totals."""
+    by_party: dict[str, list[int]] = {}
+    rows = []
+    for (province, party), d in delta.items():
+        if any(d):
+            rows.append((province, party, *d))
+            acc = by_party.setdefault(party, [0, 0, 0, 0])
+            for i, n in enumerate(d):
+                acc[i] += n
+    conn.executemany(
+        """
+        INSERT INTO province_totals (province, party, candidates, votes, seats, leading)
+        VALUES (?,?,?,?,?,?)
+        ON CONFLICT(province, party) DO UPDATE SET
+            candidates = candidates + excluded.candidates,
+            votes      = votes      + excluded.votes,
+            seats      = seats      + excluded.seats,
+            leading    = leading    + excluded.leading
+        """,
+        rows,
+    )
+    conn.executemany(
+        """
+        INSERT INTO party_totals (party, candidates, votes, seats, leading)
+        VALUES (?,?,?,?,?)
+        ON CONFLICT(party) DO UPDATE SET
+            candidates = candidates + excluded.candidates,
+            votes      = votes      + excluded.votes,
+            seats      = seats      + excluded.seats,
+            leading    = leading    + excluded.leading
+        """,
+        [(party, *d) for party, d in by_party.items()],
+    )
+
+
 def save_constituency_results(
-    conn: sqlite3.Connection, results: list[dict[str, Any]]
-) -> None:
+    conn: sqlite3.Connection,
+    results: list[dict[str, Any]],
+    changes: Changeset | None = None,
+) -> dict[str, int]:
+    """
+    Upsert constituency results, writing only the rows that changed since the
+    previous save, in one transaction.
+
+    `changes` is the scraper's Changeset for this payload. Unless it is a
+    full one, only the constituencies it lists are read back and compared;
+    the rest of `results` is taken as unchanged and skipped, so a cycle
+    costs what changed rather than the whole dataset.
+
+    Accepts the scraper's camelCase ConstituencyResult dicts (candidateId,
+    partyName, lastUpdated) as well as snake_case rows (party, last_updated).
+    Candidates are keyed on the upstream CandidateID, so /api/candidates/{id}
+    stays valid across cycles; rows without one are matched by name within
+    their constituency. Static data (constituencies, candidate_profile) is
+    written when first seen or when upstream corrects it; candidate_votes
+    and constituency_status rows only when the counts or status move.
+
+    province_totals and party_totals are updated in the same transaction from
+    the vote deltas of the changed rows, plus the leaders of the constituencies
+    those rows (or a status change) touched.
+
+    data_version is bumped when anything was written, and every vote count
+    that moved (or appeared) is appended to vote_history at the new version:
+    the moves in `changes` when given (records without a CandidateID, which
+    the scraper cannot track, get none), otherwise those this save found.
+
+    Returns the number of rows written: constituencies, inserted, updated,
+    deleted.
+    """
+    scoped = changes is not None and not changes.full
+    if scoped:
+        results = [r for r in results if r["code"] in changes.constituencies]
+    cols = ", ".join(_PROFILE_COLUMNS)
+    candidates_sql = f"SELECT id, {cols} FROM candidate_profile"
+    votes_sql = "SELECT candidate_id, votes FROM candidate_votes"
+    params: tuple[Any, ...] = ()
+    if scoped:
+        # Rows of the changed constituencies, plus any candidate that moved
+        # into one of them from elsewhere.
+        scope = (
+            " WHERE {id} IN (SELECT value FROM json_each(?))"
+            " OR constituency_code IN (SELECT value FROM json_each(?))"
+        )
+        candidates_sql += scope.format(id="id")
+        votes_sql += scope.format(id="candidate_id")
+        params = (
+            json.dumps([c["candidateId"] for r in results for c in r["candidates"] if c.get("candidateId") is not None]),
+            json.dumps(sorted({r["code"] for r in results})),
+        )
+    old_profiles = {row[0]: row[1:] for row in _tuples(conn, candidates_sql, params)}
+    old_votes = dict(_tuples(conn, votes_sql, params))
+
+    province_sql = "SELECT code, province FROM constituencies"
+    status_sql = "SELECT code, status, votes_cast FROM constituency_status"
+    params = ()
+    if scoped:
+        scope = " WHERE code IN (SELECT value FROM json_each(?))"
+        province_sql += scope
+        status_sql += scope
+        params = (json.dumps(sorted({r["code"] for r in results} | {p[0] for p in old_profiles.values()})),)
+    province_of = dict(_tuples(conn, province_sql, params))
+    old_status = {
+        code: (status, votes_cast) for code, status, votes_cast in _tuples(conn, status_sql, params)
+    }
+    by_name = {(p[0], p[1]): cid for cid, p in old_profiles.items()}
+
+    new_constituencies: list[tuple[Any, ...]] = []
+    status_rows: list[tuple[Any, ...]] = []
+    inserts: list[tuple[Any, tuple[Any, ...], int]] = []
+    profile_updates: list[tuple[Any, ...]] = []
+    vote_updates: list[tuple[Any, ...]] = []
+    moved_votes: list[tuple[int, int]] = []
+    seen: set[int] = set()
+    dirty: set[str] = set()
+    totals: TotalsDelta = {}
+
+    def count(code: str, party: str, sign: int, votes: int) -> None:
+        row = totals.setdefault((province_of[code], party), [0, 0, 0, 0])
+        row[0] += sign
+        row[1] += sign * votes
+
+    for r in results:
+        code = r["code"]
+        if code not in province_of:
+            province_of[code] = r["province"]
+            new_constituencies.append((code, r["name"], r["province"], r["district"]))
+        for c in r["candidates"]:
+            profile = _profile(code, c)
+            cid = c.get("candidateId")
+            if cid is None:
+                cid = by_name.pop((code, c["name"]), None)
+            old = old_profiles.get(cid) if cid is not None else None
+            if old is None:
+                inserts.append((cid, profile, c["votes"]))
+                count(code, profile[2], 1, c["votes"])
+                dirty.add(code)
+                continue
+            seen.add(cid)
+            moved = old[0] != code or old[2] != profile[2]
+            if old != profile:  # upstream corrected static data
+                profile_updates.append((*profile, cid))
+                dirty.update((code, old[0]))
+            if old_votes.get(cid) != c["votes"] or old[0] != code:
+                vote_updates.append((code, c["votes"], cid))
+                dirty.add(code)
+            if changes is None and old_votes.get(cid) != c["votes"]:
+                moved_votes.append((cid, c["votes"]))
+            if moved or old_votes.get(cid) != c["votes"]:
+                count(old[0], old[2], -1, old_votes.get(cid, 0))
+                count(code, profile[2], 1, c["votes"])
+
+    codes = {r["code"] for r in results}
+    deletes = [
+        (cid,) for cid, profile in old_profiles.items()
+        if profile[0] in codes and cid not in seen
+    ]
+    for (cid,) in deletes:
+        old = old_profiles[cid]
+        dirty.add(old[0])
+        count(old[0], old[2], -1, old_votes.get(cid, 0))
     for r in results:
-        conn.execute(
+        votes_cast = r.get("votesCast")
+        if votes_cast is None:
+            votes_cast = sum(c["votes"] for c in r["candidates"])
+        if r["code"] in dirty or old_status.get(r["code"]) != (r["status"], votes_cast):
+            status_rows.append((r["code"], r["status"], votes_cast, _last_updated(r)))
+
+    if changes is not None:
+        # History is the Changeset's vote moves, so it records exactly what the
+        # scraper reported and the patches carried. A full changeset has no
+        # previous payload; there a count already stored is not re-recorded.
+        present = seen | {cid for cid, _, _ in inserts if cid is not None}
+        moved_votes = [
+            (cid, votes) for cid, (prev, votes) in changes.candidates.items()
+            if cid in present and prev != votes
+            and not (changes.full and old_votes.get(cid) == votes)
+        ]
+
+    placeholders = ", ".join("?" * len(_PROFILE_COLUMNS))
+    assignments = ", ".join(f"{col}=?" for col in _PROFILE_COLUMNS)
+    affected = dirty | {row[0] for row in status_rows}
+    changed = bool(
+        new_constituencies or status_rows or inserts or deletes or profile_updates or vote_updates
+        or moved_votes
+    )
+    with conn:
+        if changed:
+            (version,) = conn.execute(
+                "UPDATE data_version SET version = version + 1 RETURNING version"
+            ).fetchone()
+            conn.execute(
+                "INSERT INTO version_log (version, recorded_at) VALUES (?, ?)",
+                (version, datetime.now(timezone.utc).isoformat(timespec="seconds")),
+            )
+        _add_leaders(conn, affected, totals, -1)
+        conn.executemany(
+            "INSERT INTO constituencies (code, name, province, district) VALUES (?,?,?,?)",
+            new_constituencies,
+        )
+        conn.executemany(
             """
-            INSERT INTO constituencies (code, name, province, district, status, last_updated)
-            VALUES (?,?,?,?,?,?)
+            INSERT INTO constituency_status (code, status, votes_cast, last_updated)
+            VALUES (?,?,?,?)
             ON CONFLICT(code) DO UPDATE SET
                 status       = excluded.status,
+                votes_cast   = excluded.votes_cast,
                 last_updated = excluded.last_updated
             """,
-            (r["code"], r["name"], r["province"], r["district"],
-             r["status"], r["last_updated"]),
-        )
-        conn.execute(
-            "DELETE FROM candidates WHERE constituency_code=?", (r["code"],)
+            status_rows,
         )
+        conn.executemany("DELETE FROM candidate_votes WHERE candidate_id=?", deletes)
+        conn.executemany("DELETE FROM candidate_profile WHERE id=?", deletes)
+        conn.executemany(f"UPDATE candidate_profile SET {assignments} WHERE id=?", profile_updates)
         conn.executemany(
-            "INSERT INTO candidates (constituency_code, name, party, votes) VALUES (?,?,?,?)",
-            [(r["code"], c["name"], c["party"], c["votes"]) for c in r["candidates"]],
+            "UPDATE candidate_votes SET constituency_code=?, votes=? WHERE candidate_id=?",
+            vote_updates,
         )
-    conn.commit()
+        for cid, profile, votes in inserts:
+            cur = conn.execute(
+                f"INSERT INTO candidate_profile (id, {cols}) VALUES (?, {placeholders})",
+                (cid, *profile),
+            )
+            conn.execute(
+                "INSERT INTO candidate_votes (candidate_id, constituency_code, votes) VALUES (?,?,?)",
+                (cur.lastrowid, profile[0], votes),
+            )
+            if changes is None:
+                moved_votes.append((cur.lastrowid, votes))
+        if changed:
+            conn.executemany(
+                "INSERT INTO vote_history (candidate_id, version, votes) VALUES (?, ?, ?)",
+                [(cid, version, votes) for cid, votes in moved_votes],
+            )
+        _add_leaders(conn, affected, totals, 1)
+        _apply_totals(conn, totals)
+    return {
+        "constituencies": len(status_rows),
+        "inserted":       len(inserts),
+        "updated":        len(profile_updates) + len(vote_updates),
+        "deleted":        len(deletes),
+    }
+
+
+def _candidate_party(c: dict[str, Any]) -> str:
+    """Party key for a candidate in either input shape (see save_constituency_results)."""
+    return c.get("party") or map_party_key(c.get("partyName") or "")
+
 
+def _last_updated(r: dict[str, Any]) -> str | None:
+    return r.get("lastUpdated") or r.get("last_updated")
 
-def get_constituencies(conn: sqlite3.Connection) -> list[dict[str, Any]]:
-    rows = conn.execute("SELECT * FROM constituencies").fetchall()
-    out = []
+
+# ── Reads ─────────────────────────────────────────────────────────────────────
+
+def get_data_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT version FROM data_version").fetchone()[0]
+
+
+@contextmanager
+def _read_snapshot(conn: sqlite3.Connection) -> Iterator[None]:
+    """Run several SELECTs against one consistent view of the database."""
+    if conn.in_transaction:
+        yield
+        return
+    conn.execute("BEGIN")
+    try:
+        yield
+    finally:
+        conn.rollback()
+
+
+# Candidates ranked within their constituency (1 = most votes), read from
+# idx_candidate_votes_rank alone. The winner of a DECLARED constituency is
+# its rank-1 candidate.
+_RANKED_CANDIDATES = """
+    SELECT candidate_id AS id, constituency_code, votes,
+           ROW_NUMBER() OVER (
+               PARTITION BY constituency_code ORDER BY votes DESC, candidate_id
+           ) AS rank
+    FROM candidate_votes
+"""
+
+
+def _constituencies_with_candidates(
+    rows: list[sqlite3.Row], *, with_ids: bool = False
+) -> list[dict[str, Any]]:
+    """Fold constituency ⟕ candidate rows (grouped by constituency) into nested dicts."""
+    out: list[dict[str, Any]] = []
+    current: dict[str, Any] | None = None
     for row in rows:
-        cands = conn.execute(
-            "SELECT name, party, votes FROM candidates "
-            "WHERE constituency_code=? ORDER BY votes DESC",
-            (row["code"],),
-        ).fetchall()
-        out.append({
-            "province":    row["province"],
-            "district":    row["district"],
-            "code":        row["code"],
-            "name":        row["name"],
-            "status":      row["status"],
-            "lastUpdated": row["last_updated"],
-            "candidates":  [
-                {"name": c["name"], "party": c["party"], "votes": c["votes"]}
-                for c in cands
-            ],
-        })
+        if current is None or current["code"] != row["code"]:
+            current = {
+                "province":    row["province"],
+                "district":    row["district"],
+                "code":        row["code"],
+                "name":        row["name"],
+                "status":      row["status"],
+                "lastUpdated": row["last_updated"],
+                "candidates":  [],
+            }
+            out.append(current)
+        if row["cand_name"] is None:  # LEFT JOIN: no candidates yet
+            continue
+        cand = {"name": row["cand_name"], "party": row["party"], "votes": row["votes"]}
+        if with_ids:
+            cand = {"id": row["cand_id"], **cand}
+        current["candidates"].append(cand)
     return out
 
 
+_CONSTITUENCY_JOIN = (
+    "SELECT con.code, con.name, con.province, con.district, s.status, s.last_updated, "
+    "v.candidate_id AS cand_id, p.name AS cand_name, p.party, v.votes "
+    "FROM constituencies con "
+    "JOIN constituency_status s ON s.code = con.code "
+    "LEFT JOIN candidate_votes v ON v.constituency_code = con.code "
+    "LEFT JOIN candidate_profile p ON p.id = v.candidate_id "
+)
+
+
+def get_constituencies(
+    conn: sqlite3.Connection, *, with_ids: bool = False, codes: set[str] | None = None
+) -> list[dict[str, Any]]:
+    """Every constituency with its candidates, or only those in `codes`."""
+    if codes is None:
+        where, params = "", ()
+    else:
+        where, params = "WHERE con.code IN (SELECT value FROM json_each(?)) ", (json.dumps(sorted(codes)),)
+    rows = conn.execute(
+        _CONSTITUENCY_JOIN + where + "ORDER BY con.rowid, v.votes DESC, v.candidate_id", params
+    ).fetchall()
+    return _constituencies_with_candidates(rows, with_ids=with_ids)
+
+
+def get_live_state(conn: sqlite3.Connection, codes: set[str] | None = None) -> dict[str, Any]:
+    """
+    The WebSocket full state: data version, latest snapshot and every
+    constituency (candidates with ids, so patches can address them), read
+    from one consistent view. With `codes`, only those constituencies — what
+    a scrape cycle changed, for StateFeed.advance(partial=True).
+    """
+    with _read_snapshot(conn):
+        return {
+            "version":        get_data_version(conn),
+            "snapshot":       get_latest_snapshot(conn),
+            "constituencies": get_constituencies(conn, with_ids=True, codes=codes),
+        }
+
+
 def get_constituency_by_id(
     conn: sqlite3.Connection, code: str
 ) -> dict[str, Any] | None:
     """Return a single constituency with full candidate list, or None if not found."""
-    row = conn.execute(
-        "SELECT * FROM constituencies WHERE code=?", (code,)
-    ).fetchone()
-    if not row:
-        return None
-    cands = conn.execute(
-        "SELECT id, name, party, votes FROM candidates "
-        "WHERE constituency_code=? ORDER BY votes DESC",
+    rows = conn.execute(
+        _CONSTITUENCY_JOIN + "WHERE con.code=? ORDER BY v.votes DESC, v.candidate_id",
         (code,),
     ).fetchall()
-    return {
-        "province":    row["province"],
-        "district":    row["district"],
-        "code":        row["code"],
-        "name":        row["name"],
-        "status":      row["status"],
-        "lastUpdated": row["last_updated"],
-        "candidates":  [
-            {"id": c["id"], "name": c["name"], "party": c["party"], "votes": c["votes"]}
-            for c in cands
-        ],
-    }
+    found = _constituencies_with_candidates(rows, with_ids=True)
+    return found[0] if found else None
 
 
 def get_parties(conn: sqlite3.Connection) -> list[dict[str, Any]]:
-    """Aggregate seat counts and total votes per party across all constituencies."""
-    cands = conn.execute("SELECT party, votes FROM candidates").fetchall()
-    constits = conn.execute(
-        "SELECT code, status FROM constituencies"
+    """Seat counts and total votes per party, from the materialised party_totals."""
+    rows = conn.execute(
+        "SELECT party, votes, seats FROM party_totals WHERE candidates > 0 ORDER BY party"
     ).fetchall()
+    return [
+        {
+            "party":       row["party"],
+            "seatsWon":    row["seats"],
+            "totalVotes":  row["votes"],
+        }
+        for row in rows
+    ]
 
-    # Build winner per declared constituency
-    winners: dict[str, str] = {}
-    for row in constits:
-        if row["status"] == "DECLARED":
-            top = conn.execute(
-                "SELECT party FROM candidates WHERE constituency_code=? "
-                "ORDER BY votes DESC LIMIT 1",
-                (row["code"],),
-            ).fetchone()
-            if top:
-                winners[row["code"]] = top["party"]
-
-    seat_counts: dict[str, int] = {}
-    total_votes: dict[str, int] = {}
-    for party in winners.values():
-        seat_counts[party] = seat_counts.get(party, 0) + 1
-    for c in cands:
-        total_votes[c["party"]] = total_votes.get(c["party"], 0) + c["votes"]
 
-    all_parties = set(list(seat_counts.keys()) + list(total_votes.keys()))
+def get_provinces(conn: sqlite3.Connection) -> list[dict[str, Any]]:
+    """
+    Per-province results: constituency counts by status, votes cast, and
+    per-party seats won / leading-in counts from province_totals.
+    """
+    rows = conn.execute(
+        """
+        SELECT con.province,
+               COUNT(*)                                AS constituencies,
+               SUM(s.status = 'DECLARED')              AS declared,
+               SUM(s.status = 'COUNTING')              AS counting,
+               SUM(s.votes_cast)                       AS votes_cast
+        FROM constituencies con
+        JOIN constituency_status s ON s.code = con.code
+        GROUP BY con.province
+        ORDER BY con.province
+        """
+    ).fetchall()
+    tallies: dict[str, dict[str, dict[str, int]]] = {}
+    for province, party, votes, seats, leading in _tuples(
+        conn,
+        "SELECT province, party, votes, seats, leading FROM province_totals "
+        "WHERE candidates > 0 ORDER BY province, seats DESC, leading DESC, votes DESC, party",
+    ):
+        tallies.setdefault(province, {})[party] = {"seats": seats, "leading": leading, "votes": votes}
     return [
         {
-            "party":       p,
-            "seatsWon":    seat_counts.get(p, 0),
-            "totalVotes":  total_votes.get(p, 0),
+            "province":       row["province"],
+            "constituencies": row["constituencies"],
+            "declared":       row["declared"],
+            "counting":       row["counting"],
+            "votesCast":      row["votes_cast"],
+            "parties":        tallies.get(row["province"], {}),
         }
-        for p in sorted(all_parties)
+        for row in rows
     ]
 
 
@@ -218,10 +1033,12 @@ def get_candidate_by_id(
 ) -> dict[str, Any] | None:
     """Return a single candidate with their constituency context."""
     row = conn.execute(
-        "SELECT c.*, con.name AS const_name, con.province, con.district "
-        "FROM candidates c "
-        "JOIN constituencies con ON con.code = c.constituency_code "
-        "WHERE c.id=?",
+        "SELECT p.id, p.name, p.party, v.votes, p.constituency_code, "
+        "con.name AS const_name, con.province, con.district "
+        "FROM candidate_profile p "
+        "JOIN candidate_votes v ON v.candidate_id = p.id "
+        "JOIN constituencies con ON con.code = p.constituency_code "
+        "WHERE p.id=?",
         (candidate_id,),
     ).fetchone()
     if not row:
@@ -238,6 +1055,111 @@ def get_candidate_by_id(
     }
 
 
+# ── Vote history ──────────────────────────────────────────────────────────────
+
+def get_candidate_history(
+    conn: sqlite3.Connection, candidate_id: int
+) -> dict[str, Any] | None:
+    """
+    Every recorded change in a candidate's vote count, as parallel arrays
+    (oldest first), or None for an unknown candidate.
+    """
+    rows = _tuples(
+        conn,
+        "SELECT h.version, l.recorded_at, h.votes FROM vote_history h "
+        "JOIN version_log l ON l.version = h.version "
+        "WHERE h.candidate_id = ? ORDER BY h.version",
+        (candidate_id,),
+    ).fetchall()
+    if not rows:
+        return None
+    versions, times, votes = (list(col) for col in zip(*rows))
+    return {"candidateId": candidate_id, "versions": versions, "times": times, "votes": votes}
+
+
+def get_constituency_history(
+    conn: sqlite3.Connection, code: str
+) -> dict[str, Any] | None:
+    """
+    Vote history of a constituency's current candidates, on a shared time
+    axis: one entry per data version in which any of them changed, and per
+    candidate their count at each of those versions (carried forward; None
+    before their first record). None for an unknown constituency.
+    """
+    if conn.execute("SELECT 1 FROM constituencies WHERE code = ?", (code,)).fetchone() is None:
+        return None
+    rows = _tuples(
+        conn,
+        "SELECT h.candidate_id, h.version, l.recorded_at, h.votes "
+        "FROM candidate_votes v "
+        "JOIN vote_history h ON h.candidate_id = v.candidate_id "
+        "JOIN version_log l ON l.version = h.version "
+        "WHERE v.constituency_code = ? ORDER BY h.version, h.candidate_id",
+        (code,),
+    ).fetchall()
+    versions: list[int] = []
+    times: list[str] = []
+    series: dict[int, list[int | None]] = {}
+    for candidate_id, version, recorded_at, votes in rows:
+        if not versions or versions[-1] != version:
+            versions.append(version)
+            times.append(recorded_at)
+            for points in series.values():
+                points.append(points[-1])  # carried forward
+        points = series.get(candidate_id)
+        if points is None:
+            points = series[candidate_id] = [None] * len(versions)
+        points[-1] = votes
+    return {
+        "code": code,
+        "versions": versions,
+        "times": times,
+        "candidates": {str(cid): points for cid, points in series.items()},
+    }
+
+
+# bm25 column weights for candidate_search: names outrank party, district
+# and constituency matches.
+_SEARCH_WEIGHTS = "10.0, 10.0, 2.0, 1.0, 1.0"
+
+
+def _search_query(q: str) -> str | None:
+    """
+    FTS5 query for free text: every whitespace-separated term must match
+    the start of a token in some column ("ram bah" finds "Ram Bahadur").
+    Terms are quoted, so FTS5 operators in user input are taken literally.
+    Terms the tokenizer would reduce to nothing (bare punctuation) are
+    dropped; None when no term is left.
+    """
+    terms = [
+        '"' + term.replace('"', '""') + '"*'
+        for term in q.split()
+        if any(ch.isalnum() or ch in _DEVANAGARI_MARKS for ch in term)
+    ]
+    return " ".join(terms) or None
+
+
+# Cursor: [data version, search rank, votes, candidate id] of the last row
+# served — the keyset get_candidates resumes after.
+CandidateKey = tuple[float, int, int]
+
+
+def _encode_cursor(version: int, key: CandidateKey) -> str:
+    raw = json.dumps([version, *key], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[int, CandidateKey]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        version, rank, votes, candidate_id = json.loads(raw)
+        if not all(isinstance(n, int) for n in (version, votes, candidate_id)):
+            raise TypeError
+        return version, (float(rank), votes, candidate_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+
 def get_candidates(
     conn: sqlite3.Connection,
     *,
@@ -246,67 +1168,141 @@ def get_candidates(
     q: str | None = None,
     page: int = 1,
     page_size: int = 50,
+    cursor: str | None = None,
+    include_total: bool = False,
 ) -> dict[str, Any]:
-    """Return a paginated list of candidates with optional filters."""
+    """
+    Return a page of candidates with optional filters, by votes. With `q`,
+    only candidates matching the full-text search (see _search_query), best
+    match first.
+
+    Pages are keyset-paginated on (search rank, votes, id): pass the previous
+    response's `next` cursor to continue, at the same cost as the first page.
+    `page` (offset paging) is still honoured when no cursor is given. Cursors
+    are pinned to data_version; one issued before the results last changed is
+    still followed but the response is flagged `stale`, as rows may have
+    moved across pages since. Raises ValueError for an unparseable cursor.
+
+    `total` comes from party_totals when only `party` (or nothing) filters,
+    from the constituency index with `constituency`; a full-text match is only
+    counted with include_total, otherwise `total` is None.
+    """
     clauses: list[str] = []
     params: list[Any] = []
+    rank = "0"
+    order = "v.votes DESC, v.candidate_id"  # idx_candidate_votes_votes
+    search_join = ""
 
     if party:
-        clauses.append("c.party = ?")
+        clauses.append("p.party = ?")
         params.append(party)
     if constituency:
-        clauses.append("c.constituency_code = ?")
+        clauses.append("v.constituency_code = ?")
         params.append(constituency)
     if q:
-        clauses.append("c.name LIKE ?")
-        params.append(f"%{q}%")
+        match = _search_query(q)
+        if match is None:
+            return {
+                "total": 0,
+                "page": page,
+                "pageSize": page_size,
+                "next": None,
+                "version": get_data_version(conn),
+                "items": [],
+            }
+        search_join = "JOIN candidate_search ON candidate_search.rowid = v.candidate_id "
+        clauses.append("candidate_search MATCH ?")
+        params.append(match)
+        rank = f"bm25(candidate_search, {_SEARCH_WEIGHTS})"
+        order = "search_rank, " + order
 
-    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
-    base_sql = (
-        "SELECT c.id, c.name, c.party, c.votes, "
-        "c.constituency_code, con.name AS const_name, con.province, con.district, "
-        "con.status AS const_status "
-        "FROM candidates c "
-        "JOIN constituencies con ON con.code = c.constituency_code "
-        f"{where}"
+    from_sql = (
+        "FROM candidate_votes v "
+        "JOIN candidate_profile p ON p.id = v.candidate_id "
+        "JOIN constituencies con ON con.code = v.constituency_code "
+        "JOIN constituency_status s ON s.code = v.constituency_code "
+        + search_join
     )
+    filter_where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    filter_params = list(params)
 
-    total_row = conn.execute(
-        f"SELECT COUNT(*) AS n FROM candidates c "
-        f"JOIN constituencies con ON con.code = c.constituency_code {where}",
-        params,
-    ).fetchone()
-    total = total_row["n"] if total_row else 0
-
+    pinned: int | None = None
     offset = (page - 1) * page_size
-    rows = conn.execute(
-        base_sql + " ORDER BY c.votes DESC LIMIT ? OFFSET ?",
-        params + [page_size, offset],
-    ).fetchall()
+    if cursor is not None:
+        pinned, (after_rank, after_votes, after_id) = _decode_cursor(cursor)
+        offset = 0
+        if q:
+            clauses.append(f"({rank}, -v.votes, v.candidate_id) > (?, ?, ?)")
+            params += [after_rank, -after_votes, after_id]
+        else:
+            clauses.append("(v.votes < ? OR (v.votes = ? AND v.candidate_id > ?))")
+            params += [after_votes, after_votes, after_id]
+    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
 
-    # Determine winners: top-vote-getter in DECLARED constituencies
-    declared_winners: dict[str, int] = {}
-    for row in rows:
-        code = row["constituency_code"]
-        if row["const_status"] == "DECLARED" and code not in declared_winners:
-            top = conn.execute(
-                "SELECT id FROM candidates WHERE constituency_code=? ORDER BY votes DESC LIMIT 1",
-                (code,),
-            ).fetchone()
-            if top:
-                declared_winners[code] = top["id"]
+    # One statement for the data version and, where it is cheap, the total.
+    if q and not include_total:
+        head_sql, head_params = "SELECT version, NULL AS n FROM data_version", []
+    elif not q and not constituency:
+        head_sql = (
+            "SELECT (SELECT version FROM data_version) AS version, "
+            "COALESCE(SUM(candidates), 0) AS n FROM party_totals"
+            + (" WHERE party = ?" if party else "")
+        )
+        head_params = [party] if party else []
+    else:
+        head_sql = (
+            f"SELECT (SELECT version FROM data_version) AS version, COUNT(*) AS n {from_sql} {filter_where}"
+        )
+        head_params = filter_params
 
-    return {
+    with _read_snapshot(conn):
+        head = conn.execute(head_sql, head_params).fetchone()
+        version, total = head[0], head[1]
+
+        # Winners are ranked only within the constituencies that appear on the
+        # page: rank 1 in a DECLARED constituency.
+        rows = conn.execute(
+            f"""
+            WITH page AS MATERIALIZED (
+                SELECT p.id, p.name, p.party, v.votes,
+                       v.constituency_code, con.name AS const_name, con.province, con.district,
+                       s.status AS const_status, {rank} AS search_rank
+                {from_sql}
+                {where}
+                ORDER BY {order}
+                LIMIT ? OFFSET ?
+            ),
+            ranked AS (
+                {_RANKED_CANDIDATES}
+                WHERE constituency_code IN (SELECT constituency_code FROM page)
+            )
+            SELECT page.*, (page.const_status = 'DECLARED' AND ranked.rank = 1) AS is_winner
+            FROM page
+            JOIN ranked ON ranked.id = page.id
+            ORDER BY page.search_rank, page.votes DESC, page.id
+            """,
+            params + [page_size + 1, offset],
+        ).fetchall()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = _encode_cursor(version, (last["search_rank"], last["votes"], last["id"]))
+
+    result = {
         "total": total,
         "page": page,
         "pageSize": page_size,
+        "next": next_cursor,
+        "version": version,
         "items": [
             {
                 "id":               row["id"],
                 "name":             row["name"],
                 "party":            row["party"],
                 "votes":            row["votes"],
-                "isWinner":         declared_winners.get(row["constituency_code"]) == row["id"],
+                "isWinner":         bool(row["is_winner"]),
                 "constituencyCode": row["constituency_code"],
                 "constituencyName": row["const_name"],
                 "province":         row["province"],
@@ -315,3 +1311,6 @@ def get_candidates(
             for row in rows
         ],
     }
+    if pinned is not None and pinned != version:
+        result["stale"] = True
+    return result
@@ -1,24 +1,45 @@
 import asyncio
+import json
 import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from datetime import datetime
+from typing import Any, AsyncGenerator, Callable
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
+from broadcast import ConnectionManager, Patch, StateFeed, encode_message
 from database import (
-    init_db,
+    Database,
     get_constituencies,
     get_constituency_by_id,
+    get_constituency_history,
     get_parties,
+    get_provinces,
     get_candidate_by_id,
+    get_candidate_history,
     get_candidates,
     get_latest_snapshot,
+    get_live_state,
+    get_snapshot_history,
     save_constituency_results,
     save_snapshot,
 )
-from scraper import UPSTREAM_URL, scrape_results
+from response_cache import ResponseCache
+from scraper import (
+    UNCHANGED,
+    UPSTREAM_URL,
+    Changeset,
+    close_session,
+    reset_fetch_state,
+    scrape_results,
+    session_stats,
+)
+from stream import EventStream, sse_frame
 
 load_dotenv()
 
@@ -37,48 +58,45 @@ _cors_env = os.getenv("CORS_ORIGINS", "http://localhost:5173,https://nepalvotes.
 CORS_ORIGINS: list[str] = [o.strip() for o in _cors_env.split(",") if o.strip()]
 
 
-class ConnectionManager:
-    def __init__(self) -> None:
-        self._connections: list[WebSocket] = []
-
-    async def connect(self, ws: WebSocket) -> None:
-        await ws.accept()
-        self._connections.append(ws)
-
-    def disconnect(self, ws: WebSocket) -> None:
-        if ws in self._connections:
-            self._connections.remove(ws)
-
-    async def broadcast(self, data: dict) -> None:
-        dead: list[WebSocket] = []
-        for ws in list(self._connections):
-            try:
-                await ws.send_json(data)
-            except Exception:
-                dead.append(ws)
-        for ws in dead:
-            self.disconnect(ws)
-
-
-def create_app(db=None, start_scraper: bool = True) -> FastAPI:
+def create_app(db: Database | sqlite3.Connection | None = None, start_scraper: bool = True) -> FastAPI:
     """
     Factory so tests can inject an in-memory db and skip the scraper loop.
+
+    The scraper writes through db.writer; every request borrows a read-only
+    connection from the pool, so reads are served from the last committed
+    state while a scrape cycle is writing. The whole-table endpoints are
+    served from app.state.cache, which the scraper invalidates after each
+    persisted cycle; anything else that writes to db must call cache.bump().
     """
+    owned = db is None
     if db is None:
-        db = init_db(DB_PATH)
+        db = Database.open(DB_PATH)
+    elif isinstance(db, sqlite3.Connection):
+        db = Database(db)
 
     manager = ConnectionManager()
+    stream = EventStream()
+    cache = ResponseCache()
+    # SQLite writes are blocking; they go through one dedicated thread, which
+    # is also what makes the writer connection single-writer.
+    writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
 
     @asynccontextmanager
     async def lifespan(app: FastAPI) -> AsyncGenerator:
         task = None
         if start_scraper:
-            task = asyncio.create_task(_scraper_loop(db, manager))
+            task = asyncio.create_task(_scraper_loop(db, manager, stream, cache, writer_executor))
         yield
         if task:
             task.cancel()
+        await manager.close()
+        await close_session()
+        writer_executor.shutdown(wait=True)
+        if owned:
+            db.close()
 
     app = FastAPI(lifespan=lifespan)
+    app.state.cache = cache
     app.add_middleware(
         CORSMiddleware,
         allow_origins=CORS_ORIGINS,
@@ -86,24 +104,51 @@ def create_app(db=None, start_scraper: bool = True) -> FastAPI:
         allow_headers=["*"],
     )
 
+    @app.get("/api/health")
+    def health():
+        return {"upstream": session_stats()}
+
     @app.get("/api/snapshot")
-    def snapshot():
-        return get_latest_snapshot(db)
+    def snapshot(request: Request):
+        return cache.respond(request, "snapshot", lambda: _read(db, get_latest_snapshot))
+
+    @app.get("/api/snapshots")
+    def snapshots(
+        start: datetime | None = Query(default=None, alias="from"),
+        end: datetime | None = Query(default=None, alias="to"),
+        step: int = Query(default=300, ge=30, le=86400),
+    ):
+        with db.reader() as conn:
+            return get_snapshot_history(conn, start=start, end=end, step=step)
 
     @app.get("/api/constituencies")
-    def constituencies():
-        return get_constituencies(db)
+    def constituencies(request: Request):
+        return cache.respond(request, "constituencies", lambda: _read(db, get_constituencies))
+
+    # Registered before the catch-all detail route: codes may contain "/".
+    @app.get("/api/constituencies/{code:path}/history")
+    def constituency_history(code: str):
+        with db.reader() as conn:
+            result = get_constituency_history(conn, code)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Constituency not found")
+        return result
 
     @app.get("/api/constituencies/{code:path}")
     def constituency_detail(code: str):
-        result = get_constituency_by_id(db, code)
+        with db.reader() as conn:
+            result = get_constituency_by_id(conn, code)
         if result is None:
             raise HTTPException(status_code=404, detail="Constituency not found")
         return result
 
     @app.get("/api/parties")
-    def parties():
-        return get_parties(db)
+    def parties(request: Request):
+        return cache.respond(request, "parties", lambda: _read(db, get_parties))
+
+    @app.get("/api/provinces")
+    def provinces(request: Request):
+        return cache.respond(request, "provinces", lambda: _read(db, get_provinces))
 
     @app.get("/api/candidates")
     def candidates_list(
@@ -111,41 +156,165 @@ def create_app(db=None, start_scraper: bool = True) -> FastAPI:
         constituency: str | None = Query(default=None),
         q: str | None = Query(default=None),
         page: int = Query(default=1, ge=1),
+        cursor: str | None = Query(default=None),
+        include_total: bool = Query(default=False),
     ):
-        return get_candidates(db, party=party, constituency=constituency, q=q, page=page)
+        try:
+            with db.reader() as conn:
+                return get_candidates(
+                    conn,
+                    party=party,
+                    constituency=constituency,
+                    q=q,
+                    page=page,
+                    cursor=cursor,
+                    include_total=include_total,
+                )
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
 
     @app.get("/api/candidates/{candidate_id}")
     def candidate_detail(candidate_id: int):
-        result = get_candidate_by_id(db, candidate_id)
+        with db.reader() as conn:
+            result = get_candidate_by_id(conn, candidate_id)
         if result is None:
             raise HTTPException(status_code=404, detail="Candidate not found")
         return result
 
+    @app.get("/api/candidates/{candidate_id}/history")
+    def candidate_history(candidate_id: int):
+        with db.reader() as conn:
+            result = get_candidate_history(conn, candidate_id)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Candidate not found")
+        return result
+
+    def build_sse_state(_version: int) -> tuple[int, bytes]:
+        state = _read(db, get_live_state)
+        return state["version"], sse_frame({"type": "state", **state}, state["version"])
+
+    async def sse_state() -> tuple[int, bytes]:
+        return await asyncio.to_thread(cache.memo, "sse-state", build_sse_state)
+
+    @app.get("/api/stream")
+    async def stream_events(last_event_id: str | None = Header(default=None)):
+        return StreamingResponse(
+            stream.events(last_event_id, sse_state),
+            media_type="text/event-stream",
+            # X-Accel-Buffering: keep nginx-style proxies from holding events back.
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    def build_state(_version: int) -> tuple[int, str]:
+        state = _read(db, get_live_state)
+        return state["version"], encode_message({"type": "state", **state})
+
+    async def send_state(ws: WebSocket) -> None:
+        # Encoded once per data change, however many clients (re)connect.
+        version, frame = await asyncio.to_thread(cache.memo, "ws-state", build_state)
+        manager.send_frame(ws, "state", frame, version=version)
+
     @app.websocket("/ws")
     async def websocket_endpoint(ws: WebSocket):
         await manager.connect(ws)
         try:
-            # Push current state immediately on connect
-            await ws.send_json({"type": "snapshot",      "data": get_latest_snapshot(db)})
-            await ws.send_json({"type": "constituencies", "data": get_constituencies(db)})
+            # Full state on connect; the scraper loop pushes patches after that.
+            await send_state(ws)
             while True:
-                await ws.receive_text()  # keep-alive; client can send pings
+                message = _client_message(await ws.receive_text())
+                kind = message.get("type")
+                if kind == "resync":
+                    await send_state(ws)
+                elif kind in ("subscribe", "unsubscribe"):
+                    topics = message.get("topics")
+                    topics = topics if isinstance(topics, list) else []
+                    update = manager.subscribe if kind == "subscribe" else manager.unsubscribe
+                    manager.send_frame(
+                        ws, "subscribed", encode_message({"type": "subscribed", "topics": update(ws, topics)})
+                    )
         except WebSocketDisconnect:
+            pass
+        finally:
             manager.disconnect(ws)
 
     return app
 
 
-async def _scraper_loop(db, manager: ConnectionManager) -> None:
-    """Run scraper every SCRAPE_INTERVAL seconds and broadcast results."""
+def _read(db: Database, query: Callable[[sqlite3.Connection], Any]) -> Any:
+    with db.reader() as conn:
+        return query(conn)
+
+
+def _client_message(text: str) -> dict[str, Any]:
+    """A client → server message; anything unparseable (e.g. pings) is ignored."""
+    try:
+        message = json.loads(text)
+    except ValueError:
+        return {}
+    return message if isinstance(message, dict) else {}
+
+
+def _persist_cycle(
+    db: Database, aggregate: dict[str, Any], changes: Changeset, feed: StateFeed
+) -> tuple[dict[str, int], Patch | None]:
+    """
+    Write one scrape cycle and diff the committed state against the last one
+    pushed. Only the constituencies in `changes` are serialised and written
+    (all of them for a full changeset), and only those are read back and
+    diffed for the patch. Runs on the writer thread; returns (rows written,
+    patch to broadcast or None when nothing changed).
+    """
+    constituencies = [
+        c.to_dict() for c in aggregate["constituencies"]
+        if changes.full or c.code in changes.constituencies
+    ]
+    with db.writing() as conn:
+        # The fused pass's snapshot: its seat tally uses the same rank-1 rule
+        # and party keys as the party_totals written below.
+        save_snapshot(conn, aggregate["snapshot"])
+        written = save_constituency_results(conn, constituencies, changes)
+    codes = None if changes.full else changes.constituencies
+    state = _read(db, lambda conn: get_live_state(conn, codes))
+    return written, feed.advance(state, partial=codes is not None)
+
+
+async def _scraper_loop(
+    db: Database,
+    manager: ConnectionManager,
+    stream: EventStream,
+    cache: ResponseCache,
+    writer_executor: ThreadPoolExecutor,
+) -> None:
+    """
+    Run scraper every SCRAPE_INTERVAL seconds and broadcast a patch of what
+    changed. Parsing runs on the scraper's parse thread, persistence and
+    diffing on writer_executor; the event loop only awaits them and
+    broadcasts.
+    """
+    loop = asyncio.get_running_loop()
+    feed = StateFeed()
+    await loop.run_in_executor(writer_executor, lambda: feed.reset(_read(db, get_live_state)))
     while True:
         try:
-            constituencies, snapshot = await scrape_results(SCRAPE_URL)
-            save_snapshot(db, snapshot)
-            save_constituency_results(db, constituencies)
-            await manager.broadcast({"type": "snapshot",      "data": get_latest_snapshot(db)})
-            await manager.broadcast({"type": "constituencies", "data": get_constituencies(db)})
+            result = await scrape_results(SCRAPE_URL)
+            if result is UNCHANGED:
+                print("[scraper] upstream unchanged — skipping save and broadcast")
+            else:
+                aggregate, changes = result
+                print(f"[scraper] changes: {changes.summary()}")
+                written, patch = await loop.run_in_executor(
+                    writer_executor, _persist_cycle, db, aggregate, changes, feed
+                )
+                cache.bump()
+                print(
+                    "[scraper] db rows written: "
+                    + ", ".join(f"{n} {kind}" for kind, n in written.items())
+                )
+                if patch is not None:
+                    await manager.publish(patch)
+                    stream.publish(patch)
         except Exception as exc:
+            reset_fetch_state()
             print(f"[scraper] error: {exc}")
         await asyncio.sleep(SCRAPE_INTERVAL)
 
@@ -0,0 +1,169 @@
+"""
+models.py — Compact in-memory model for parsed constituencies and candidates.
+
+The scraper keeps these between cycles (IncrementalParser) instead of the
+frontend's camelCase dicts: slotted objects carry no per-instance __dict__,
+and the static part of each candidate (names, party, gender, bio fields)
+lives in a CandidateBio that is interned per CandidateID and shared by
+reference for as long as upstream keeps sending the same values. Only votes
+and the winner flag are per-cycle state.
+
+The frontend dict shape (frontend/src/types.ts) is produced at serialisation
+time — to_dict() for callers that want plain dicts, json_default() as the
+json.dumps hook so constituencies.json is written straight from the model.
+"""
+
+from operator import attrgetter
+from typing import Any
+
+
+# Optional bio fields: (slot, camelCase key). None means absent upstream.
+_OPTIONAL_BIO = (
+    ("age",           "age"),
+    ("father_name",   "fatherName"),
+    ("spouse_name",   "spouseName"),
+    ("qualification", "qualification"),
+    ("institution",   "institution"),
+    ("experience",    "experience"),
+    ("address",       "address"),
+)
+BIO_FIELDS = ("name", "name_np", "party_name", "gender", *(slot for slot, _ in _OPTIONAL_BIO))
+_bio_values = attrgetter(*BIO_FIELDS)
+
+
+class CandidateBio:
+    """
+    Per-candidate fields that do not change between scrape cycles, in
+    BIO_FIELDS order. Construct with CandidateBio(*values).
+    """
+
+    __slots__ = BIO_FIELDS
+
+    def __init__(self, *values: Any) -> None:
+        for slot, value in zip(BIO_FIELDS, values):
+            setattr(self, slot, value)
+
+
+_bios: dict[int, CandidateBio] = {}
+
+
+def intern_bio(candidate_id: int | None, values: tuple[Any, ...]) -> CandidateBio:
+    """
+    Return the shared CandidateBio for this candidate (`values` in BIO_FIELDS
+    order), replacing it only when upstream changed one of the fields — e.g.
+    a corrected qualification.
+    """
+    if candidate_id is None:
+        return CandidateBio(*values)
+    bio = _bios.get(candidate_id)
+    if bio is None or _bio_values(bio) != values:
+        bio = _bios[candidate_id] = CandidateBio(*values)
+    return bio
+
+
+def reset_bios() -> None:
+    _bios.clear()
+
+
+class Candidate:
+    __slots__ = ("candidate_id", "party_id", "votes", "is_winner", "bio")
+
+    def __init__(
+        self,
+        candidate_id: int | None,
+        party_id: str,
+        votes: int,
+        is_winner: bool,
+        bio: CandidateBio,
+    ) -> None:
+        self.candidate_id = candidate_id
+        self.party_id = party_id
+        self.votes = votes
+        self.is_winner = is_winner
+        self.bio = bio
+
+    def to_dict(self) -> dict[str, Any]:
+        bio = self.bio
+        out: dict[str, Any] = {
+            "candidateId": self.candidate_id,
+            "name":        bio.name,
+            "nameNp":      bio.name_np,
+            "partyId":     self.party_id,
+            "partyName":   bio.party_name,
+            "votes":       self.votes,
+            "gender":      bio.gender,
+            "isWinner":    self.is_winner,
+        }
+        for slot, key in _OPTIONAL_BIO:
+            value = getattr(bio, slot)
+            if value is not None:
+                out[key] = value
+        return out
+
+
+class Constituency:
+    __slots__ = (
+        "code", "province", "district", "district_np", "name", "name_np",
+        "status", "last_updated", "votes_cast", "candidates",
+    )
+
+    def __init__(
+        self,
+        code: str,
+        province: str,
+        district: str,
+        district_np: str,
+        name: str,
+        name_np: str,
+        status: str,
+        last_updated: str,
+        votes_cast: int,
+        candidates: list[Candidate],
+    ) -> None:
+        self.code = code
+        self.province = province
+        self.district = district
+        self.district_np = district_np
+        self.name = name
+        self.name_np = name_np
+        self.status = status
+        self.last_updated = last_updated
+        self.votes_cast = votes_cast
+        self.candidates = candidates
+
+    def restamped(self, last_updated: str) -> "Constituency":
+        """Same results with a new lastUpdated; shares the candidate list."""
+        return Constituency(
+            self.code, self.province, self.district, self.district_np,
+            self.name, self.name_np, self.status, last_updated,
+            self.votes_cast, self.candidates,
+        )
+
+    def _fields(self, candidates: list[Any]) -> dict[str, Any]:
+        return {
+            "code":        self.code,
+            "province":    self.province,
+            "district":    self.district,
+            "districtNp":  self.district_np,
+            "name":        self.name,
+            "nameNp":      self.name_np,
+            "status":      self.status,
+            "lastUpdated": self.last_updated,
+            "votesCast":   self.votes_cast,
+            "candidates":  candidates,
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return self._fields([c.to_dict() for c in self.candidates])
+
+
+def json_default(obj: Any) -> Any:
+    """
+    json.dumps(default=…) hook: serialises models one level at a time, so the
+    full dict tree of constituencies.json never exists in memory at once.
+    """
+    if isinstance(obj, Constituency):
+        return obj._fields(obj.candidates)
+    if isinstance(obj, Candidate):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -4,15 +4,18 @@ publish_to_r2.py — Single-shot script run by GitHub Actions every minute.
 Flow:
   1. Fetch upstream election JSON from result.election.gov.np (server-side — no CORS)
   2. Validate minimum record count
-  3. Parse raw records directly into the exact JSON shapes the frontend expects:
+  3. Aggregate raw records in one pass (scraper.aggregate_records) into the
+     exact JSON shapes the frontend expects:
        constituencies.json  →  ConstituencyResult[]
        snapshot.json        →  Snapshot
        parties.json         →  { party, seatsWon, totalVotes }[]
+       provinces.json       →  per-province seat / counting totals
   4. Upload to Cloudflare R2
 
-The parser here mirrors frontend/src/lib/parseUpstreamData.ts exactly.
-Do NOT use scraper.py's parse_candidates_json — its output shape is wrong for
-direct frontend consumption (snake_case keys, missing fields, wrong partyId).
+worker.py publishes through the same aggregation, so both paths emit
+identical files. Winners are upstream's official E_STATUS flag only; a
+rank-1 candidate with votes (R == 1) is not promoted while the flag is
+missing. Constituencies whose STATE_ID maps to no province are skipped.
 
 Required environment variables (set as GitHub Actions secrets):
   R2_ACCOUNT_ID         Cloudflare account ID (hex string)
@@ -36,7 +39,8 @@ import boto3
 import httpx
 from botocore.config import Config
 
-from district_names import district_name_en
+from models import json_default
+from scraper import aggregate_records
 
 # ── Config ────────────────────────────────────────────────────────────────────
 
@@ -50,186 +54,6 @@ HEADERS = {
 MIN_RECORDS = 3000
 CACHE_CONTROL = "public, max-age=25"
 
-# ── Province + district lookup tables (mirrors parseUpstreamData.ts) ──────────
-
-STATE_TO_PROVINCE: dict[int, str] = {
-    1: "Koshi",
-    2: "Madhesh",
-    3: "Bagmati",
-    4: "Gandaki",
-    5: "Lumbini",
-    6: "Karnali",
-    7: "Sudurpashchim",
-}
-
-INDEPENDENT_NP = "स्वतन्त्र"
-
-
-# ── Helpers (mirror parseUpstreamData.ts) ─────────────────────────────────────
-
-def district_en(np_name: str, state_id: int) -> str:
-    return district_name_en(np_name, state_id)
-
-
-def derive_party_id(rec: dict[str, Any]) -> str:
-    """String(SYMBOLCODE), or 'IND' for independents."""
-    if rec.get("PoliticalPartyName") == INDEPENDENT_NP:
-        return "IND"
-    return str(rec.get("SYMBOLCODE", "0"))
-
-
-def is_winner(rec: dict[str, Any]) -> bool:
-    if rec.get("E_STATUS") == "W":
-        return True
-    # Fallback: treat rank-1 candidate with votes as winner when official flag is missing.
-    if rec.get("R") == 1 and rec.get("TotalVoteReceived", 0) > 0:
-        return True
-    return False
-
-
-def map_gender(g: str | None) -> str:
-    return "F" if g == "महिला" else "M"
-
-
-def optional_str(val: Any, empty_sentinels: tuple = ("-", "0", "")) -> str | None:
-    if val is None:
-        return None
-    s = str(val).strip()
-    return s if s not in empty_sentinels else None
-
-
-# ── Parser (produces ConstituencyResult[] matching frontend types.ts) ──────────
-
-def parse_raw_records(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    """
-    Converts the flat upstream candidate array into ConstituencyResult[].
-
-    Output shape matches frontend ConstituencyResult type exactly:
-      code, name, nameNp, province, district, districtNp,
-      status, lastUpdated, votesCast, candidates[]
-
-    Each candidate matches frontend Candidate type:
-      candidateId, name, nameNp, partyName, partyId,
-      votes, gender, isWinner, + optional bio fields
-    """
-    grouped: dict[str, list[dict[str, Any]]] = {}
-    for rec in records:
-        key = f"{rec['STATE_ID']}-{rec['DistrictName']}-{rec['SCConstID']}"
-        grouped.setdefault(key, []).append(rec)
-
-    now = datetime.now(timezone.utc).isoformat()
-    results: list[dict[str, Any]] = []
-
-    for key, recs in grouped.items():
-        first = recs[0]
-        state_id   = first["STATE_ID"]
-        province   = STATE_TO_PROVINCE.get(state_id)
-        if not province:
-            continue
-
-        district_np = first["DistrictName"]
-        district    = district_en(district_np, state_id)
-        const_num   = first["SCConstID"]
-
-        has_winner = any(is_winner(r) for r in recs)
-        has_votes  = any(r.get("TotalVoteReceived", 0) > 0 for r in recs)
-        status = "DECLARED" if has_winner else ("COUNTING" if has_votes else "PENDING")
-
-        candidates: list[dict[str, Any]] = []
-        for rec in recs:
-            cand: dict[str, Any] = {
-                "candidateId": rec.get("CandidateID"),
-                "nameNp":      rec.get("CandidateName", ""),
-                "name":        rec.get("CandidateName", ""),
-                "partyName":   rec.get("PoliticalPartyName", ""),
-                "partyId":     derive_party_id(rec),
-                "votes":       rec.get("TotalVoteReceived", 0),
-                "gender":      map_gender(rec.get("Gender")),
-                "isWinner":    is_winner(rec),
-            }
-            # Biographical fields — only include when present and meaningful
-            if (v := optional_str(rec.get("AGE_YR"))):       cand["age"]           = int(v)
-            if (v := optional_str(rec.get("FATHER_NAME"))): cand["fatherName"]    = v
-            if (v := optional_str(rec.get("SPOUCE_NAME"))): cand["spouseName"]    = v
-            if (v := optional_str(rec.get("QUALIFICATION"))): cand["qualification"] = v
-            if (v := optional_str(rec.get("NAMEOFINST"))):  cand["institution"]   = v
-            if (v := optional_str(rec.get("EXPERIENCE"))):  cand["experience"]    = v
-            if (v := optional_str(rec.get("ADDRESS"))):     cand["address"]       = v
-            candidates.append(cand)
-
-        votes_cast = sum(c["votes"] for c in candidates)
-
-        results.append({
-            "province":    province,
-            "district":    district,
-            "districtNp":  district_np,
-            "code":        key,
-            "name":        f"{district}-{const_num}",
-            "nameNp":      f"{district_np} क्षेत्र नं. {const_num}",
-            "status":      status,
-            "lastUpdated": now,
-            "votesCast":   votes_cast,
-            "candidates":  candidates,
-        })
-
-    # Sort: province → district → name (mirrors TypeScript sort)
-    results.sort(key=lambda r: (r["province"], r["district"], r["name"]))
-    return results
-
-
-# ── Snapshot builder ───────────────────────────────────────────────────────────
-
-def build_snapshot(constituencies: list[dict[str, Any]]) -> dict[str, Any]:
-    """
-    Produces a Snapshot matching frontend types.ts:
-      totalSeats, declaredSeats, lastUpdated, seatTally
-    seatTally keys are partyId strings (SYMBOLCODE or "IND").
-    """
-    tally: dict[str, dict[str, int]] = {}
-    declared = 0
-
-    for c in constituencies:
-        if c["status"] != "DECLARED" or not c["candidates"]:
-            continue
-        declared += 1
-        winner = max(c["candidates"], key=lambda x: x["votes"])
-        pid = winner["partyId"]
-        if pid not in tally:
-            tally[pid] = {"fptp": 0, "pr": 0}
-        tally[pid]["fptp"] += 1
-
-    return {
-        "totalSeats":    275,
-        "declaredSeats": declared,
-        "lastUpdated":   datetime.now(timezone.utc).isoformat(),
-        "seatTally":     tally,
-    }
-
-
-# ── Party aggregation ──────────────────────────────────────────────────────────
-
-def build_parties(constituencies: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    seat_counts: dict[str, int] = {}
-    total_votes: dict[str, int] = {}
-
-    for c in constituencies:
-        for cand in c.get("candidates", []):
-            pid = cand["partyId"]
-            total_votes[pid] = total_votes.get(pid, 0) + cand["votes"]
-        if c["status"] == "DECLARED" and c.get("candidates"):
-            winner = max(c["candidates"], key=lambda x: x["votes"])
-            pid = winner["partyId"]
-            seat_counts[pid] = seat_counts.get(pid, 0) + 1
-
-    all_pids = set(seat_counts) | set(total_votes)
-    parties = [
-        {"party": p, "seatsWon": seat_counts.get(p, 0), "totalVotes": total_votes.get(p, 0)}
-        for p in all_pids
-    ]
-    parties.sort(key=lambda x: (-x["seatsWon"], -x["totalVotes"]))
-    return parties
-
-
 # ── Fetch ─────────────────────────────────────────────────────────────────────
 
 async def fetch_raw(url: str) -> list[dict[str, Any]]:
@@ -257,7 +81,7 @@ def make_r2_client():
 
 
 def upload_json(client, bucket: str, filename: str, data: object) -> None:
-    body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    body = json.dumps(data, ensure_ascii=False, default=json_default).encode("utf-8")
     client.put_object(
         Bucket=bucket,
         Key=filename,
@@ -288,10 +112,11 @@ def main() -> int:
         print(f"  ERROR: only {n} records (expected ≥ {MIN_RECORDS}) — aborting", file=sys.stderr)
         return 1
 
-    # 3. Parse into frontend-compatible shapes
-    constituencies = parse_raw_records(raw_records)
-    snapshot       = build_snapshot(constituencies)
-    parties        = build_parties(constituencies)
+    # 3. Aggregate into frontend-compatible shapes
+    aggregate      = aggregate_records(raw_records)
+    constituencies = aggregate["constituencies"]
+    snapshot       = aggregate["snapshot"]
+    parties        = aggregate["parties"]
 
     print(
         f"  parsed: {len(constituencies)} constituencies, "
@@ -306,11 +131,12 @@ def main() -> int:
         upload_json(client, bucket, "snapshot.json",       snapshot)
         upload_json(client, bucket, "constituencies.json", constituencies)
         upload_json(client, bucket, "parties.json",        parties)
+        upload_json(client, bucket, "provinces.json",      aggregate["provinces"])
     except Exception as exc:
         print(f"  ERROR upload: {exc}", file=sys.stderr)
         return 1
 
-    print("  done — all 3 files published successfully")
+    print("  done — all 4 files published successfully")
     return 0
 
 
@@ -22,6 +22,8 @@ import os
 import boto3
 from botocore.config import Config
 
+from models import json_default
+
 _client = None
 
 
@@ -47,12 +49,13 @@ def _get_client():
 
 def upload_json(filename: str, data: object) -> None:
     """
-    Serialise `data` to JSON and upload to R2 as `filename`.
+    Serialise `data` to JSON and upload to R2 as `filename`. Constituency /
+    Candidate models (models.py) are serialised directly.
 
     Raises on any boto3 / network error — caller is responsible for catching.
     """
     bucket = os.environ["R2_BUCKET"]
-    body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    body = json.dumps(data, ensure_ascii=False, default=json_default).encode("utf-8")
 
     _get_client().put_object(
         Bucket=bucket,
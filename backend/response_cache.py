@@ -0,0 +1,160 @@
+"""
+response_cache.py — Pre-serialised, versioned responses for the hot read
+endpoints.
+
+/api/snapshot, /api/constituencies, /api/parties and /api/provinces only
+change when a scrape cycle commits, yet every request re-ran their queries
+and the JSON encoder. ResponseCache keeps each endpoint's encoded body,
+tagged with the cache version it was built at; the scraper bumps the version
+after every persisted cycle, and the next request for an endpoint rebuilds
+it once. Everything in between is a dict lookup.
+
+Each body carries a strong ETag (a hash of its bytes, so it is stable across
+restarts and workers) and is compressed lazily, once per version: gzip
+always, brotli when the optional `brotli` package is installed. Requests
+whose If-None-Match matches get an empty 304.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # optional dependency — gzip only
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 6
+# Bodies smaller than this are not worth compressing.
+MIN_COMPRESS_BYTES = 512
+
+T = TypeVar("T")
+
+
+def encode_json(payload: Any) -> bytes:
+    """Encode exactly like FastAPI's JSONResponse."""
+    return json.dumps(
+        payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class CachedBody:
+    """One encoded response body and its compressed variants."""
+
+    __slots__ = ("version", "body", "etag", "_variants", "_lock")
+
+    def __init__(self, version: int, body: bytes) -> None:
+        self.version = version
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self._variants: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def variant(self, encoding: str) -> bytes:
+        """The body compressed with `encoding` ("gzip" or "br"), built once."""
+        compressed = self._variants.get(encoding)
+        if compressed is None:
+            with self._lock:
+                compressed = self._variants.get(encoding)
+                if compressed is None:
+                    if encoding == "br":
+                        compressed = brotli.compress(self.body, quality=BROTLI_QUALITY)
+                    else:
+                        compressed = gzip.compress(self.body, GZIP_LEVEL, mtime=0)
+                    self._variants[encoding] = compressed
+        return compressed
+
+    def etag_for(self, encoding: str | None) -> str:
+        # Each representation needs its own strong validator.
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+
+def _accepted(header: str) -> set[str]:
+    """Content codings the client accepts (q=0 excluded)."""
+    accepted: set[str] = set()
+    for part in header.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q=") and q[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        accepted.add(coding.strip())
+    return accepted
+
+
+def _matches(if_none_match: str, etags: tuple[str, ...]) -> bool:
+    """Weak comparison (RFC 9110 §13.1.2) of an If-None-Match header."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return any(etag in candidates for etag in etags)
+
+
+class ResponseCache:
+    def __init__(self) -> None:
+        self.version = 0
+        self._entries: dict[str, tuple[int, Any]] = {}
+        self._build_locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def bump(self) -> int:
+        """Invalidate every entry: the data changed. Returns the new version."""
+        with self._lock:
+            self.version += 1
+            return self.version
+
+    def get(self, key: str, build: Callable[[], Any]) -> CachedBody:
+        """
+        The cached body for `key` at the current version, calling build() and
+        encoding its result on a miss. Concurrent misses for one key build once.
+        """
+        return self.memo(key, lambda version: CachedBody(version, encode_json(build())))
+
+    def memo(self, key: str, build: Callable[[int], T]) -> T:
+        """Any value derived from the data, built once per version: build(version)."""
+        version = self.version
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            value = build(version)
+            self.builds += 1
+            self._entries[key] = (version, value)
+            return value
+
+    def respond(self, request: Request, key: str, build: Callable[[], Any]) -> Response:
+        """Serve `key` with ETag/304 and the best encoding the client accepts."""
+        entry = self.get(key, build)
+        encoding = None
+        if len(entry.body) >= MIN_COMPRESS_BYTES:
+            accepted = _accepted(request.headers.get("accept-encoding", ""))
+            if brotli is not None and "br" in accepted:
+                encoding = "br"
+            elif "gzip" in accepted:
+                encoding = "gzip"
+        headers = {
+            "ETag": entry.etag_for(encoding),
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, (entry.etag_for(encoding), entry.etag)):
+            return Response(status_code=304, headers=headers)
+        if encoding is None:
+            return Response(entry.body, media_type="application/json", headers=headers)
+        headers["Content-Encoding"] = encoding
+        return Response(entry.variant(encoding), media_type="application/json", headers=headers)
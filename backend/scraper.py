@@ -10,16 +10,23 @@ Primary endpoint: GET /Handlers/SecureJson.ashx?file=JSONFiles/ElectionResultCen
   - Update frequency: every ~30 s on election day.
 
 Two-step fetch: GET the page first to establish session cookies, then GET data.
+The session (cookies + keep-alive connections) is kept across scrape cycles.
 """
 
+import hashlib
 import json
 import os
 import asyncio
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 import httpx
 from datetime import datetime, timezone
 from typing import Any
 
 from district_names import district_name_en
+from models import Candidate, Constituency, intern_bio, json_default  # noqa: F401 — json_default re-exported
 
 
 # ── NEU English name lookup ───────────────────────────────────────────────────
@@ -62,6 +69,15 @@ UPSTREAM_HOR_WINNER_URL = (
     "?file=JSONFiles/Election2082/Common/HOR-T5Winner.json"
 )
 HOR_TOP5_REFERER_URL = "https://result.election.gov.np/FPTPWLChartResult2082.aspx"
+# Optional feeds are fetched concurrently with the primary one. Each gets a
+# deadline measured from when the upstream session is established (so a slow
+# bootstrap does not eat into it); a feed that has not arrived by then is
+# cancelled and the primary data is published without it. They are merged only
+# when the primary data came through the secure handler.
+OPTIONAL_FEED_TIMEOUTS: dict[str, float] = {
+    UPSTREAM_HOR_MERGE_URL:  float(os.getenv("UPSTREAM_HOR_LEADER_TIMEOUT_SECONDS", "2.0")),
+    UPSTREAM_HOR_WINNER_URL: float(os.getenv("UPSTREAM_HOR_WINNER_TIMEOUT_SECONDS", "2.0")),
+}
 _BASE_HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -70,11 +86,104 @@ _BASE_HEADERS = {
     ),
     "Accept": "application/json, text/javascript, */*; q=0.01",
 }
+# Hedged requests: when enabled, the best-scoring source is tried first and the
+# remaining sources (direct JSON file + any mirrors) fire in parallel once it has
+# been silent for longer than HEDGE_PERCENTILE of its recent latencies.
+HEDGE_ENABLED = os.getenv("UPSTREAM_HEDGE", "").strip().lower() in {"1", "true", "yes"}
+HEDGE_PERCENTILE = float(os.getenv("UPSTREAM_HEDGE_PERCENTILE", "90"))
+HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("UPSTREAM_HEDGE_DEFAULT_DELAY_SECONDS", "1.5"))
+HEDGE_MIN_DELAY_SECONDS = 0.2
+HEDGE_MIN_SAMPLES = 5
+# Once one source returns a valid payload, the others get this long to answer
+# with something fresher before being cancelled.
+HEDGE_SETTLE_SECONDS = 0.25
+# Extra plain-GET mirrors of ElectionResultCentral2082.txt (comma-separated).
+MIRROR_URLS: tuple[str, ...] = tuple(
+    u.strip() for u in os.getenv("UPSTREAM_MIRROR_URLS", "").split(",") if u.strip()
+)
 RETRYABLE_STATUS = {429, 500, 502, 503, 504, 520, 521, 522, 523, 524}
+# Upstream answers these when the ASP.NET session or CSRF token is no longer valid.
+AUTH_FAILURE_STATUS = {401, 403}
 MAX_FETCH_ATTEMPTS = 3
 RETRY_BACKOFF_SECONDS = 0.5
 # Keep old name for backwards compat in tests
 HEADERS = _BASE_HEADERS
+NOT_MODIFIED = 304
+
+
+# ── Conditional fetch state ──────────────────────────────────────────────────
+# Between counting updates upstream serves byte-identical payloads. For every
+# feed URL we remember the HTTP validators (ETag / Last-Modified) plus a digest
+# and copy of the last body, so an unchanged cycle can be detected before any
+# JSON decoding. The digest of every feed that fed the last published cycle is
+# kept as the cycle signature (the candidate feed under PRIMARY_FEED, whichever
+# source served it); a matching signature means nothing changed.
+class _Unchanged:
+    """Sentinel type for UNCHANGED."""
+
+    def __repr__(self) -> str:
+        return "UNCHANGED"
+
+
+# Returned by fetch_candidates() / scrape_results() when upstream has not
+# changed since the last successful cycle. Callers should skip parsing,
+# DB writes, broadcasts and uploads entirely.
+UNCHANGED = _Unchanged()
+
+PRIMARY_FEED = "primary"
+
+_feed_state: dict[str, dict[str, Any]] = {}
+_last_signature: tuple[tuple[str, str], ...] | None = None
+
+
+def reset_fetch_state() -> None:
+    """
+    Forget the last published cycle so the next fetch is treated as changed.
+    Call this when a cycle fails after fetching (e.g. a DB or upload error),
+    otherwise the next identical payload would be skipped as UNCHANGED.
+    HTTP validators are kept — a 304 still reuses the cached body. The change
+    tracker and incremental parser are reset too, so the next cycle reports a
+    full changeset and rebuilds every constituency.
+    """
+    global _last_signature
+    _last_signature = None
+    _tracker.reset()
+    _parser.reset()
+
+
+def _conditional_headers(url: str) -> dict[str, str]:
+    state = _feed_state.get(url)
+    if not state:
+        return {}
+    headers: dict[str, str] = {}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+    return headers
+
+
+def _feed_body(url: str, resp: httpx.Response) -> tuple[bytes, str]:
+    """
+    Resolve the body for a feed response and remember it for the next cycle.
+    A 304 reuses the cached body; otherwise the raw bytes are hashed.
+    Returns (body, digest).
+    """
+    state = _feed_state.get(url)
+    if resp.status_code == NOT_MODIFIED:
+        if not state:
+            raise RuntimeError(f"{url} returned 304 without a cached body")
+        return state["body"], state["digest"]
+
+    body = resp.content
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    _feed_state[url] = {
+        "etag":          resp.headers.get("ETag", ""),
+        "last_modified": resp.headers.get("Last-Modified", ""),
+        "digest":        digest,
+        "body":          body,
+    }
+    return body, digest
 
 # ── Party name → frontend PartyKey mapping ───────────────────────────────────
 # Exact Nepali strings from the upstream JSON field "PoliticalPartyName".
@@ -277,6 +386,214 @@ def _vote_total(rec: dict[str, Any]) -> int | None:
     return votes
 
 
+# ── Schema-specialised record extraction ─────────────────────────────────────
+# The helpers above try every known key spelling through _to_int for every
+# record. Within one payload the layout never changes, so RecordExtractor
+# detects it once from a sample record and reads the right key directly,
+# accepting the value when it is already an int. Anything else (missing key,
+# string, float, a record shaped differently from the sample) falls through to
+# the generic helper, so results are always identical to the slow path.
+_FIELD_KEYS: dict[str, tuple[str, ...]] = {
+    "state_id":     ("STATE_ID", "State"),
+    "const_id":     ("SCConstID", "ScConstId"),
+    "candidate_id": ("CandidateID", "CandidateId"),
+    "votes":        ("TotalVoteReceived", "TotalVote"),
+    "age":          ("AGE_YR", "Age"),
+    "party_code":   ("SYMBOLCODE", "SymbolID", "SymbolId", "PartyID", "PartyId"),
+}
+
+
+def _age(rec: dict[str, Any]) -> int | None:
+    age = _to_int(rec.get("AGE_YR"))
+    if age is None:
+        age = _to_int(rec.get("Age"))
+    return age
+
+
+def _party_code(rec: dict[str, Any]) -> int | None:
+    for key in _FIELD_KEYS["party_code"]:
+        code = _to_int(rec.get(key))
+        if code is not None:
+            return code
+    return None
+
+
+_GENERIC_GETTERS: dict[str, Any] = {
+    "state_id":     _state_id,
+    "const_id":     _const_id,
+    "candidate_id": _candidate_id,
+    "votes":        _vote_total,
+    "age":          _age,
+    "party_code":   _party_code,
+}
+
+
+def _schema_key(field: str, sample: dict[str, Any]) -> tuple[str | None, tuple[str, ...]]:
+    """
+    Pick the spelling of `field` used by this payload: the first alternative
+    holding an int in the sample. Returns (key, higher-priority spellings) —
+    a record carrying any of the latter must take the generic path to keep
+    the generic helpers' precedence. (None, ()) means no usable spelling.
+    """
+    keys = _FIELD_KEYS[field]
+    for idx, key in enumerate(keys):
+        if type(sample.get(key)) is int:
+            return key, keys[:idx]
+    return None, ()
+
+
+def _candidate_generic(rec: dict[str, Any]) -> Candidate:
+    """Build one Candidate using the generic field helpers."""
+    name_np = rec.get("CandidateName") or ""
+    cid_int = _candidate_id(rec)
+    neu = _NEU.get(cid_int) if cid_int is not None else None
+    name_en = neu["n"] if neu and neu.get("n") else name_np
+    bio = intern_bio(cid_int, (
+        name_en,
+        name_np,
+        rec.get("PoliticalPartyName") or "",
+        _gender(rec),
+        *_bio_extra(rec, _age(rec)),
+    ))
+    return Candidate(cid_int, _derive_party_id(rec), _vote_total(rec) or 0, is_winner(rec), bio)
+
+
+def _present(value: Any, placeholder: str) -> Any:
+    return value if value and value != placeholder else None
+
+
+def _bio_extra(rec: dict[str, Any], age: int | None) -> tuple[Any, ...]:
+    """Optional biographical fields in models.BIO_FIELDS order — None when absent or placeholder."""
+    get = rec.get
+    return (
+        age or None,
+        _present(get("FATHER_NAME"), "-"),
+        _present(get("SPOUCE_NAME"), "-"),
+        _present(get("QUALIFICATION"), "0"),
+        _present(get("NAMEOFINST"), "0"),
+        _present(get("EXPERIENCE"), "0"),
+        _present(get("ADDRESS"), "0"),
+    )
+
+
+def _int_getter(field: str, sample: dict[str, Any]):
+    generic = _GENERIC_GETTERS[field]
+    key, higher = _schema_key(field, sample)
+    if key is None:
+        return generic
+
+    def getter(rec: dict[str, Any]) -> int | None:
+        value = rec.get(key)
+        if type(value) is not int or (higher and any(rec.get(h) is not None for h in higher)):
+            return generic(rec)
+        return value
+    return getter
+
+
+class RecordExtractor:
+    """
+    Field accessors for one upstream payload layout (see extractor_for).
+
+    The per-field accessors (state_id, votes, …) serve the change tracker and
+    merges; constituency_id() and candidate() are the parse hot path and read
+    every field in a single call with the layout's keys bound in.
+    """
+
+    __slots__ = (*_FIELD_KEYS, "constituency_id", "candidate")
+
+    def __init__(self, sample: dict[str, Any] | None = None) -> None:
+        if sample is None:
+            for field, getter in _GENERIC_GETTERS.items():
+                setattr(self, field, getter)
+            self.constituency_id = constituency_id
+            self.candidate = _candidate_generic
+            return
+        for field in _FIELD_KEYS:
+            setattr(self, field, _int_getter(field, sample))
+        self._bind_hot_path(sample)
+
+    def _bind_hot_path(self, sample: dict[str, Any]) -> None:
+        k_state, h_state = _schema_key("state_id", sample)
+        k_const, h_const = _schema_key("const_id", sample)
+        k_cid, h_cid = _schema_key("candidate_id", sample)
+        k_votes, h_votes = _schema_key("votes", sample)
+        k_age, h_age = _schema_key("age", sample)
+        k_party, h_party = _schema_key("party_code", sample)
+        neu = _NEU
+        party_ids = _PARTY_IDS
+
+        def shadowed(get, higher: tuple[str, ...]) -> bool:
+            return any(get(h) is not None for h in higher)
+
+        def const_key(rec: dict[str, Any]) -> str:
+            get = rec.get
+            state_id = get(k_state)
+            if type(state_id) is not int or (h_state and shadowed(get, h_state)):
+                state_id = _state_id(rec)
+            const_id = get(k_const)
+            if type(const_id) is not int or (h_const and shadowed(get, h_const)):
+                const_id = _const_id(rec)
+            district_name = (get("DistrictName") or get("District") or "").strip()
+            if state_id is None or const_id is None or not district_name:
+                return ""
+            return f"{state_id}-{district_name}-{const_id}"
+
+        def candidate(rec: dict[str, Any]) -> Candidate:
+            get = rec.get
+            cid = get(k_cid)
+            if type(cid) is not int or (h_cid and shadowed(get, h_cid)):
+                cid = _candidate_id(rec)
+            votes = get(k_votes)
+            if type(votes) is not int or (h_votes and shadowed(get, h_votes)):
+                votes = _vote_total(rec)
+            party_name = get("PoliticalPartyName") or ""
+            if party_name == "स्वतन्त्र":
+                party_id = "IND"
+            else:
+                code = get(k_party)
+                if type(code) is not int or (h_party and shadowed(get, h_party)):
+                    code = _party_code(rec)
+                party_id = party_ids.get(code)
+                if party_id is None:
+                    party_id = party_ids[code] = "0" if code is None else str(code)
+            age = get(k_age)
+            if type(age) is not int or (h_age and shadowed(get, h_age)):
+                age = _age(rec)
+            name_np = get("CandidateName") or ""
+            entry = neu.get(cid) if cid is not None else None
+            bio = intern_bio(cid, (
+                entry["n"] if entry and entry.get("n") else name_np,
+                name_np,
+                party_name,
+                "F" if get("Gender") == "महिला" else "M",
+                *_bio_extra(rec, age),
+            ))
+            return Candidate(cid, party_id, votes or 0, get("E_STATUS") in _WINNER_STATUS, bio)
+
+        self.constituency_id = const_key
+        self.candidate = candidate
+
+
+GENERIC_EXTRACTOR = RecordExtractor()
+_PARTY_IDS: dict[int | None, str] = {}  # SYMBOLCODE → shared partyId string
+_extractors: dict[frozenset[str], RecordExtractor] = {}
+
+
+def extractor_for(records: list[dict[str, Any]]) -> RecordExtractor:
+    """
+    Return the extractor specialised for this payload's layout, detected from
+    its first record and cached per schema signature (the record's key set).
+    """
+    if not records or not isinstance(records[0], dict):
+        return GENERIC_EXTRACTOR
+    sample = records[0]
+    signature = frozenset(sample)
+    extractor = _extractors.get(signature)
+    if extractor is None:
+        extractor = _extractors[signature] = RecordExtractor(sample)
+    return extractor
+
+
 def _merge_higher_votes(
     base_records: list[dict[str, Any]],
     fresher_rows: list[dict[str, Any]],
@@ -376,6 +693,10 @@ def _decode_json_bytes(raw: bytes, label: str) -> Any:
         raise RuntimeError(f"{label} returned invalid JSON") from exc
 
 
+class UpstreamAuthError(RuntimeError):
+    """Upstream rejected the request (401/403) — the session must be re-bootstrapped."""
+
+
 async def _get_with_retry(
     client: httpx.AsyncClient,
     url: str,
@@ -397,6 +718,10 @@ async def _get_with_retry(
         if resp.status_code in RETRYABLE_STATUS and attempt < MAX_FETCH_ATTEMPTS:
             await asyncio.sleep(RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1)))
             continue
+        if resp.status_code == NOT_MODIFIED:
+            return resp
+        if resp.status_code in AUTH_FAILURE_STATUS:
+            raise UpstreamAuthError(f"{label} returned HTTP {resp.status_code}: {resp.reason_phrase}")
 
         try:
             resp.raise_for_status()
@@ -437,7 +762,332 @@ async def _establish_session(client: httpx.AsyncClient) -> tuple[str, str]:
     raise RuntimeError("failed to establish upstream session: cookies missing")
 
 
-def parse_candidates_json(raw_candidates: list[dict[str, Any]]) -> list[dict[str, Any]]:
+# ── Persistent upstream session ──────────────────────────────────────────────
+# One long-lived client per process: keeps the ASP.NET_SessionId / CsrfToken
+# cookies and keep-alive connections across scrape cycles instead of paying a
+# TLS handshake plus a bootstrap page GET every 30 s.
+SESSION_MAX_AGE_SECONDS = float(os.getenv("UPSTREAM_SESSION_MAX_AGE_SECONDS", "1200"))
+# Must outlive the scrape interval, otherwise pooled connections are dropped
+# between cycles (httpx default is 5 s).
+KEEPALIVE_EXPIRY_SECONDS = 120.0
+USE_HTTP2 = os.getenv("UPSTREAM_HTTP2", "").strip().lower() in {"1", "true", "yes"}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class SourceHealth:
+    """
+    Rolling health record for one upstream source: an exponentially weighted
+    success rate plus a window of recent successful latencies.
+    """
+
+    WINDOW = 50
+    ALPHA = 0.2
+
+    def __init__(self) -> None:
+        self.success_rate = 1.0   # optimistic until proven otherwise
+        self.latencies: deque[float] = deque(maxlen=self.WINDOW)
+        self.successes = 0
+        self.failures = 0
+
+    def record(self, ok: bool, latency: float) -> None:
+        self.success_rate += self.ALPHA * ((1.0 if ok else 0.0) - self.success_rate)
+        if ok:
+            self.successes += 1
+            self.latencies.append(latency)
+        else:
+            self.failures += 1
+
+    def latency_percentile(self, pct: float) -> float | None:
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def score(self) -> float:
+        """Higher is better: success rate discounted by median latency."""
+        median = self.latency_percentile(50) or 0.0
+        return self.success_rate / (1.0 + median)
+
+    def stats(self) -> dict[str, Any]:
+        p50 = self.latency_percentile(50)
+        return {
+            "score":        round(self.score(), 3),
+            "successRate":  round(self.success_rate, 3),
+            "successes":    self.successes,
+            "failures":     self.failures,
+            "p50LatencyMs": round(p50 * 1000) if p50 is not None else None,
+        }
+
+
+class UpstreamSession:
+    """
+    Long-lived upstream client that owns the httpx connection pool and the
+    ASP.NET session cookies.
+
+    The session is bootstrapped lazily and re-bootstrapped only when upstream
+    answers 401/403, the CsrfToken cookie has expired, or the session is older
+    than SESSION_MAX_AGE_SECONDS.
+    """
+
+    def __init__(
+        self,
+        *,
+        transport: httpx.AsyncBaseTransport | None = None,
+        http2: bool | None = None,
+        max_age_seconds: float = SESSION_MAX_AGE_SECONDS,
+    ) -> None:
+        self._transport = transport
+        self._http2 = (USE_HTTP2 if http2 is None else http2) and _http2_available()
+        self._max_age_seconds = max_age_seconds
+        self._client: httpx.AsyncClient | None = None
+        self._lock = asyncio.Lock()
+        self.csrf = ""
+        self.bootstrap_url = ""
+        self.established_at: float | None = None
+        self.bootstraps = 0
+        self.rebootstrap_reasons: dict[str, int] = {}
+        self.requests = 0
+        self.health: dict[str, SourceHealth] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=30.0,
+                follow_redirects=True,
+                headers=_BASE_HEADERS,
+                http2=self._http2,
+                limits=httpx.Limits(keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS),
+                transport=self._transport,
+            )
+        return self._client
+
+    def age_seconds(self) -> float | None:
+        if self.established_at is None:
+            return None
+        return time.monotonic() - self.established_at
+
+    def _csrf_cookie_expired(self) -> bool:
+        for cookie in self.client.cookies.jar:
+            if cookie.name == "CsrfToken":
+                return cookie.is_expired()
+        return True
+
+    def _stale_reason(self) -> str | None:
+        if not self.csrf:
+            return "missing"
+        if self._csrf_cookie_expired():
+            return "csrf_expired"
+        age = self.age_seconds()
+        if age is not None and age > self._max_age_seconds:
+            return "max_age"
+        return None
+
+    def invalidate(self, reason: str) -> None:
+        """Drop the current session so the next request re-bootstraps."""
+        if self.csrf:
+            self.rebootstrap_reasons[reason] = self.rebootstrap_reasons.get(reason, 0) + 1
+        self.csrf = ""
+        self.client.cookies.clear()
+
+    async def ensure(self) -> None:
+        async with self._lock:
+            reason = self._stale_reason()
+            if reason is None:
+                return
+            if reason != "missing":
+                self.invalidate(reason)
+            self.csrf, self.bootstrap_url = await _establish_session(self.client)
+            self.established_at = time.monotonic()
+            self.bootstraps += 1
+            if self.bootstraps > 1:
+                print(f"[scraper] upstream session re-bootstrapped ({reason})")
+
+    async def get(self, url: str, *, headers: dict[str, str], label: str) -> httpx.Response:
+        """Plain GET on the shared client (no session required)."""
+        self.requests += 1
+        return await _get_with_retry(self.client, url, headers=headers, label=label)
+
+    async def get_secure(
+        self, url: str, *, headers: dict[str, str], label: str, reauth: bool = True
+    ) -> httpx.Response:
+        """
+        GET through the secure handler with the session cookies + CSRF header.
+        A 401/403 invalidates the session and retries once with a fresh one —
+        unless another request already replaced the session this one used, or
+        reauth=False (optional feeds: their auth failures just raise, so they
+        never tear down the session under the primary request).
+        """
+        for attempt in (1, 2):
+            await self.ensure()
+            csrf = self.csrf
+            try:
+                return await self.get(
+                    url,
+                    headers={
+                        "X-CSRF-Token": csrf,
+                        "X-Requested-With": "XMLHttpRequest",
+                        "Referer": self.bootstrap_url,
+                        **headers,
+                    },
+                    label=label,
+                )
+            except UpstreamAuthError:
+                if attempt == 2 or not reauth:
+                    raise
+                if self.csrf == csrf:
+                    self.invalidate("auth")
+        raise RuntimeError(f"{label} failed after re-bootstrap")  # unreachable
+
+    def source_health(self, url: str) -> SourceHealth:
+        if url not in self.health:
+            self.health[url] = SourceHealth()
+        return self.health[url]
+
+    def rank_sources(self, urls: list[str]) -> list[str]:
+        """Order sources best-first by health score (stable for ties)."""
+        return sorted(urls, key=lambda u: -self.source_health(u).score())
+
+    def hedge_delay(self, url: str) -> float:
+        """How long to wait on `url` before firing the hedge requests."""
+        budget = self.source_health(url).latency_percentile(HEDGE_PERCENTILE)
+        if budget is None:
+            return HEDGE_DEFAULT_DELAY_SECONDS
+        return max(budget, HEDGE_MIN_DELAY_SECONDS)
+
+    def stats(self) -> dict[str, Any]:
+        age = self.age_seconds()
+        return {
+            "sessionAgeSeconds":  round(age, 1) if age is not None else None,
+            "bootstraps":         self.bootstraps,
+            "rebootstraps":       sum(self.rebootstrap_reasons.values()),
+            "rebootstrapReasons": dict(self.rebootstrap_reasons),
+            "requests":           self.requests,
+            "http2":              self._http2,
+            "sources":            {url: h.stats() for url, h in self.health.items()},
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self.csrf = ""
+        self.established_at = None
+
+
+_session: UpstreamSession | None = None
+
+
+def get_session() -> UpstreamSession:
+    """Return the process-wide upstream session, creating it on first use."""
+    global _session
+    if _session is None:
+        _session = UpstreamSession()
+    return _session
+
+
+def session_stats() -> dict[str, Any]:
+    """Session age and bootstrap counters for the process-wide session."""
+    if _session is None:
+        return UpstreamSession().stats()
+    return _session.stats()
+
+
+async def close_session() -> None:
+    global _session
+    if _session is not None:
+        await _session.aclose()
+        _session = None
+
+
+def _group_by_constituency(
+    raw_candidates: list[dict[str, Any]],
+    ex: RecordExtractor,
+) -> dict[str, list[dict[str, Any]]]:
+    grouped: dict[str, list[dict[str, Any]]] = {}
+    for rec in raw_candidates:
+        cid = ex.constituency_id(rec)
+        if not cid:
+            continue
+        grouped.setdefault(cid, []).append(rec)
+    return grouped
+
+
+# Per-constituency contribution to the aggregates: (seat holder or None,
+# partyId → votes). Cached next to each built constituency so unchanged
+# constituencies never have to be walked again.
+ConstituencySummary = tuple[Candidate | None, dict[str, int]]
+
+
+def _seat_holder(candidates: list[Candidate]) -> Candidate:
+    """
+    The candidate a DECLARED constituency's seat is counted for: most votes,
+    then lowest CandidateID — the rank-1 rule database.py's party_totals use.
+    """
+    return min(candidates, key=lambda c: (-c.votes, c.candidate_id or 0))
+
+
+def _build_constituency(
+    cid: str,
+    recs: list[dict[str, Any]],
+    now: str,
+    ex: RecordExtractor,
+) -> tuple[Constituency, ConstituencySummary]:
+    first = recs[0]
+    state_id    = ex.state_id(first) or 0
+    district_np = first.get("DistrictName") or first.get("District") or ""
+    district_en = _district_en(district_np, state_id)
+    const_num   = ex.const_id(first) or 0
+    province    = _state_id_to_province_key(state_id)
+
+    candidates: list[Candidate] = []
+    party_votes: dict[str, int] = {}
+    declared = False
+    votes_cast = 0
+    has_votes = False
+    for rec in recs:
+        cand = ex.candidate(rec)
+        candidates.append(cand)
+        votes = cand.votes
+        votes_cast += votes
+        if votes > 0:
+            has_votes = True
+        party_id = cand.party_id
+        party_votes[party_id] = party_votes.get(party_id, 0) + votes
+        if cand.is_winner:
+            declared = True
+
+    status = "DECLARED" if declared else ("COUNTING" if has_votes else "PENDING")
+
+    built = Constituency(
+        code=cid,
+        province=province,
+        district=district_en,
+        district_np=district_np,
+        name=f"{district_en}-{const_num}",
+        name_np=f"{district_np} क्षेत्र नं. {const_num}",
+        status=status,
+        last_updated=now,
+        votes_cast=votes_cast,
+        candidates=candidates,
+    )
+    return built, (_seat_holder(candidates) if declared else None, party_votes)
+
+
+def parse_candidates_json(
+    raw_candidates: list[dict[str, Any]],
+    *,
+    now: str | None = None,
+    extractor: RecordExtractor | None = None,
+) -> list[dict[str, Any]]:
     """
     Transform the raw upstream candidate records into ConstituencyResult[] shape
     as defined in frontend/src/types.ts.
@@ -453,99 +1103,198 @@ def parse_candidates_json(raw_candidates: list[dict[str, Any]]) -> list[dict[str
       candidateId, name, nameNp, partyId, partyName, votes, gender, isWinner
       + optional: age, fatherName, spouseName, qualification, institution,
                   experience, address
+
+    `now` overrides the lastUpdated timestamp (defaults to the current time).
+    `extractor` overrides the field accessors (defaults to extractor_for()).
     """
-    grouped: dict[str, list[dict[str, Any]]] = {}
-    for rec in raw_candidates:
-        cid = constituency_id(rec)
-        if not cid:
-            continue
-        grouped.setdefault(cid, []).append(rec)
+    if now is None:
+        now = datetime.now(timezone.utc).isoformat()
+    ex = extractor or extractor_for(raw_candidates)
+    return [
+        _build_constituency(cid, recs, now, ex)[0].to_dict()
+        for cid, recs in _group_by_constituency(raw_candidates, ex).items()
+    ]
 
-    results: list[dict[str, Any]] = []
-    now = datetime.now(timezone.utc).isoformat()
-
-    for cid, recs in grouped.items():
-        first = recs[0]
-        state_id    = _state_id(first) or 0
-        district_np = first.get("DistrictName") or first.get("District") or ""
-        district_en = _district_en(district_np, state_id)
-        const_num   = _const_id(first) or 0
-        province    = _state_id_to_province_key(state_id)
-
-        candidates: list[dict[str, Any]] = []
-        for rec in recs:
-            name_np = rec.get("CandidateName") or ""
-            cid_int = _candidate_id(rec)
-            neu = _NEU.get(cid_int) if cid_int is not None else None
-            name_en = neu["n"] if neu and neu.get("n") else name_np
-            cand: dict[str, Any] = {
-                "candidateId": cid_int,
-                "name":        name_en,
-                "nameNp":      name_np,
-                "partyId":     _derive_party_id(rec),
-                "partyName":   rec.get("PoliticalPartyName") or "",
-                "votes":       _vote_total(rec) or 0,
-                "gender":      _gender(rec),
-                "isWinner":    is_winner(rec),
+
+class IncrementalParser:
+    """
+    Stateful parse_candidates_json() that reuses constituencies whose raw
+    records are identical to the previous call's and rebuilds only the rest.
+    parse() output is identical to a full parse_candidates_json() with the
+    same `now`. build_all() returns the Constituency models themselves;
+    unchanged constituencies share their candidate lists with the previous
+    result, so callers must treat them as read-only.
+    """
+
+    def __init__(self) -> None:
+        self._cache: dict[
+            str, tuple[list[dict[str, Any]], Constituency, ConstituencySummary]
+        ] = {}
+        self.rebuilt = 0
+        self.reused = 0
+
+    def reset(self) -> None:
+        self._cache.clear()
+
+    def parse(
+        self,
+        raw_candidates: list[dict[str, Any]],
+        *,
+        now: str | None = None,
+    ) -> list[dict[str, Any]]:
+        return [built.to_dict() for built, _summary in self.build_all(raw_candidates, now=now)]
+
+    def build_all(
+        self,
+        raw_candidates: list[dict[str, Any]],
+        *,
+        now: str | None = None,
+    ) -> list[tuple[Constituency, ConstituencySummary]]:
+        """Like parse(), but returns the models, each paired with its summary."""
+        if now is None:
+            now = datetime.now(timezone.utc).isoformat()
+        ex = extractor_for(raw_candidates)
+        cache: dict[str, tuple[list[dict[str, Any]], Constituency, ConstituencySummary]] = {}
+        results: list[tuple[Constituency, ConstituencySummary]] = []
+        self.rebuilt = self.reused = 0
+        for cid, recs in _group_by_constituency(raw_candidates, ex).items():
+            cached = self._cache.get(cid)
+            if cached is not None and cached[0] == recs:
+                built, summary = cached[1].restamped(now), cached[2]
+                self.reused += 1
+            else:
+                built, summary = _build_constituency(cid, recs, now, ex)
+                self.rebuilt += 1
+            cache[cid] = (recs, built, summary)
+            results.append((built, summary))
+        self._cache = cache
+        return results
+
+
+_parser = IncrementalParser()
+
+
+# ── Fused aggregation ────────────────────────────────────────────────────────
+# One engine for every publisher (worker.py, publish_to_r2.py, the API scraper
+# loop): a single walk over the records yields the constituencies plus the
+# snapshot, party and province aggregates, using the per-constituency
+# summaries instead of re-scanning candidates with max() for each output.
+TOTAL_SEATS = 275
+
+
+def aggregate_records(
+    raw_candidates: list[dict[str, Any]],
+    *,
+    now: str | None = None,
+    parser: IncrementalParser | None = None,
+) -> dict[str, Any]:
+    """
+    Build every published view of the upstream records in one pass.
+
+    Returns a dict with the frontend shapes (frontend/src/types.ts):
+      constituencies  Constituency models (models.py) sorted by province →
+                      district → name; they become ConstituencyResult[] via
+                      to_dict() or json.dumps(default=json_default)
+      snapshot        Snapshot — totalSeats, declaredSeats, lastUpdated,
+                      seatTally keyed by party key (map_party_key)
+      parties         { party, seatsWon, totalVotes }[] keyed by partyId,
+                      sorted by seats then votes
+      provinces       { province, constituencies, declared, counting,
+                      votesCast, seatTally }[] in STATE_ID order, seatTally
+                      keyed by party key
+
+    A constituency is DECLARED once upstream flags an official winner (see
+    is_winner()); its seat goes to its rank-1 candidate (see _seat_holder()),
+    the same rule and party key the API's party_totals use, so the snapshot
+    and /api/parties always agree.
+    Constituencies whose STATE_ID maps to no province are left out: no
+    frontend view can place them.
+    Pass `parser` to reuse unchanged constituencies from the previous call.
+    """
+    if now is None:
+        now = datetime.now(timezone.utc).isoformat()
+    if parser is not None:
+        pairs = parser.build_all(raw_candidates, now=now)
+    else:
+        ex = extractor_for(raw_candidates)
+        pairs = [
+            _build_constituency(cid, recs, now, ex)
+            for cid, recs in _group_by_constituency(raw_candidates, ex).items()
+        ]
+
+    constituencies: list[Constituency] = []
+    seat_counts: dict[str, int] = {}  # partyId → seats
+    seat_tally: dict[str, int] = {}   # party key → seats
+    total_votes: dict[str, int] = {}
+    provinces: dict[str, dict[str, Any]] = {}
+    declared = 0
+
+    for built, (holder, party_votes) in pairs:
+        if built.province == UNKNOWN_PROVINCE:
+            continue
+        constituencies.append(built)
+        for party_id, votes in party_votes.items():
+            total_votes[party_id] = total_votes.get(party_id, 0) + votes
+
+        prov = provinces.get(built.province)
+        if prov is None:
+            prov = provinces[built.province] = {
+                "province":       built.province,
+                "constituencies": 0,
+                "declared":       0,
+                "counting":       0,
+                "votesCast":      0,
+                "seatTally":      {},
             }
-            # Optional biographical fields — omit when absent or placeholder
-            age = _to_int(rec.get("AGE_YR"))
-            if age is None:
-                age = _to_int(rec.get("Age"))
-            if age:
-                cand["age"] = age
-            father = rec.get("FATHER_NAME", "")
-            if father and father != "-":
-                cand["fatherName"] = father
-            spouse = rec.get("SPOUCE_NAME", "")
-            if spouse and spouse != "-":
-                cand["spouseName"] = spouse
-            qual = rec.get("QUALIFICATION", "")
-            if qual and qual != "0":
-                cand["qualification"] = qual
-            inst = rec.get("NAMEOFINST", "")
-            if inst and inst != "0":
-                cand["institution"] = inst
-            exp = rec.get("EXPERIENCE", "")
-            if exp and exp != "0":
-                cand["experience"] = exp
-            addr = rec.get("ADDRESS", "")
-            if addr and addr != "0":
-                cand["address"] = addr
-            candidates.append(cand)
-
-        has_winner = any(c["isWinner"] for c in candidates)
-        has_votes  = any(c["votes"] > 0 for c in candidates)
-        status     = "DECLARED" if has_winner else ("COUNTING" if has_votes else "PENDING")
-        votes_cast = sum(c["votes"] for c in candidates)
-
-        results.append({
-            "code":        cid,
-            "province":    province,
-            "district":    district_en,
-            "districtNp":  district_np,
-            "name":        f"{district_en}-{const_num}",
-            "nameNp":      f"{district_np} क्षेत्र नं. {const_num}",
-            "status":      status,
-            "lastUpdated": now,
-            "votesCast":   votes_cast,
-            "candidates":  candidates,
-        })
-
-    return results
+        prov["constituencies"] += 1
+        prov["votesCast"] += built.votes_cast
+
+        if holder is not None:
+            declared += 1
+            party_key = map_party_key(holder.bio.party_name or "")
+            seat_counts[holder.party_id] = seat_counts.get(holder.party_id, 0) + 1
+            seat_tally[party_key] = seat_tally.get(party_key, 0) + 1
+            prov["declared"] += 1
+            prov["seatTally"][party_key] = prov["seatTally"].get(party_key, 0) + 1
+        elif built.status == "COUNTING":
+            prov["counting"] += 1
+
+    constituencies.sort(key=lambda c: (c.province, c.district, c.name))
+    parties = [
+        {"party": p, "seatsWon": seat_counts.get(p, 0), "totalVotes": v}
+        for p, v in total_votes.items()
+    ]
+    parties.sort(key=lambda x: (-x["seatsWon"], -x["totalVotes"], x["party"]))
+    province_order = {name: i for i, name in enumerate(_PROVINCE_KEYS.values())}
+
+    return {
+        "constituencies": constituencies,
+        "snapshot": {
+            "totalSeats":    TOTAL_SEATS,
+            "declaredSeats": declared,
+            "lastUpdated":   now,
+            "seatTally":     {p: {"fptp": n, "pr": 0} for p, n in seat_tally.items()},
+        },
+        "parties":   parties,
+        "provinces": sorted(provinces.values(), key=lambda p: province_order.get(p["province"], 99)),
+    }
+
+
+UNKNOWN_PROVINCE = "Unknown"
+_PROVINCE_KEYS: dict[int, str] = {
+    1: "Koshi",
+    2: "Madhesh",
+    3: "Bagmati",
+    4: "Gandaki",
+    5: "Lumbini",
+    6: "Karnali",
+    7: "Sudurpashchim",
+}
 
 
 def _state_id_to_province_key(state_id: int) -> str:
     """Map STATE_ID (1–7) to the English province key used by the frontend."""
-    return {
-        1: "Koshi",
-        2: "Madhesh",
-        3: "Bagmati",
-        4: "Gandaki",
-        5: "Lumbini",
-        6: "Karnali",
-        7: "Sudurpashchim",
-    }.get(state_id, "Unknown")
+    return _PROVINCE_KEYS.get(state_id, UNKNOWN_PROVINCE)
 
 
 def build_snapshot_from_constituencies(
@@ -569,149 +1318,541 @@ def build_snapshot_from_constituencies(
 
     return {
         "taken_at":       datetime.now(timezone.utc).isoformat(),
-        "total_seats":    275,
+        "total_seats":    TOTAL_SEATS,
         "declared_seats": declared,
         "seat_tally":     seat_tally,
     }
 
 
-async def fetch_candidates(url: str = UPSTREAM_URL) -> list[dict[str, Any]]:
+# ── Change tracking ──────────────────────────────────────────────────────────
+# The upstream feed always returns every candidate. ChangeTracker remembers the
+# previous cycle's raw records keyed on CandidateID and reports what moved, so
+# downstream stages can do work proportional to the change instead of to all
+# ~3,400 records: main._persist_cycle serialises and writes only the changed
+# constituencies (save_constituency_results) and reads back only those for the
+# WebSocket patch (StateFeed.advance). A record counts as changed when
+# any of its fields differ (dict equality).
+class Changeset:
     """
-    Fetch the full candidate+results array from the upstream secure JSON handler.
-
-    Requires a two-step session establishment:
-    1. GET the results page to receive ASP.NET_SessionId + CsrfToken cookies.
-    2. GET the data endpoint with those cookies + X-CSRF-Token header.
+    What changed between two upstream payloads.
+
+      full            no previous payload to compare against — treat everything
+                      as changed
+      candidates      candidate id → (previous votes, votes) for every record
+                      that differs; previous votes is None for new candidates
+      constituencies  constituency ids containing a changed/added/removed record
+      new_winners     candidate ids newly flagged as official winners
+      lead_changes    constituency id → (previous leader id, leader id) where
+                      the top vote-getter changed hands
+      removed         candidate ids that disappeared from the payload
     """
-    async with httpx.AsyncClient(
-        timeout=30.0,
-        follow_redirects=True,
-        headers=_BASE_HEADERS,
-    ) as client:
-        used_secure = False
-        csrf = ""
 
-        try:
-            # Step 1 — establish session
-            csrf, bootstrap_url = await _establish_session(client)
-            # Step 2 — fetch data using session cookies
-            resp = await _get_with_retry(
-                client,
+    __slots__ = ("full", "candidates", "constituencies", "new_winners", "lead_changes", "removed")
+
+    def __init__(self, *, full: bool = False) -> None:
+        self.full = full
+        self.candidates: dict[int, tuple[int | None, int]] = {}
+        self.constituencies: set[str] = set()
+        self.new_winners: list[int] = []
+        self.lead_changes: dict[str, tuple[int, int]] = {}
+        self.removed: set[int] = set()
+
+    def __bool__(self) -> bool:
+        return self.full or bool(self.candidates or self.constituencies or self.removed)
+
+    def __repr__(self) -> str:
+        return f"Changeset({self.summary()})"
+
+    def summary(self) -> str:
+        if self.full:
+            return f"full, {len(self.constituencies)} constituencies"
+        return (
+            f"{len(self.candidates)} candidates, "
+            f"{len(self.constituencies)} constituencies, "
+            f"{len(self.new_winners)} new winners, "
+            f"{len(self.lead_changes)} lead changes"
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "full":           self.full,
+            "candidates":     {cid: list(v) for cid, v in self.candidates.items()},
+            "constituencies": sorted(self.constituencies),
+            "newWinners":     list(self.new_winners),
+            "leadChanges":    {code: list(v) for code, v in self.lead_changes.items()},
+            "removed":        sorted(self.removed),
+        }
+
+
+def _leader(records: list[dict[str, Any]], ex: RecordExtractor) -> int | None:
+    """Candidate id of the top vote-getter, or None before any votes are counted."""
+    best_id: int | None = None
+    best_votes = 0
+    for rec in records:
+        votes = ex.votes(rec) or 0
+        if votes > best_votes:
+            best_id, best_votes = ex.candidate_id(rec), votes
+    return best_id
+
+
+class ChangeTracker:
+    """Keeps the previous cycle's records and diffs each new payload against them."""
+
+    def __init__(self) -> None:
+        self._records: dict[int, dict[str, Any]] = {}
+        self._const_of: dict[int, str] = {}
+        self._leaders: dict[str, int | None] = {}
+        self._primed = False
+
+    def reset(self) -> None:
+        """Forget the previous payload; the next update() returns a full changeset."""
+        self.__init__()
+
+    def update(self, records: list[dict[str, Any]]) -> Changeset:
+        changes = Changeset(full=not self._primed)
+        ex = extractor_for(records)
+        current: dict[int, dict[str, Any]] = {}
+        const_of: dict[int, str] = {}
+        by_const: dict[str, list[dict[str, Any]]] = {}
+
+        for rec in records:
+            code = ex.constituency_id(rec)
+            if not code:
+                continue
+            by_const.setdefault(code, []).append(rec)
+            cid = ex.candidate_id(rec)
+            if cid is None:
+                # Untrackable record — always treat its constituency as changed.
+                changes.constituencies.add(code)
+                continue
+            current[cid] = rec
+            const_of[cid] = code
+            prev = self._records.get(cid)
+            if prev is not None and prev == rec:
+                continue
+            changes.constituencies.add(code)
+            if prev is not None and self._const_of.get(cid) != code:
+                changes.constituencies.add(self._const_of[cid])
+            changes.candidates[cid] = (
+                (ex.votes(prev) or 0) if prev is not None else None,
+                ex.votes(rec) or 0,
+            )
+            if is_winner(rec) and (prev is None or not is_winner(prev)):
+                changes.new_winners.append(cid)
+
+        for cid in self._records.keys() - current.keys():
+            changes.removed.add(cid)
+            changes.constituencies.add(self._const_of[cid])
+
+        if changes.full:
+            changes.constituencies.update(by_const)
+
+        leaders = dict(self._leaders)
+        for code in changes.constituencies:
+            leader = _leader(by_const.get(code, []), ex)
+            previous = self._leaders.get(code)
+            if previous is not None and leader is not None and leader != previous:
+                changes.lead_changes[code] = (previous, leader)
+            leaders[code] = leader
+        for code in leaders.keys() - by_const.keys():
+            del leaders[code]
+
+        self._records = current
+        self._const_of = const_of
+        self._leaders = leaders
+        self._primed = True
+        return changes
+
+
+_tracker = ChangeTracker()
+
+
+# ── Off-loop parsing ─────────────────────────────────────────────────────────
+# Decoding, merging and aggregating a payload is CPU-bound; done inline it
+# stalls every WebSocket and request sharing the event loop. It runs on one
+# dedicated thread instead. One, because _parser, _tracker and the bio cache
+# are module state touched by every cycle — which also rules out a process
+# pool, where that state would not survive the hop.
+
+_parse_executor: ThreadPoolExecutor | None = None
+
+
+def parse_executor() -> ThreadPoolExecutor:
+    global _parse_executor
+    if _parse_executor is None:
+        _parse_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="parse")
+    return _parse_executor
+
+
+async def run_parse(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run fn(*args) on the parse thread and await its result."""
+    return await asyncio.get_running_loop().run_in_executor(parse_executor(), fn, *args)
+
+
+def _decode_candidate_list(body: bytes, label: str) -> list[dict[str, Any]]:
+    payload = _decode_json_bytes(body, label)
+    if not isinstance(payload, list):
+        raise RuntimeError(f"{label} returned non-list payload")
+    return payload
+
+
+def _published_digest(feed: str) -> str | None:
+    return dict(_last_signature or ()).get(feed)
+
+
+async def _fetch_optional_feed(
+    session: UpstreamSession,
+    url: str,
+    *,
+    label: str,
+) -> tuple[bytes, str] | None:
+    """
+    Conditionally GET an optional feed within its OPTIONAL_FEED_TIMEOUTS
+    deadline, counted once the session is established. Returns (body, digest)
+    or None on failure or a missed deadline.
+    """
+    try:
+        await session.ensure()
+        async with asyncio.timeout(OPTIONAL_FEED_TIMEOUTS[url]):
+            resp = await session.get_secure(
                 url,
                 headers={
-                    "X-CSRF-Token": csrf,
-                    "X-Requested-With": "XMLHttpRequest",
-                    "Referer": bootstrap_url,
+                    "Referer": HOR_TOP5_REFERER_URL,
+                    **_conditional_headers(url),
                 },
+                label=label,
+                reauth=False,
+            )
+        return _feed_body(url, resp)
+    except TimeoutError:
+        print(f"[scraper] optional feed missed its deadline, skipped: {url}")
+        return None
+    except Exception:
+        return None
+
+
+async def _fetch_primary(
+    session: UpstreamSession,
+    url: str,
+) -> tuple[str, bytes, str, list[dict[str, Any]] | None]:
+    """
+    Fetch the primary candidate feed, falling back to the direct JSON file
+    when the secure handler fails. Returns (source_url, body, digest, records);
+    records is None when the body was already published (decoding deferred).
+    """
+    try:
+        resp = await session.get_secure(
+            url,
+            headers=_conditional_headers(url),
+            label="secure json GET",
+        )
+        body, digest = _feed_body(url, resp)
+        # Bytes that were already published decoded fine last time —
+        # only decode new bytes here so bad payloads still trigger fallback.
+        if digest == _published_digest(PRIMARY_FEED):
+            return url, body, digest, None
+        return url, body, digest, await run_parse(_decode_candidate_list, body, "secure json GET")
+    except Exception as secure_exc:
+        # Keep this fallback for resilience when the secure handler is flaky.
+        # Avoid swallowing errors for custom URLs.
+        if url != UPSTREAM_URL:
+            raise
+        print(f"[scraper] secure handler failed, trying direct JSON fallback: {secure_exc}")
+
+    fallback_resp = await session.get(
+        DIRECT_UPSTREAM_URL,
+        headers={
+            "Referer": SESSION_PAGE_URL,
+            **_conditional_headers(DIRECT_UPSTREAM_URL),
+        },
+        label="direct json GET",
+    )
+    body, digest = _feed_body(DIRECT_UPSTREAM_URL, fallback_resp)
+    if digest == _published_digest(PRIMARY_FEED):
+        return DIRECT_UPSTREAM_URL, body, digest, None
+    return DIRECT_UPSTREAM_URL, body, digest, await run_parse(_decode_candidate_list, body, "direct json GET")
+
+
+def _payload_freshness(records: list[dict[str, Any]]) -> tuple[int, int]:
+    """(total votes, declared winners) — both only ever grow during the count."""
+    ex = extractor_for(records)
+    total_votes = 0
+    winners = 0
+    for rec in records:
+        total_votes += ex.votes(rec) or 0
+        if is_winner(rec):
+            winners += 1
+    return total_votes, winners
+
+
+def _decode_with_freshness(body: bytes, label: str) -> tuple[list[dict[str, Any]], tuple[int, int]]:
+    records = _decode_candidate_list(body, label)
+    return records, _payload_freshness(records)
+
+
+async def _fetch_source(
+    session: UpstreamSession,
+    source_url: str,
+) -> tuple[str, bytes, str, list[dict[str, Any]] | None, tuple[int, int]]:
+    """
+    Fetch and validate one primary source, recording its health.
+    Returns (source_url, body, digest, records, freshness); records is None
+    when the body was already published and its freshness is known.
+    """
+    loop = asyncio.get_running_loop()
+    t0 = loop.time()
+    health = session.source_health(source_url)
+    try:
+        if source_url == UPSTREAM_URL:
+            resp = await session.get_secure(
+                source_url,
+                headers=_conditional_headers(source_url),
                 label="secure json GET",
             )
-            payload = _decode_json_bytes(resp.content, "secure json GET")
-            if not isinstance(payload, list):
-                raise RuntimeError("secure json GET returned non-list payload")
-            candidates = payload
-            used_secure = True
-        except Exception as secure_exc:
-            # Keep this fallback for resilience when the secure handler is flaky.
-            # Avoid swallowing errors for custom URLs.
-            if url != UPSTREAM_URL:
-                raise
-            print(f"[scraper] secure handler failed, trying direct JSON fallback: {secure_exc}")
-            fallback_resp = await _get_with_retry(
-                client,
-                DIRECT_UPSTREAM_URL,
-                headers={
-                    "Referer": SESSION_PAGE_URL,
-                },
-                label="direct json GET",
+        else:
+            resp = await session.get(
+                source_url,
+                headers={"Referer": SESSION_PAGE_URL, **_conditional_headers(source_url)},
+                label=f"mirror json GET {source_url}",
             )
-            fallback_payload = _decode_json_bytes(fallback_resp.content, "direct json GET")
-            if not isinstance(fallback_payload, list):
-                raise RuntimeError("direct json GET returned non-list payload")
-            candidates = fallback_payload
-
-        # Optional fast streams from the FPTP win/lead chart.
-        # Rule: match candidate by ID and keep whichever vote total is higher.
-        merged_updates = 0
-        merged_rows = 0
-        merged_missing = 0
-        winner_rows = 0
-        winner_matched = 0
-        winner_missing = 0
-        winner_newly_marked = 0
-        if used_secure and csrf:
-            try:
-                top5_resp = await _get_with_retry(
-                    client,
-                    UPSTREAM_HOR_MERGE_URL,
-                    headers={
-                        "X-CSRF-Token": csrf,
-                        "X-Requested-With": "XMLHttpRequest",
-                        "Referer": HOR_TOP5_REFERER_URL,
-                    },
-                    label="optional HOR leader feed",
-                )
-                top5_rows = _decode_json_bytes(top5_resp.content, "optional HOR leader feed")
-                if isinstance(top5_rows, list) and top5_rows:
-                    stats = _merge_higher_votes(candidates, top5_rows)
-                    merged_updates += stats["upgraded"]
-                    merged_rows += stats["usable_rows"]
-                    merged_missing += stats["missing_candidates"]
-            except Exception:
-                pass
-
-            try:
-                winner_resp = await _get_with_retry(
-                    client,
-                    UPSTREAM_HOR_WINNER_URL,
-                    headers={
-                        "X-CSRF-Token": csrf,
-                        "X-Requested-With": "XMLHttpRequest",
-                        "Referer": HOR_TOP5_REFERER_URL,
-                    },
-                    label="optional HOR winner feed",
-                )
-                winner_feed_rows = _decode_json_bytes(
-                    winner_resp.content,
-                    "optional HOR winner feed",
-                )
-                if isinstance(winner_feed_rows, list) and winner_feed_rows:
-                    winner_vote_stats = _merge_higher_votes(candidates, winner_feed_rows)
-                    merged_updates += winner_vote_stats["upgraded"]
-                    merged_rows += winner_vote_stats["usable_rows"]
-                    merged_missing += winner_vote_stats["missing_candidates"]
-
-                    winner_stats = _merge_official_winners(candidates, winner_feed_rows)
-                    winner_rows = winner_stats["winner_rows"]
-                    winner_matched = winner_stats["matched_candidates"]
-                    winner_missing = winner_stats["missing_candidates"]
-                    winner_newly_marked = winner_stats["newly_marked"]
-            except Exception:
-                pass
-
-        if merged_rows > 0:
-            extra = f", {merged_missing} rows missing in primary feed" if merged_missing > 0 else ""
-            print(
-                "[scraper] optional HOR leader feed merged: "
-                f"{merged_updates} candidate vote updates from "
-                f"{merged_rows} usable rows{extra}"
+        body, digest = _feed_body(source_url, resp)
+        state = _feed_state[source_url]
+        records = None
+        if digest != _published_digest(PRIMARY_FEED) or "freshness" not in state:
+            records, state["freshness"] = await run_parse(
+                _decode_with_freshness, body, f"json GET {source_url}"
             )
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        health.record(False, loop.time() - t0)
+        raise
+    health.record(True, loop.time() - t0)
+    return source_url, body, digest, records, state["freshness"]
 
-        if winner_rows > 0:
-            extra = f", {winner_missing} rows missing in primary feed" if winner_missing > 0 else ""
-            print(
-                "[scraper] optional HOR winner feed merged: "
-                f"{winner_newly_marked} newly marked winners "
-                f"({winner_matched}/{winner_rows} matched){extra}"
-            )
 
-        return candidates
+async def _fetch_primary_hedged(
+    session: UpstreamSession,
+) -> tuple[str, bytes, str, list[dict[str, Any]] | None]:
+    """
+    Hedged variant of _fetch_primary across the secure handler, the direct
+    JSON file and MIRROR_URLS.
+
+    The healthiest source goes first. If it has not answered within its
+    HEDGE_PERCENTILE latency budget (or fails), every other source is fired in
+    parallel. Once a valid payload arrives the rest get HEDGE_SETTLE_SECONDS to
+    beat it; the freshest payload (total votes, then winners) wins and
+    anything still in flight is cancelled.
+    """
+    first, *hedges = session.rank_sources([UPSTREAM_URL, DIRECT_UPSTREAM_URL, *MIRROR_URLS])
+    pending: set[asyncio.Task] = {asyncio.create_task(_fetch_source(session, first))}
+    results: list[tuple[str, bytes, str, list[dict[str, Any]] | None, tuple[int, int]]] = []
+    last_error: BaseException | None = None
+    hedged = False
+
+    def launch_hedges() -> None:
+        nonlocal hedged
+        hedged = True
+        for source_url in hedges:
+            pending.add(asyncio.create_task(_fetch_source(session, source_url)))
+
+    try:
+        timeout: float | None = session.hedge_delay(first)
+        while pending:
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            pending.difference_update(done)
+            for task in done:
+                if task.exception() is None:
+                    results.append(task.result())
+                else:
+                    last_error = task.exception()
+            if results:
+                if not pending:
+                    break
+                # Give the other in-flight sources a moment to beat it.
+                done, _ = await asyncio.wait(pending, timeout=HEDGE_SETTLE_SECONDS)
+                pending.difference_update(done)
+                results.extend(t.result() for t in done if t.exception() is None)
+                break
+            if not hedged:
+                # First source is slow or failed — fire the hedges.
+                if not done:
+                    print(f"[scraper] {first} slower than hedge budget, hedging")
+                launch_hedges()
+                timeout = None
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if not results:
+        raise RuntimeError("all upstream sources failed") from last_error
+
+    best = max(results, key=lambda r: r[4])
+    if best[0] != UPSTREAM_URL:
+        print(f"[scraper] primary data served by {best[0]}")
+    return best[0], best[1], best[2], best[3]
+
+
+def _decode_and_merge(
+    candidates: list[dict[str, Any]] | None,
+    primary_body: bytes,
+    leader_feed: tuple[bytes, str] | None,
+    winner_feed: tuple[bytes, str] | None,
+) -> list[dict[str, Any]]:
+    """
+    Decode the primary feed (unless already decoded) and merge the optional
+    HOR feeds into it. Runs on the parse thread.
+    """
+    if candidates is None:
+        candidates = _decode_candidate_list(primary_body, "primary json")
+
+    # Rule: match candidate by ID and keep whichever vote total is higher.
+    merged_updates = 0
+    merged_rows = 0
+    merged_missing = 0
+    winner_rows = 0
+    winner_matched = 0
+    winner_missing = 0
+    winner_newly_marked = 0
+    if leader_feed is not None:
+        try:
+            top5_rows = _decode_json_bytes(leader_feed[0], "optional HOR leader feed")
+            if isinstance(top5_rows, list) and top5_rows:
+                stats = _merge_higher_votes(candidates, top5_rows)
+                merged_updates += stats["upgraded"]
+                merged_rows += stats["usable_rows"]
+                merged_missing += stats["missing_candidates"]
+        except Exception:
+            pass
+
+    if winner_feed is not None:
+        try:
+            winner_feed_rows = _decode_json_bytes(winner_feed[0], "optional HOR winner feed")
+            if isinstance(winner_feed_rows, list) and winner_feed_rows:
+                winner_vote_stats = _merge_higher_votes(candidates, winner_feed_rows)
+                merged_updates += winner_vote_stats["upgraded"]
+                merged_rows += winner_vote_stats["usable_rows"]
+                merged_missing += winner_vote_stats["missing_candidates"]
+
+                winner_stats = _merge_official_winners(candidates, winner_feed_rows)
+                winner_rows = winner_stats["winner_rows"]
+                winner_matched = winner_stats["matched_candidates"]
+                winner_missing = winner_stats["missing_candidates"]
+                winner_newly_marked = winner_stats["newly_marked"]
+        except Exception:
+            pass
+
+    if merged_rows > 0:
+        extra = f", {merged_missing} rows missing in primary feed" if merged_missing > 0 else ""
+        print(
+            "[scraper] optional HOR leader feed merged: "
+            f"{merged_updates} candidate vote updates from "
+            f"{merged_rows} usable rows{extra}"
+        )
+
+    if winner_rows > 0:
+        extra = f", {winner_missing} rows missing in primary feed" if winner_missing > 0 else ""
+        print(
+            "[scraper] optional HOR winner feed merged: "
+            f"{winner_newly_marked} newly marked winners "
+            f"({winner_matched}/{winner_rows} matched){extra}"
+        )
+
+    return candidates
+
+
+async def fetch_candidates(
+    url: str = UPSTREAM_URL,
+    *,
+    session: UpstreamSession | None = None,
+) -> list[dict[str, Any]] | _Unchanged:
+    """
+    Fetch the full candidate+results array from the upstream secure JSON handler.
+
+    Requires an established session (see UpstreamSession):
+    1. GET the results page to receive ASP.NET_SessionId + CsrfToken cookies.
+    2. GET the data endpoint with those cookies + X-CSRF-Token header.
+    The session and its connections are reused across calls; step 1 only
+    re-runs when upstream rejects the session or the token expires.
+
+    The optional HOR leader/winner feeds are fetched concurrently with the
+    primary one and merged only if they arrive within their deadline and the
+    primary data came through the secure handler. With
+    UPSTREAM_HEDGE set, the primary feed is raced across the secure handler,
+    the direct JSON file and any mirrors (see _fetch_primary_hedged).
+
+    Every feed is fetched conditionally (If-None-Match / If-Modified-Since) and
+    its raw bytes hashed before decoding. When the primary feed and the optional
+    HOR feeds are all identical to the last successful cycle, returns UNCHANGED
+    without decoding anything. Decoding and merging run on the parse thread.
+    """
+    global _last_signature
+
+    if session is None:
+        session = get_session()
+
+    # Optional fast streams from the FPTP win/lead chart, in flight alongside
+    # the primary request.
+    optional_tasks = {
+        UPSTREAM_HOR_MERGE_URL: asyncio.create_task(
+            _fetch_optional_feed(session, UPSTREAM_HOR_MERGE_URL, label="optional HOR leader feed")
+        ),
+        UPSTREAM_HOR_WINNER_URL: asyncio.create_task(
+            _fetch_optional_feed(session, UPSTREAM_HOR_WINNER_URL, label="optional HOR winner feed")
+        ),
+    }
 
+    try:
+        if HEDGE_ENABLED and url == UPSTREAM_URL:
+            source, primary_body, primary_digest, candidates = await _fetch_primary_hedged(session)
+        else:
+            source, primary_body, primary_digest, candidates = await _fetch_primary(session, url)
+    except BaseException:
+        for task in optional_tasks.values():
+            task.cancel()
+        raise
+
+    # The HOR feeds only complement the secure handler's data; after a
+    # fallback to the direct file or a mirror they are dropped unmerged.
+    used_secure = source == url
+    if used_secure and session.csrf:
+        leader_feed = await optional_tasks[UPSTREAM_HOR_MERGE_URL]
+        winner_feed = await optional_tasks[UPSTREAM_HOR_WINNER_URL]
+    else:
+        for task in optional_tasks.values():
+            task.cancel()
+        leader_feed = winner_feed = None
+
+    signature = tuple(
+        (feed_url, feed[1])
+        for feed_url, feed in (
+            (PRIMARY_FEED, (primary_body, primary_digest)),
+            (UPSTREAM_HOR_MERGE_URL, leader_feed),
+            (UPSTREAM_HOR_WINNER_URL, winner_feed),
+        )
+        if feed is not None
+    )
+    if signature == _last_signature:
+        return UNCHANGED
 
-async def scrape_results(url: str = UPSTREAM_URL) -> tuple[list[dict], dict]:
+    candidates = await run_parse(_decode_and_merge, candidates, primary_body, leader_feed, winner_feed)
+
+    _last_signature = signature
+    return candidates
+
+
+async def scrape_results(
+    url: str = UPSTREAM_URL,
+    *,
+    session: UpstreamSession | None = None,
+) -> tuple[dict[str, Any], Changeset] | _Unchanged:
     """
-    Main entry point for the background scraper loop.
+    Main entry point for the background scraper loops.
 
-    Returns (constituency_results, snapshot_data).
+    Returns (aggregate, changes), or UNCHANGED when upstream served the same
+    bytes as the last successful cycle. `aggregate` is aggregate_records()
+    output (constituencies, snapshot, parties, provinces); `changes` is the
+    Changeset against the previous successful cycle.
 
     On election day:
     1. Confirm UPSTREAM_URL still returns live data (TotalVoteReceived > 0).
@@ -719,7 +1860,12 @@ async def scrape_results(url: str = UPSTREAM_URL) -> tuple[list[dict], dict]:
     3. Update is_winner() based on observed E_STATUS values.
     4. Check for a PR results file: /JSONFiles/ElectionResultPR2082.txt
     """
-    raw_candidates = await fetch_candidates(url)
-    constituencies = parse_candidates_json(raw_candidates)
-    snapshot = build_snapshot_from_constituencies(constituencies)
-    return constituencies, snapshot
+    raw_candidates = await fetch_candidates(url, session=session)
+    if raw_candidates is UNCHANGED:
+        return UNCHANGED
+    return await run_parse(_aggregate_cycle, raw_candidates)
+
+
+def _aggregate_cycle(raw_candidates: list[dict[str, Any]]) -> tuple[dict[str, Any], Changeset]:
+    changes = _tracker.update(raw_candidates)
+    return aggregate_records(raw_candidates, parser=_parser), changes
@@ -0,0 +1,126 @@
+"""
+stream.py — Server-Sent Events (/api/stream) for clients behind proxies that
+kill WebSockets.
+
+The stream carries the /ws delta protocol unfiltered: a "state" event, then
+a "constituency_patch" event per changed scrape cycle. Every event's id is
+its data version, so EventSource's automatic reconnect sends the last
+version the client holds as Last-Event-ID.
+
+Each patch is encoded once and kept in a bounded ring of the last
+STREAM_HISTORY events. A reconnecting client is sent the events it missed
+straight from the ring, or a full state (encoded once per version) when it
+is further behind than the ring reaches — so a reconnect storm after a
+network blip costs a scan of the ring and some buffer copies.
+
+Listeners get a bounded queue; one that falls STREAM_QUEUE_SIZE events
+behind is disconnected and resumes from the ring on reconnect.
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from broadcast import Patch, encode_message
+
+STREAM_HISTORY = 256
+STREAM_QUEUE_SIZE = 16
+HEARTBEAT_S = 15.0
+RETRY_MS = 5000
+
+
+def sse_frame(message: dict[str, Any], event_id: int | None) -> bytes:
+    """One SSE event: id (when known), event type and the JSON message."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {message['type']}\ndata: {encode_message(message)}\n\n".encode()
+
+
+class _Listener:
+    __slots__ = ("queue", "overflowed")
+
+    def __init__(self) -> None:
+        self.queue: asyncio.Queue[tuple[int, bytes]] = asyncio.Queue(STREAM_QUEUE_SIZE)
+        self.overflowed = False
+
+
+class EventStream:
+    def __init__(self, history: int = STREAM_HISTORY) -> None:
+        self.version: int | None = None
+        # (base, version, frame) per published patch, oldest first
+        self._events: deque[tuple[int | None, int, bytes]] = deque(maxlen=history)
+        self._listeners: set[_Listener] = set()
+
+    def __len__(self) -> int:
+        return len(self._listeners)
+
+    def publish(self, patch: Patch) -> None:
+        """Record a patch in the ring and hand it to every listener."""
+        message = patch.message
+        version = message["version"]
+        frame = sse_frame(message, version)
+        self._events.append((message["base"], version, frame))
+        self.version = version
+        for listener in self._listeners:
+            try:
+                listener.queue.put_nowait((version, frame))
+            except asyncio.QueueFull:
+                listener.overflowed = True
+
+    def missed(self, last_id: int | None) -> list[tuple[int, bytes]] | None:
+        """
+        The (version, frame) events after version `last_id`, or None when the
+        ring does not reach back that far and a full state is needed.
+        """
+        if last_id is None:
+            return None
+        if last_id == self.version:
+            return []
+        events = list(self._events)
+        for i, (base, _, _) in enumerate(events):
+            if base == last_id:
+                return [(version, frame) for _, version, frame in events[i:]]
+        return None
+
+    async def events(
+        self,
+        last_event_id: str | None,
+        state: Callable[[], Awaitable[tuple[int, bytes]]],
+    ) -> AsyncIterator[bytes]:
+        """
+        The body of one /api/stream response: what the client missed (or
+        `state()`, which returns (version, encoded state event)), then live
+        patches and heartbeats until it disconnects or falls behind.
+        """
+        listener = _Listener()
+        self._listeners.add(listener)
+        try:
+            yield f"retry: {RETRY_MS}\n\n".encode()
+            replay = self.missed(_event_id(last_event_id))
+            if replay is None:
+                version, frame = await state()
+                yield frame
+            else:
+                version = _event_id(last_event_id)
+                for version, frame in replay:
+                    yield frame
+            while not listener.overflowed:
+                try:
+                    async with asyncio.timeout(HEARTBEAT_S):
+                        event_version, frame = await listener.queue.get()
+                except TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if version is not None and event_version <= version:
+                    continue  # already sent in the replay or the state
+                yield frame
+                version = event_version
+        finally:
+            self._listeners.discard(listener)
+
+
+def _event_id(value: str | None) -> int | None:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
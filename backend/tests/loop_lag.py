@@ -0,0 +1,59 @@
+"""
+loop_lag.py — Event-loop lag probe shared by the tests and benchmarks.
+
+A background task asks to be woken every `interval` seconds and records how
+late each wake-up actually was (actual − scheduled callback time). Anything
+that blocks the loop — inline parsing, a synchronous SQLite write — shows up
+directly as lag.
+
+    async with LoopLagProbe() as probe:
+        await one_scrape_cycle()
+    assert probe.max_lag < 0.05
+"""
+
+import asyncio
+import math
+
+
+class LoopLagProbe:
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.lags: list[float] = []
+        self._task: asyncio.Task | None = None
+        self._scheduled: float | None = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - self._scheduled))
+            self._scheduled = None
+
+    async def __aenter__(self) -> "LoopLagProbe":
+        self._task = asyncio.create_task(self._run())
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        # A wake-up still pending at exit is late by however long it has
+        # waited past its slot — the whole cycle, if that never yielded.
+        overdue = self._scheduled is not None and asyncio.get_running_loop().time() - self._scheduled
+        if overdue and overdue > 0:
+            self.lags.append(overdue)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    @property
+    def max_lag(self) -> float:
+        return max(self.lags, default=0.0)
+
+    def percentile(self, pct: int) -> float:
+        """Nearest-rank percentile of the recorded lags."""
+        if not self.lags:
+            return 0.0
+        ranked = sorted(self.lags)
+        return ranked[max(0, math.ceil(pct / 100 * len(ranked)) - 1)]
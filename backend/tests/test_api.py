@@ -1,7 +1,17 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+from fastapi.testclient import TestClient
 from httpx import AsyncClient, ASGITransport
+import main
+import response_cache
+import scraper
 from database import init_db, save_snapshot, save_constituency_results
 from main import create_app
+from tests.loop_lag import LoopLagProbe
+from tests.test_scraper import load_fixture
 
 
 @pytest.fixture
@@ -65,6 +75,149 @@ async def test_get_constituencies(app):
     assert len(data[0]["candidates"]) == 2
 
 
+@pytest.mark.asyncio
+async def test_get_provinces(app):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        resp = await client.get("/api/provinces")
+    assert resp.status_code == 200
+    (bagmati,) = resp.json()
+    assert bagmati["province"] == "Bagmati"
+    assert bagmati["declared"] == 1
+    assert bagmati["parties"]["NC"] == {"seats": 1, "leading": 0, "votes": 8000}
+
+
+@pytest.mark.asyncio
+async def test_candidates_cursor_pagination(app):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        first = (await client.get("/api/candidates")).json()
+        bad = await client.get("/api/candidates", params={"cursor": "garbage"})
+    assert first["total"] == 2
+    assert first["next"] is None
+    assert [c["name"] for c in first["items"]] == ["Alice", "Bob"]
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_candidates_punctuation_query_keeps_the_envelope(app):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        search = (await client.get("/api/candidates", params={"q": "alice"})).json()
+        punctuation = (await client.get("/api/candidates", params={"q": "?!. --"})).json()
+    assert punctuation.keys() == search.keys()
+    assert punctuation["version"] == search["version"]
+    assert (punctuation["total"], punctuation["items"]) == (0, [])
+
+
+@pytest.mark.asyncio
+async def test_get_snapshot_history(app):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        resp = await client.get("/api/snapshots", params={
+            "from": "2026-03-05T00:00:00Z", "to": "2026-03-06T00:00:00Z", "step": 3600,
+        })
+        too_fine = await client.get("/api/snapshots", params={"step": 1})
+    assert resp.status_code == 200
+    (point,) = resp.json()
+    assert point["declaredSeats"] == 3
+    assert point["seatTally"]["NC"]["fptp"] == 2
+    assert too_fine.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_vote_history_endpoints(app):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        alice_id = (await client.get("/api/candidates")).json()["items"][0]["id"]
+        candidate = await client.get(f"/api/candidates/{alice_id}/history")
+        constituency = await client.get("/api/constituencies/KTM-1/history")
+        missing = await client.get("/api/constituencies/NOPE-1/history")
+    assert candidate.json()["votes"] == [8000]
+    assert constituency.json()["candidates"][str(alice_id)] == [8000]
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_cached_endpoints_answer_if_none_match_with_304(app):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        first = await client.get("/api/constituencies")
+        etag = first.headers["etag"]
+        again = await client.get("/api/constituencies", headers={"If-None-Match": etag})
+    assert first.status_code == 200
+    assert "Accept-Encoding" in first.headers["vary"]
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_cached_endpoints_serve_gzip(app, monkeypatch):
+    monkeypatch.setattr(response_cache, "MIN_COMPRESS_BYTES", 0)  # fixture bodies are tiny
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        plain = await client.get("/api/constituencies", headers={"Accept-Encoding": "identity"})
+        gzipped = await client.get("/api/constituencies", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in plain.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] != plain.headers["etag"]
+    assert gzipped.json() == plain.json()
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_skips_sqlite_until_bumped(app, db):
+    statements: list[str] = []
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        before = (await client.get("/api/parties")).json()
+        db.set_trace_callback(statements.append)
+        cached = (await client.get("/api/parties")).json()
+        assert statements == []
+
+        save_constituency_results(db, [{
+            "code": "KTM-1", "name": "Kathmandu-1", "province": "Bagmati",
+            "district": "Kathmandu", "status": "DECLARED",
+            "last_updated": "2026-03-05T11:00:00+00:00",
+            "candidates": [
+                {"name": "Alice", "party": "NC", "votes": 8000},
+                {"name": "Bob",   "party": "RSP", "votes": 9000},
+            ],
+        }])
+        assert (await client.get("/api/parties")).json() == before
+        app.state.cache.bump()
+        statements.clear()
+        after = (await client.get("/api/parties")).json()
+    db.set_trace_callback(None)
+    assert cached == before
+    assert statements
+    assert after != before
+
+
+def test_websocket_pushes_versioned_state_on_connect(app):
+    with TestClient(app) as client, client.websocket_connect("/ws") as ws:
+        state = ws.receive_json()
+    assert state["type"] == "state"
+    assert state["version"] == 1
+    assert state["snapshot"]["declaredSeats"] == 3
+    [ktm] = state["constituencies"]
+    assert ktm["code"] == "KTM-1"
+    assert {c["name"] for c in ktm["candidates"]} == {"Alice", "Bob"}
+    assert all("id" in c for c in ktm["candidates"])
+
+
+def test_websocket_resync_resends_state(app):
+    with TestClient(app) as client, client.websocket_connect("/ws") as ws:
+        first = ws.receive_json()
+        ws.send_text("ping")
+        ws.send_json({"type": "resync", "version": 0})
+        again = ws.receive_json()
+    assert again == first
+
+
+def test_websocket_acknowledges_subscriptions(app):
+    with TestClient(app) as client, client.websocket_connect("/ws") as ws:
+        ws.receive_json()
+        ws.send_json({"type": "subscribe", "topics": ["constituency:KTM-1", "party:NC"]})
+        subscribed = ws.receive_json()
+        ws.send_json({"type": "unsubscribe", "topics": ["party:NC"]})
+        unsubscribed = ws.receive_json()
+    assert subscribed == {"type": "subscribed", "topics": ["constituency:KTM-1", "party:NC"]}
+    assert unsubscribed == {"type": "subscribed", "topics": ["constituency:KTM-1"]}
+
+
 @pytest.mark.asyncio
 async def test_snapshot_returns_defaults_when_empty():
     empty_db = init_db(":memory:")
@@ -85,3 +238,191 @@ async def test_constituencies_returns_empty_list_when_empty():
     assert resp.status_code == 200
     assert resp.json() == []
     empty_db.close()
+
+
+@pytest.mark.asyncio
+async def test_health_reports_upstream_session(app):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        resp = await client.get("/api/health")
+    assert resp.status_code == 200
+    upstream = resp.json()["upstream"]
+    assert upstream["bootstraps"] == 0
+    assert "sessionAgeSeconds" in upstream
+
+
+async def test_scraper_cycle_does_not_block_the_event_loop(monkeypatch):
+    raw = load_fixture()
+    real_aggregate = scraper.aggregate_records
+    real_save = main.save_constituency_results
+
+    async def fetch(*args, **kwargs):
+        return raw
+
+    def slow_aggregate(*args, **kwargs):
+        time.sleep(0.3)  # stands in for a large payload
+        return real_aggregate(*args, **kwargs)
+
+    def slow_save(*args, **kwargs):
+        time.sleep(0.3)  # stands in for a slow disk
+        return real_save(*args, **kwargs)
+
+    monkeypatch.setattr(scraper, "fetch_candidates", fetch)
+    monkeypatch.setattr(scraper, "aggregate_records", slow_aggregate)
+    monkeypatch.setattr(main, "save_constituency_results", slow_save)
+
+    database = main.Database(init_db(":memory:"))
+    manager = main.ConnectionManager()
+    cache = main.ResponseCache()
+    broadcasts: list[dict] = []
+    done = asyncio.Event()
+
+    async def publish(patch) -> None:
+        broadcasts.append(patch.message)
+        done.set()
+
+    monkeypatch.setattr(manager, "publish", publish)
+    writer = ThreadPoolExecutor(max_workers=1)
+    scraper.reset_fetch_state()
+    try:
+        async with LoopLagProbe() as probe:
+            task = asyncio.create_task(main._scraper_loop(database, manager, main.EventStream(), cache, writer))
+            await asyncio.wait_for(done.wait(), timeout=10)
+            task.cancel()
+    finally:
+        writer.shutdown(wait=True)
+        database.close()
+
+    assert [m["type"] for m in broadcasts] == ["constituency_patch"]
+    assert broadcasts[0]["base"] == 0
+    assert broadcasts[0]["constituencies"]
+    assert cache.version == 1
+    assert len(probe.lags) > 20
+    assert probe.max_lag < 0.1
+
+
+def test_persist_cycle_stores_the_aggregate_snapshot():
+    aggregate = scraper.aggregate_records(load_fixture(), now="2026-03-05T10:00:00+00:00")
+    database = main.Database(init_db(":memory:"))
+    try:
+        main._persist_cycle(database, aggregate, scraper.Changeset(full=True), main.StateFeed())
+        with database.reader() as conn:
+            stored = main.get_latest_snapshot(conn)
+    finally:
+        database.close()
+    for party, seats in aggregate["snapshot"]["seatTally"].items():
+        assert stored["seatTally"][party] == seats
+    assert stored["declaredSeats"] == aggregate["snapshot"]["declaredSeats"]
+
+
+def test_snapshot_seat_tally_agrees_with_parties():
+    aggregate = scraper.aggregate_records(load_fixture(), now="2026-03-05T10:00:00+00:00")
+    database = main.Database(init_db(":memory:"))
+    try:
+        main._persist_cycle(database, aggregate, scraper.Changeset(full=True), main.StateFeed())
+        client = TestClient(create_app(database, start_scraper=False))
+        tally = client.get("/api/snapshot").json()["seatTally"]
+        parties = client.get("/api/parties").json()
+    finally:
+        database.close()
+    seats = {p["party"]: p["seatsWon"] for p in parties}
+    assert sum(seats.values()) == aggregate["snapshot"]["declaredSeats"] > 0
+    assert {p: t["fptp"] for p, t in tally.items() if t["fptp"]} == {p: n for p, n in seats.items() if n}
+
+
+def test_persist_cycle_writes_only_changed_constituencies():
+    records = load_fixture()
+    tracker = scraper.ChangeTracker()
+    database = main.Database(init_db(":memory:"))
+    try:
+        aggregate = scraper.aggregate_records(records)
+        main._persist_cycle(database, aggregate, tracker.update(records), main.StateFeed())
+        records = [dict(rec) for rec in records]  # a fresh payload, as decoded each cycle
+        records[0]["TotalVoteReceived"] += 10
+        aggregate = scraper.aggregate_records(records)
+        changes = tracker.update(records)
+        written, _ = main._persist_cycle(database, aggregate, changes, main.StateFeed())
+        with database.reader() as conn:
+            stored = main.get_constituency_by_id(conn, scraper.constituency_id(records[0]))
+            parties = main.get_parties(conn)
+    finally:
+        database.close()
+    assert len(changes.constituencies) == 1
+    assert written == {"constituencies": 1, "inserted": 0, "updated": 1, "deleted": 0}
+    assert stored["candidates"][0]["votes"] == records[0]["TotalVoteReceived"]
+    expected = init_db(":memory:")
+    main.save_constituency_results(expected, [c.to_dict() for c in aggregate["constituencies"]])
+    assert parties == main.get_parties(expected)
+    expected.close()
+
+
+def test_persist_cycle_patches_from_the_changed_constituencies(monkeypatch):
+    records = load_fixture()
+    tracker = scraper.ChangeTracker()
+    database = main.Database(init_db(":memory:"))
+    feed = main.StateFeed()
+    try:
+        main._persist_cycle(database, scraper.aggregate_records(records), tracker.update(records), feed)
+        records = [dict(rec) for rec in records]
+        records[0]["TotalVoteReceived"] += 10
+        reads = []
+        original = main.get_live_state
+        monkeypatch.setattr(
+            main, "get_live_state", lambda conn, codes=None: reads.append(codes) or original(conn, codes)
+        )
+        _, patch = main._persist_cycle(
+            database, scraper.aggregate_records(records), tracker.update(records), feed
+        )
+        full = main.StateFeed()
+        full.reset(main._read(database, original))
+    finally:
+        database.close()
+    code = scraper.constituency_id(records[0])
+    assert reads == [{code}]
+    assert [entry["code"] for entry in patch.message["constituencies"]] == [code]
+    # The untouched constituencies stay in the base, so the next diff is exact.
+    assert feed.version == full.version
+    assert feed._constituencies == full._constituencies
+
+
+def test_patch_party_topics_use_the_party_key():
+    records = load_fixture()
+    database = main.Database(init_db(":memory:"))
+    feed = main.StateFeed()
+    try:
+        feed.reset(main._read(database, main.get_live_state))
+        _, patch = main._persist_cycle(
+            database, scraper.aggregate_records(records), scraper.Changeset(full=True), feed
+        )
+        with database.reader() as conn:
+            parties = {p["party"] for p in main.get_parties(conn)}
+    finally:
+        database.close()
+    topics = {t.removeprefix("party:") for ts in patch.topics for t in ts if t.startswith("party:")}
+    assert topics and topics <= parties
+    assert topics == {scraper.map_party_key(rec["PoliticalPartyName"]) for rec in records}
+
+
+def test_vote_history_follows_the_changeset():
+    records = load_fixture()
+    tracker = scraper.ChangeTracker()
+    database = main.Database(init_db(":memory:"))
+    feed = main.StateFeed()
+    try:
+        main._persist_cycle(database, scraper.aggregate_records(records), tracker.update(records), feed)
+        records = [dict(rec) for rec in records]
+        records[0]["TotalVoteReceived"] += 10
+        _, patch = main._persist_cycle(database, scraper.aggregate_records(records), tracker.update(records), feed)
+        # A restart: a full changeset over counts already stored adds nothing.
+        main._persist_cycle(database, scraper.aggregate_records(records), scraper.ChangeTracker().update(records), feed)
+        with database.reader() as conn:
+            history = {
+                rec["CandidateID"]: main.get_candidate_history(conn, rec["CandidateID"])["votes"]
+                for rec in records
+            }
+    finally:
+        database.close()
+    moved = records[0]["CandidateID"]
+    assert history[moved] == [records[0]["TotalVoteReceived"] - 10, records[0]["TotalVoteReceived"]]
+    assert all(len(votes) == 1 for cid, votes in history.items() if cid != moved)
+    (entry,) = patch.message["constituencies"]
+    assert [c["id"] for c in entry["candidates"]] == [moved]
@@ -0,0 +1,160 @@
+import asyncio
+import json
+
+import pytest
+
+import broadcast
+from broadcast import ConnectionManager, StateFeed
+
+
+@pytest.fixture
+async def manager():
+    manager = ConnectionManager()
+    yield manager
+    await manager.close()
+
+
+class FakeSocket:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.frames: list[str] = []
+        self.closed: int | None = None
+
+    async def send_text(self, frame: str) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.frames.append(frame)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed = code
+
+
+@pytest.mark.asyncio
+async def test_broadcast_encodes_once_for_all_clients(manager):
+    sockets = [FakeSocket() for _ in range(3)]
+    for ws in sockets:
+        manager.register(ws)
+    await manager.broadcast({"type": "snapshot", "data": {"declaredSeats": 3}})
+    await manager.drain()
+    assert [len(ws.frames) for ws in sockets] == [1, 1, 1]
+    assert all(ws.frames[0] is sockets[0].frames[0] for ws in sockets)
+    assert sockets[0].frames[0] == '{"type":"snapshot","data":{"declaredSeats":3}}'
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_delay_others(manager):
+    slow, fast = FakeSocket(delay=0.5), FakeSocket()
+    manager.register(slow)
+    manager.register(fast)
+    await manager.broadcast({"type": "snapshot", "data": 1})
+    await asyncio.sleep(0.05)
+    assert fast.frames and not slow.frames
+
+
+@pytest.mark.asyncio
+async def test_lagging_client_is_coalesced_to_latest_state(manager):
+    ws = FakeSocket(delay=0.05)
+    manager.register(ws)
+    for n in range(10):
+        await manager.broadcast({"type": "snapshot", "data": n})
+        await manager.broadcast({"type": "constituencies", "data": n})
+    await manager.drain()
+    assert ws.closed is None
+    assert len(ws.frames) < 20
+    assert ws.frames[-2:] == [
+        '{"type":"snapshot","data":9}',
+        '{"type":"constituencies","data":9}',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_client_that_cannot_keep_up_is_dropped(monkeypatch, manager):
+    monkeypatch.setattr(broadcast, "SEND_TIMEOUT_S", 0.05)
+    stuck, ok = FakeSocket(delay=10), FakeSocket()
+    manager.register(stuck)
+    manager.register(ok)
+    await manager.broadcast({"type": "snapshot", "data": 1})
+    await asyncio.sleep(0.2)
+    assert len(manager) == 1
+    assert manager.dropped == 1
+    assert stuck.closed == broadcast.SLOW_CONSUMER_CLOSE
+    assert ok.frames
+
+
+def _state(version: int, votes: dict[int, int], status: str = "COUNTING") -> dict:
+    def constituency(code: str, ids: list[int]) -> dict:
+        return {
+            "province": "Bagmati", "district": "Kathmandu", "code": code, "name": code,
+            "status": status if code == "KTM-1" else "COUNTING", "lastUpdated": "t",
+            "candidates": [
+                {"id": cid, "name": f"c{cid}", "party": "NC", "votes": votes[cid]}
+                for cid in ids if cid in votes
+            ],
+        }
+    return {
+        "version": version,
+        "snapshot": {"declaredSeats": 0},
+        "constituencies": [constituency("KTM-1", [1, 2]), constituency("KTM-2", [3, 4])],
+    }
+
+
+def test_state_feed_patches_only_changed_candidates():
+    feed = StateFeed()
+    feed.reset(_state(1, {1: 10, 2: 5, 3: 7, 4: 1}))
+    assert feed.advance(_state(1, {1: 10, 2: 5, 3: 7, 4: 1})) is None
+
+    patch = feed.advance(_state(2, {1: 10, 2: 9, 3: 7, 4: 1})).message
+    assert patch["type"] == "constituency_patch"
+    assert (patch["base"], patch["version"]) == (1, 2)
+    [ktm1] = patch["constituencies"]
+    assert ktm1["code"] == "KTM-1"
+    assert ktm1["candidates"] == [{"id": 2, "name": "c2", "party": "NC", "votes": 9}]
+    assert "removed" not in ktm1
+
+
+def test_state_feed_patches_status_and_removed_candidates():
+    feed = StateFeed()
+    feed.reset(_state(1, {1: 10, 2: 5, 3: 7, 4: 1}))
+    patch = feed.advance(_state(2, {1: 10, 2: 5, 3: 7}, status="DECLARED")).message
+    ktm1, ktm2 = patch["constituencies"]
+    assert (ktm1["status"], ktm1["candidates"]) == ("DECLARED", [])
+    assert (ktm2["candidates"], ktm2["removed"]) == ([], [4])
+    assert feed.advance(_state(3, {1: 10, 2: 5, 3: 7}, status="DECLARED")).message["constituencies"] == []
+
+
+async def test_publish_routes_patches_by_topic(manager):
+    everyone, ktm2, nc, unrelated = (FakeSocket() for _ in range(4))
+    for ws in (everyone, ktm2, nc, unrelated):
+        manager.register(ws)
+    manager.subscribe(ktm2, ["constituency:KTM-2"])
+    manager.subscribe(nc, ["party:NC", "bogus", "province:"])
+    manager.subscribe(unrelated, ["district:Jhapa"])
+
+    feed = StateFeed()
+    feed.reset(_state(1, {1: 10, 2: 5, 3: 7, 4: 1}))
+    for ws in (everyone, ktm2, nc, unrelated):
+        manager.send_frame(ws, "state", "{}", version=1)
+    await manager.publish(feed.advance(_state(2, {1: 11, 2: 5, 3: 7, 4: 1})))
+    await manager.publish(feed.advance(_state(3, {1: 11, 2: 5, 3: 8, 4: 1})))
+    await manager.drain()
+
+    def patches(ws):
+        return [(p["base"], p["version"], [c["code"] for c in p["constituencies"]])
+                for p in map(json.loads, ws.frames[1:])]
+
+    assert patches(everyone) == [(1, 2, ["KTM-1"]), (2, 3, ["KTM-2"])]
+    assert patches(ktm2) == [(1, 3, ["KTM-2"])]
+    assert patches(nc) == [(1, 2, ["KTM-1"]), (2, 3, ["KTM-2"])]
+    assert patches(unrelated) == []
+
+
+async def test_subscriptions_are_validated_and_cleaned_up(manager):
+    ws = FakeSocket()
+    manager.register(ws)
+    assert manager.subscribe(ws, ["party:NC", "nope", 3, "constituency:KTM-1"]) == [
+        "constituency:KTM-1", "party:NC",
+    ]
+    assert manager.unsubscribe(ws, ["party:NC"]) == ["constituency:KTM-1"]
+    manager.disconnect(ws)
+    assert manager._subscribers == {}
+    assert manager._unfiltered == set()
@@ -1,11 +1,25 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from database import (
+    SCHEMA_VERSION,
+    Database,
     init_db,
     save_snapshot,
     save_constituency_results,
     get_latest_snapshot,
+    get_snapshot_history,
     get_constituencies,
+    get_constituency_by_id,
+    get_parties,
+    get_provinces,
+    get_candidates,
+    get_candidate_history,
+    get_constituency_history,
+    get_data_version,
 )
+from scraper import Changeset
 
 
 @pytest.fixture
@@ -18,9 +32,12 @@ def db():
 def test_init_db_creates_tables(db):
     cursor = db.execute("SELECT name FROM sqlite_master WHERE type='table'")
     tables = {row[0] for row in cursor}
-    assert "snapshots" in tables
-    assert "constituencies" in tables
-    assert "candidates" in tables
+    assert {
+        "snapshots", "snapshot_tally", "constituencies", "constituency_status",
+        "candidate_profile", "candidate_votes",
+    } <= tables
+    assert "candidates" not in tables
+    assert db.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
 
 
 def test_save_and_get_snapshot(db):
@@ -91,3 +108,559 @@ def test_upsert_updates_existing_constituency(db):
     assert len(results) == 1
     assert results[0]["status"] == "DECLARED"
     assert results[0]["candidates"][0]["votes"] == 9000
+
+
+def _two_constituencies() -> list[dict]:
+    return [
+        {
+            "code": "KTM-3", "name": "Kathmandu-3", "province": "Bagmati",
+            "district": "Kathmandu", "status": "DECLARED",
+            "last_updated": "2026-03-05T10:00:00+00:00",
+            "candidates": [
+                {"name": "Bob", "party": "RSP", "votes": 4500},
+                {"name": "Alice", "party": "NC", "votes": 5000},
+            ],
+        },
+        {
+            "code": "LTP-1", "name": "Lalitpur-1", "province": "Bagmati",
+            "district": "Lalitpur", "status": "COUNTING",
+            "last_updated": "2026-03-05T10:00:00+00:00",
+            "candidates": [
+                {"name": "Carol", "party": "RSP", "votes": 7000},
+                {"name": "Dan", "party": "NC", "votes": 100},
+            ],
+        },
+        {
+            "code": "BKT-1", "name": "Bhaktapur-1", "province": "Bagmati",
+            "district": "Bhaktapur", "status": "PENDING",
+            "last_updated": "2026-03-05T10:00:00+00:00",
+            "candidates": [],
+        },
+    ]
+
+
+def _select_count(conn, fn) -> int:
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+    try:
+        fn()
+    finally:
+        conn.set_trace_callback(None)
+    return sum(1 for s in statements if s.lstrip().upper().startswith(("SELECT", "WITH")))
+
+
+def test_get_constituencies_is_one_query_and_keeps_empty_constituencies(db):
+    save_constituency_results(db, _two_constituencies())
+    assert _select_count(db, lambda: get_constituencies(db)) == 1
+    results = get_constituencies(db)
+    assert [c["code"] for c in results] == ["KTM-3", "LTP-1", "BKT-1"]
+    assert [c["name"] for c in results[0]["candidates"]] == ["Alice", "Bob"]
+    assert results[2]["candidates"] == []
+
+
+def test_get_constituency_by_id_includes_candidate_ids(db):
+    save_constituency_results(db, _two_constituencies())
+    result = get_constituency_by_id(db, "LTP-1")
+    assert [c["name"] for c in result["candidates"]] == ["Carol", "Dan"]
+    assert all(isinstance(c["id"], int) for c in result["candidates"])
+    assert get_constituency_by_id(db, "BKT-1")["candidates"] == []
+    assert get_constituency_by_id(db, "NOPE") is None
+
+
+def test_get_parties_counts_seats_only_for_declared(db):
+    save_constituency_results(db, _two_constituencies())
+    assert _select_count(db, lambda: get_parties(db)) == 1
+    assert get_parties(db) == [
+        {"party": "NC", "seatsWon": 1, "totalVotes": 5100},
+        {"party": "RSP", "seatsWon": 0, "totalVotes": 11500},
+    ]
+
+
+def test_get_candidates_flags_winners_without_per_row_queries(db):
+    save_constituency_results(db, _two_constituencies())
+    assert _select_count(db, lambda: get_candidates(db)) == 2
+    result = get_candidates(db)
+    assert result["total"] == 4
+    assert [(c["name"], c["isWinner"]) for c in result["items"]] == [
+        ("Carol", False), ("Alice", True), ("Bob", False), ("Dan", False),
+    ]
+    page = get_candidates(db, party="RSP", page=2, page_size=1)
+    assert page["total"] == 2
+    assert [c["name"] for c in page["items"]] == ["Bob"]
+
+
+def _camel_case_result(votes: int, status: str = "COUNTING") -> dict:
+    return {
+        "code": "3-काठमाडौं-1",
+        "name": "Kathmandu-1",
+        "province": "Bagmati",
+        "district": "Kathmandu",
+        "status": status,
+        "lastUpdated": "2026-03-05T10:00:00+00:00",
+        "candidates": [
+            {"candidateId": 100001, "name": "Ram", "partyName": "नेपाली काँग्रेस", "partyId": "1001", "votes": votes},
+            {"candidateId": 100002, "name": "Sita", "partyName": "राष्ट्रिय स्वतन्त्र पार्टी", "partyId": "2598", "votes": 900},
+        ],
+    }
+
+
+def test_save_keys_candidates_on_upstream_id(db):
+    save_constituency_results(db, [_camel_case_result(1000)])
+    save_constituency_results(db, [_camel_case_result(2000)])
+    result = get_constituency_by_id(db, "3-काठमाडौं-1")
+    assert [(c["id"], c["party"], c["votes"]) for c in result["candidates"]] == [
+        (100001, "NC", 2000),
+        (100002, "RSP", 900),
+    ]
+
+
+def test_save_writes_only_changed_rows(db):
+    first = save_constituency_results(db, [_camel_case_result(1000)])
+    assert first == {"constituencies": 1, "inserted": 2, "updated": 0, "deleted": 0}
+    assert save_constituency_results(db, [_camel_case_result(1000)]) == {
+        "constituencies": 0, "inserted": 0, "updated": 0, "deleted": 0,
+    }
+    assert save_constituency_results(db, [_camel_case_result(1500)]) == {
+        "constituencies": 1, "inserted": 0, "updated": 1, "deleted": 0,
+    }
+    written = save_constituency_results(db, [_camel_case_result(1500, "DECLARED")])
+    assert written == {"constituencies": 1, "inserted": 0, "updated": 0, "deleted": 0}
+    assert get_constituencies(db)[0]["status"] == "DECLARED"
+
+
+def test_save_deletes_withdrawn_candidates(db):
+    save_constituency_results(db, [_camel_case_result(1000)])
+    result = _camel_case_result(1000)
+    result["candidates"].pop()
+    written = save_constituency_results(db, [result])
+    assert written["deleted"] == 1
+    assert [c["id"] for c in get_constituency_by_id(db, "3-काठमाडौं-1")["candidates"]] == [100001]
+
+
+def _second_result(votes: int) -> dict:
+    result = _camel_case_result(votes)
+    result.update(code="3-ललितपुर-1", name="Lalitpur-1", district="Lalitpur")
+    for cand in result["candidates"]:
+        cand["candidateId"] += 100
+    return result
+
+
+def test_save_with_a_changeset_only_touches_listed_constituencies(db):
+    save_constituency_results(db, [_camel_case_result(1000), _second_result(1000)])
+    changes = Changeset()
+    changes.constituencies.add("3-काठमाडौं-1")
+    written = save_constituency_results(db, [_camel_case_result(1500), _second_result(1500)], changes)
+    assert written == {"constituencies": 1, "inserted": 0, "updated": 1, "deleted": 0}
+    assert get_constituency_by_id(db, "3-ललितपुर-1")["candidates"][0]["votes"] == 1000
+
+    expected = init_db(":memory:")
+    save_constituency_results(expected, [_camel_case_result(1500), _second_result(1000)])
+    assert get_parties(db) == get_parties(expected)
+    assert get_provinces(db) == get_provinces(expected)
+    expected.close()
+
+
+def _legacy_db(path) -> None:
+    """A pre-versioning database: v1 tables, PRAGMA user_version 0."""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, taken_at TEXT NOT NULL,
+            total_seats INTEGER DEFAULT 275, declared_seats INTEGER DEFAULT 0,
+            nc_fptp INTEGER DEFAULT 0, nc_pr INTEGER DEFAULT 0,
+            uml_fptp INTEGER DEFAULT 0, uml_pr INTEGER DEFAULT 0,
+            ncp_fptp INTEGER DEFAULT 0, ncp_pr INTEGER DEFAULT 0,
+            rsp_fptp INTEGER DEFAULT 0, rsp_pr INTEGER DEFAULT 0,
+            oth_fptp INTEGER DEFAULT 0, oth_pr INTEGER DEFAULT 0
+        );
+        CREATE TABLE constituencies (
+            code TEXT PRIMARY KEY, name TEXT NOT NULL, province TEXT NOT NULL,
+            district TEXT NOT NULL, status TEXT DEFAULT 'COUNTING', last_updated TEXT
+        );
+        CREATE TABLE candidates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, constituency_code TEXT NOT NULL,
+            name TEXT NOT NULL, party TEXT NOT NULL, votes INTEGER DEFAULT 0
+        );
+        INSERT INTO snapshots (taken_at, declared_seats, nc_fptp, uml_pr)
+        VALUES ('2026-03-05T10:00:00+00:00', 4, 3, 1);
+        INSERT INTO constituencies VALUES
+            ('KTM-3', 'Kathmandu-3', 'Bagmati', 'Kathmandu', 'DECLARED', '2026-03-05T10:00:00+00:00');
+        INSERT INTO candidates (constituency_code, name, party, votes) VALUES
+            ('KTM-3', 'Alice', 'NC', 5000), ('KTM-3', 'Bob', 'RSP', 4500);
+    """)
+    conn.close()
+
+
+def test_init_db_migrates_legacy_database(tmp_path):
+    path = str(tmp_path / "election.db")
+    _legacy_db(path)
+    conn = init_db(path)
+    try:
+        snap = get_latest_snapshot(conn)
+        assert snap["declaredSeats"] == 4
+        assert snap["seatTally"]["NC"] == {"fptp": 3, "pr": 0}
+        assert snap["seatTally"]["CPN-UML"] == {"fptp": 0, "pr": 1}
+        (ktm,) = get_constituencies(conn)
+        assert ktm["status"] == "DECLARED"
+        assert [(c["name"], c["votes"]) for c in ktm["candidates"]] == [("Alice", 5000), ("Bob", 4500)]
+        assert get_parties(conn)[0] == {"party": "NC", "seatsWon": 1, "totalVotes": 5000}
+    finally:
+        conn.close()
+    # Re-opening an up-to-date database is a no-op.
+    init_db(path).close()
+
+
+def test_snapshot_tally_is_keyed_by_any_party_id(db):
+    save_snapshot(db, {
+        "lastUpdated": "2026-03-05T10:00:00+00:00",
+        "totalSeats": 275,
+        "declaredSeats": 2,
+        "seatTally": {"1001": {"fptp": 2, "pr": 0}},
+    })
+    result = get_latest_snapshot(db)
+    assert result["declaredSeats"] == 2
+    assert result["seatTally"]["1001"] == {"fptp": 2, "pr": 0}
+
+
+def test_hot_reads_use_indexes(db):
+    def plan(sql: str) -> str:
+        return " | ".join(row[3] for row in db.execute("EXPLAIN QUERY PLAN " + sql))
+
+    assert "COVERING INDEX idx_candidate_votes_rank" in plan(
+        "SELECT candidate_id, votes FROM candidate_votes WHERE constituency_code = 'x' ORDER BY votes DESC"
+    )
+    assert "COVERING INDEX idx_candidate_votes_votes" in plan(
+        "SELECT candidate_id, votes FROM candidate_votes ORDER BY votes DESC, candidate_id LIMIT 50"
+    )
+    assert "idx_candidate_profile_party" in plan("SELECT id FROM candidate_profile WHERE party = 'NC'")
+
+
+def test_file_database_runs_in_wal_mode(tmp_path):
+    database = Database.open(str(tmp_path / "election.db"))
+    try:
+        assert database.writer.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert database.writer.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        with database.reader() as conn:
+            assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM candidate_votes")
+    finally:
+        database.close()
+
+
+def test_reader_pool_is_bounded_and_reuses_connections(tmp_path):
+    database = Database.open(str(tmp_path / "election.db"), readers=2)
+    try:
+        with database.reader() as a, database.reader() as b:
+            assert a is not b
+        with database.reader() as c:
+            assert c in (a, b)
+        assert database.stats()["readers"] == 2
+    finally:
+        database.close()
+
+
+def test_readers_see_last_commit_while_a_write_is_open(tmp_path):
+    database = Database.open(str(tmp_path / "election.db"))
+    try:
+        save_constituency_results(database.writer, _two_constituencies())
+        writer = database.writer
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute("UPDATE candidate_votes SET votes = votes + 1000")
+        with database.reader() as conn:
+            before = {c["code"]: c["candidates"][0]["votes"] for c in get_constituencies(conn) if c["candidates"]}
+        writer.commit()
+        with database.reader() as conn:
+            after = {c["code"]: c["candidates"][0]["votes"] for c in get_constituencies(conn) if c["candidates"]}
+        assert all(after[code] == votes + 1000 for code, votes in before.items())
+    finally:
+        database.close()
+
+
+def test_in_memory_database_reads_through_the_writer():
+    database = Database(init_db(":memory:"))
+    try:
+        with database.reader() as conn:
+            assert conn is database.writer
+        assert database.stats()["pooled"] is False
+    finally:
+        database.close()
+
+
+def _recomputed_totals(conn) -> set[tuple]:
+    """province_totals rebuilt from scratch, for comparison with the deltas."""
+    return set(map(tuple, conn.execute(
+        """
+        WITH ranked AS (
+            SELECT candidate_id, constituency_code, votes,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY constituency_code ORDER BY votes DESC, candidate_id
+                   ) AS rank
+            FROM candidate_votes
+        )
+        SELECT con.province, p.party, COUNT(*), SUM(r.votes),
+               SUM(r.rank = 1 AND s.status = 'DECLARED'),
+               SUM(r.rank = 1 AND s.status != 'DECLARED' AND r.votes > 0)
+        FROM ranked r
+        JOIN candidate_profile p ON p.id = r.candidate_id
+        JOIN constituencies con ON con.code = r.constituency_code
+        JOIN constituency_status s ON s.code = r.constituency_code
+        GROUP BY con.province, p.party
+        """
+    )))
+
+
+def _materialised_totals(conn) -> set[tuple]:
+    return set(map(tuple, conn.execute(
+        "SELECT province, party, candidates, votes, seats, leading FROM province_totals WHERE candidates > 0"
+    )))
+
+
+def test_materialised_totals_track_every_kind_of_change(db):
+    results = _two_constituencies()
+    cycles = [
+        lambda r: None,
+        lambda r: r[1]["candidates"][1].update(votes=9000),       # lead changes hands
+        lambda r: r[1].update(status="DECLARED"),                 # status only
+        lambda r: r[0]["candidates"][0].update(party="UML"),      # party corrected
+        lambda r: r[0]["candidates"].pop(),                       # candidate withdrawn
+        lambda r: r[2]["candidates"].append({"name": "Eve", "party": "NC", "votes": 10}),
+        lambda r: r[2].update(province="Koshi"),                  # ignored: code already known
+    ]
+    for change in cycles:
+        change(results)
+        save_constituency_results(db, results)
+        assert _materialised_totals(db) == _recomputed_totals(db)
+    expected: dict[str, tuple[int, int]] = {}
+    for _province, party, _n, votes, seats, _leading in _recomputed_totals(db):
+        prev_votes, prev_seats = expected.get(party, (0, 0))
+        expected[party] = (prev_votes + votes, prev_seats + seats)
+    assert {p["party"]: (p["totalVotes"], p["seatsWon"]) for p in get_parties(db)} == expected
+
+
+def test_get_provinces_reports_seats_and_leads(db):
+    save_constituency_results(db, _two_constituencies())
+    (bagmati,) = get_provinces(db)
+    assert bagmati == {
+        "province": "Bagmati",
+        "constituencies": 3,
+        "declared": 1,
+        "counting": 1,
+        "votesCast": 16600,
+        "parties": {
+            "NC":  {"seats": 1, "leading": 0, "votes": 5100},
+            "RSP": {"seats": 0, "leading": 1, "votes": 11500},
+        },
+    }
+
+
+def test_migration_backfills_materialised_totals(tmp_path):
+    path = str(tmp_path / "election.db")
+    _legacy_db(path)
+    conn = init_db(path)
+    try:
+        assert _materialised_totals(conn) == _recomputed_totals(conn)
+        assert [tuple(r) for r in conn.execute("SELECT party, seats FROM party_totals ORDER BY party")] == [
+            ("NC", 1), ("RSP", 0),
+        ]
+    finally:
+        conn.close()
+
+
+def _searchable_result() -> dict:
+    result = _camel_case_result(1000)
+    result["candidates"][0].update(name="Ram Bahadur Thapa", nameNp="राम बहादुर थापा")
+    result["candidates"][1].update(name="Sita Kathmandu Sharma", nameNp="सीता शर्मा")
+    return result
+
+
+def _search(conn, q: str) -> list[int]:
+    return [c["id"] for c in get_candidates(conn, q=q)["items"]]
+
+
+def test_search_matches_names_party_and_place_by_prefix(db):
+    save_constituency_results(db, [_searchable_result()])
+    assert _search(db, "ram bah") == [100001]
+    assert _search(db, "थापा") == [100001]
+    assert _search(db, "सी") == [100002]
+    assert _search(db, "काँग्रेस") == [100001]           # party name
+    assert _search(db, "RSP") == [100002]                # party key
+    assert _search(db, "काठमाडौं") == [100001, 100002]   # district, via the code
+    assert _search(db, 'ram" OR "sita') == []            # operators are literal
+    assert get_candidates(db, q="  ")["total"] == 0
+    assert _search(db, "ram !! --") == [100001]         # punctuation terms dropped
+
+
+def test_search_without_terms_returns_the_full_envelope(db):
+    save_constituency_results(db, [_searchable_result()])
+    expected = get_candidates(db, q="nobody-matches-this")
+    for q in ("  ", "!!! -- ...", '"*'):
+        result = get_candidates(db, q=q)
+        assert result.keys() == expected.keys()
+        assert result["version"] == get_data_version(db)
+        assert (result["total"], result["items"], result["next"]) == (0, [], None)
+
+
+def test_search_ranks_name_matches_first(db):
+    save_constituency_results(db, [_searchable_result()])
+    # Both are in Kathmandu; only Sita has it in her name, despite fewer votes.
+    assert _search(db, "kathmandu") == [100002, 100001]
+
+
+def test_search_index_follows_profile_changes(db):
+    save_constituency_results(db, [_searchable_result()])
+    result = _searchable_result()
+    result["candidates"][0]["name"] = "Hari Prasad"
+    result["candidates"].pop()
+    save_constituency_results(db, [result])
+    assert _search(db, "ram") == []
+    assert _search(db, "hari") == [100001]
+    assert _search(db, "sita") == []
+
+
+def _many_candidates(n: int = 23) -> list[dict]:
+    return [{
+        "code": "KTM-1", "name": "Kathmandu-1", "province": "Bagmati",
+        "district": "Kathmandu", "status": "COUNTING",
+        "last_updated": "2026-03-05T10:00:00+00:00",
+        # Repeated vote counts exercise the id tie-break.
+        "candidates": [
+            {"candidateId": 1000 + i, "name": f"Candidate {i}", "party": "NC" if i % 2 else "RSP", "votes": (i % 7) * 100}
+            for i in range(n)
+        ],
+    }]
+
+
+def _walk(conn, **filters) -> list[int]:
+    ids: list[int] = []
+    cursor = None
+    while True:
+        page = get_candidates(conn, page_size=5, cursor=cursor, **filters)
+        ids += [c["id"] for c in page["items"]]
+        cursor = page["next"]
+        if cursor is None:
+            return ids
+
+
+def test_cursor_pages_match_a_single_listing(db):
+    save_constituency_results(db, _many_candidates())
+    everything = [c["id"] for c in get_candidates(db, page_size=100)["items"]]
+    assert _walk(db) == everything
+    assert _walk(db, party="NC") == [c["id"] for c in get_candidates(db, party="NC", page_size=100)["items"]]
+    assert _walk(db, q="candidate") == [c["id"] for c in get_candidates(db, q="candidate", page_size=100)["items"]]
+    assert len(everything) == 23
+
+
+def test_deep_cursor_pages_cost_the_same_as_page_one(db):
+    save_constituency_results(db, _many_candidates())
+    first = get_candidates(db, page_size=5)
+    deep = get_candidates(db, page_size=5, cursor=first["next"])
+    assert _select_count(db, lambda: get_candidates(db, page_size=5, cursor=deep["next"])) == 2
+    plan = " | ".join(row[3] for row in db.execute(
+        "EXPLAIN QUERY PLAN SELECT candidate_id FROM candidate_votes v "
+        "WHERE v.votes < 300 OR (v.votes = 300 AND v.candidate_id > 1003) "
+        "ORDER BY v.votes DESC, v.candidate_id LIMIT 6"
+    ))
+    assert "idx_candidate_votes_votes" in plan
+
+
+def test_cursor_is_pinned_to_the_data_version(db):
+    save_constituency_results(db, _many_candidates())
+    first = get_candidates(db, page_size=5)
+    assert "stale" not in get_candidates(db, page_size=5, cursor=first["next"])
+    results = _many_candidates()
+    results[0]["candidates"][0]["votes"] = 5000
+    save_constituency_results(db, results)
+    later = get_candidates(db, page_size=5, cursor=first["next"])
+    assert later["stale"] is True
+    assert later["version"] == first["version"] + 1
+
+
+def test_totals_come_from_materialised_counts(db):
+    save_constituency_results(db, _many_candidates())
+    assert get_candidates(db)["total"] == 23
+    assert get_candidates(db, party="NC")["total"] == 11
+    assert get_candidates(db, constituency="KTM-1", party="RSP")["total"] == 12
+    assert get_candidates(db, q="candidate")["total"] is None
+    assert get_candidates(db, q="candidate", include_total=True)["total"] == 23
+
+
+def test_invalid_cursor_is_rejected(db):
+    for cursor in ("not-a-cursor", "WzEsMl0", ""):
+        with pytest.raises(ValueError):
+            get_candidates(db, cursor=cursor)
+
+
+_ELECTION_DAY = datetime(2026, 3, 5, 10, 0, tzinfo=timezone.utc)
+
+
+def _save_history(conn, minutes: int) -> None:
+    """One snapshot every 30 s; NC gains a seat every 10 minutes."""
+    for i in range(minutes * 2):
+        save_snapshot(conn, {
+            "taken_at": (_ELECTION_DAY + timedelta(seconds=30 * i)).isoformat(),
+            "declared_seats": i // 20,
+            "seat_tally": {"NC": {"fptp": i // 20, "pr": 0}},
+        })
+
+
+def test_snapshot_history_keeps_the_last_snapshot_per_bucket(db):
+    _save_history(db, 60)
+    points = get_snapshot_history(db, step=600)
+    assert [p["lastUpdated"] for p in points] == [
+        (_ELECTION_DAY + timedelta(minutes=10 * b, seconds=570)).isoformat() for b in range(6)
+    ]
+    assert [p["seatTally"]["NC"]["fptp"] for p in points] == [0, 1, 2, 3, 4, 5]
+    assert points[0]["seatTally"]["RSP"] == {"fptp": 0, "pr": 0}
+
+
+def test_snapshot_history_range_is_half_open(db):
+    _save_history(db, 60)
+    points = get_snapshot_history(
+        db,
+        start=_ELECTION_DAY + timedelta(minutes=20),
+        end=(_ELECTION_DAY + timedelta(minutes=40)).replace(tzinfo=None),  # naive = UTC
+        step=300,
+    )
+    assert [p["lastUpdated"][11:19] for p in points] == ["10:24:30", "10:29:30", "10:34:30", "10:39:30"]
+    with pytest.raises(ValueError):
+        get_snapshot_history(db, step=0)
+
+
+def test_snapshot_history_scans_the_taken_at_index(db):
+    plan = " | ".join(row[3] for row in db.execute(
+        "EXPLAIN QUERY PLAN SELECT MAX(id) FROM snapshots WHERE taken_at >= '2026' "
+        "GROUP BY CAST(strftime('%s', taken_at) AS INTEGER) / 300"
+    ))
+    assert "COVERING INDEX idx_snapshots_taken_at" in plan
+
+
+def test_vote_history_records_only_changes(db):
+    save_constituency_results(db, [_camel_case_result(1000)])
+    save_constituency_results(db, [_camel_case_result(1000)])              # nothing moved
+    save_constituency_results(db, [_camel_case_result(1000, "DECLARED")])  # status only
+    save_constituency_results(db, [_camel_case_result(1500, "DECLARED")])
+    assert db.execute("SELECT COUNT(*) FROM vote_history").fetchone()[0] == 3
+    ram = get_candidate_history(db, 100001)
+    assert ram["votes"] == [1000, 1500]
+    assert ram["versions"] == [1, 3]
+    assert all(ram["times"])
+    assert get_candidate_history(db, 100002)["votes"] == [900]
+    assert get_candidate_history(db, 999) is None
+
+
+def test_constituency_history_aligns_candidates_on_one_axis(db):
+    save_constituency_results(db, [_camel_case_result(1000)])
+    save_constituency_results(db, [_camel_case_result(1500)])
+    result = _camel_case_result(1500)
+    result["candidates"][1]["votes"] = 1600
+    result["candidates"].append({"candidateId": 100003, "name": "Hari", "partyName": "", "votes": 10})
+    save_constituency_results(db, [result])
+    history = get_constituency_history(db, "3-काठमाडौं-1")
+    assert history["versions"] == [1, 2, 3]
+    assert history["candidates"] == {
+        "100001": [1000, 1500, 1500],
+        "100002": [900, 900, 1600],
+        "100003": [None, None, 10],
+    }
+    assert get_constituency_history(db, "nowhere") is None
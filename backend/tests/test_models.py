@@ -0,0 +1,52 @@
+"""
+Tests for models.py — bio interning and serialisation of the slotted model.
+"""
+
+import json
+from pathlib import Path
+
+import scraper
+from models import json_default
+
+FIXTURE = Path(__file__).parent / "fixtures" / "fptp_results.json"
+NOW = "2026-03-05T10:00:00+00:00"
+
+
+def load_fixture() -> list[dict]:
+    return json.loads(FIXTURE.read_text(encoding="utf-8"))
+
+
+def _models(records: list[dict]) -> list:
+    return scraper.aggregate_records(records, now=NOW)["constituencies"]
+
+
+def test_json_default_matches_to_dict():
+    models = _models(load_fixture())
+    assert json.loads(json.dumps(models, default=json_default)) == [c.to_dict() for c in models]
+
+
+def test_to_dict_omits_absent_bio_fields():
+    records = load_fixture()
+    records[0]["FATHER_NAME"] = "-"
+    records[0]["AGE_YR"] = 0
+    cand = _models(records)[0].candidates[0].to_dict()
+    assert "fatherName" not in cand
+    assert "age" not in cand
+
+
+def test_bio_is_shared_across_cycles():
+    first = _models(load_fixture())
+    records = load_fixture()
+    records[0]["TotalVoteReceived"] += 100
+    second = _models(records)
+    assert second[0].candidates[0].votes == first[0].candidates[0].votes + 100
+    assert second[0].candidates[0].bio is first[0].candidates[0].bio
+
+
+def test_bio_is_replaced_when_upstream_corrects_it():
+    first = _models(load_fixture())
+    records = load_fixture()
+    records[0]["QUALIFICATION"] = "स्नातकोत्तर"
+    second = _models(records)
+    assert second[0].candidates[0].bio is not first[0].candidates[0].bio
+    assert second[0].candidates[0].to_dict()["qualification"] == "स्नातकोत्तर"
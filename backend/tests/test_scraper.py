@@ -1,7 +1,17 @@
+import asyncio
 import json
+import time
+import httpx
 import pytest
 from pathlib import Path
+import scraper
 from scraper import (
+    UNCHANGED,
+    ChangeTracker,
+    UpstreamSession,
+    fetch_candidates,
+    reset_fetch_state,
+    scrape_results,
     map_party_key,
     constituency_id,
     is_winner,
@@ -190,3 +200,478 @@ def test_build_snapshot_all_parties_present():
 def test_build_snapshot_total_seats():
     snap = build_snapshot_from_constituencies([])
     assert snap["total_seats"] == 275
+
+
+# ── fetch_candidates: conditional GET + content hash ─────────────────────────
+
+
+class FakeUpstream:
+    """httpx MockTransport handler emulating the election commission host."""
+
+    def __init__(self, body: bytes, *, etag: str | None = None) -> None:
+        self.body = body
+        self.etag = etag
+        self.bootstrap_requests = 0
+        self.data_requests: list[httpx.Request] = []
+        self.reject_next = 0
+        self.primary_delay = 0.0
+        self.bootstrap_delay = 0.0
+        # feed file name (e.g. "HOR-T5Leader") → (rows or HTTP status, delay in seconds)
+        self.optional: dict[str, tuple[list[dict] | int, float]] = {}
+        # Direct JSON file (no session): (body, delay) or None for 404
+        self.direct: tuple[bytes, float] | None = None
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith(".txt"):
+            if self.direct is None:
+                return httpx.Response(404)
+            body, delay = self.direct
+            await asyncio.sleep(delay)
+            return httpx.Response(200, content=body)
+        if "SecureJson.ashx" not in str(request.url):
+            self.bootstrap_requests += 1
+            await asyncio.sleep(self.bootstrap_delay)
+            return httpx.Response(
+                200,
+                text="<html></html>",
+                headers=[
+                    ("Set-Cookie", f"ASP.NET_SessionId=s{self.bootstrap_requests}; Path=/"),
+                    ("Set-Cookie", f"CsrfToken=t{self.bootstrap_requests}; Path=/"),
+                ],
+            )
+        if "ElectionResultCentral2082" not in str(request.url):
+            for name, (rows, delay) in self.optional.items():
+                if name in str(request.url):
+                    await asyncio.sleep(delay)
+                    if isinstance(rows, int):
+                        return httpx.Response(rows)
+                    return httpx.Response(200, json=rows)
+            return httpx.Response(404)  # optional HOR feeds unavailable
+        self.data_requests.append(request)
+        await asyncio.sleep(self.primary_delay)
+        if self.reject_next:
+            self.reject_next -= 1
+            return httpx.Response(403)
+        if self.etag and request.headers.get("If-None-Match") == self.etag:
+            return httpx.Response(304)
+        headers = {"ETag": self.etag} if self.etag else {}
+        return httpx.Response(200, content=self.body, headers=headers)
+
+
+@pytest.fixture
+def upstream():
+    scraper._feed_state.clear()
+    reset_fetch_state()
+    yield FakeUpstream(b"\xef\xbb\xbf" + FIXTURE.read_bytes())
+    scraper._feed_state.clear()
+    reset_fetch_state()
+
+
+@pytest.fixture
+async def session(upstream):
+    s = UpstreamSession(transport=httpx.MockTransport(upstream))
+    yield s
+    await s.aclose()
+
+
+async def test_fetch_candidates_unchanged_bytes_short_circuit(session):
+    first = await fetch_candidates(session=session)
+    assert isinstance(first, list) and len(first) == 5
+    assert await fetch_candidates(session=session) is UNCHANGED
+
+
+async def test_fetch_candidates_changed_bytes_are_returned(upstream, session):
+    await fetch_candidates(session=session)
+    records = load_fixture()
+    records[0]["TotalVoteReceived"] += 1
+    upstream.body = json.dumps(records).encode("utf-8")
+    second = await fetch_candidates(session=session)
+    assert second is not UNCHANGED
+    assert second[0]["TotalVoteReceived"] == records[0]["TotalVoteReceived"]
+
+
+async def test_fetch_candidates_sends_etag_and_handles_304(upstream, session):
+    upstream.etag = '"v1"'
+    await fetch_candidates(session=session)
+    assert await fetch_candidates(session=session) is UNCHANGED
+    assert upstream.data_requests[-1].headers["If-None-Match"] == '"v1"'
+
+
+async def test_reset_fetch_state_forces_republish_after_304(upstream, session):
+    upstream.etag = '"v1"'
+    await fetch_candidates(session=session)
+    reset_fetch_state()
+    again = await fetch_candidates(session=session)
+    assert isinstance(again, list) and len(again) == 5
+
+
+async def test_scrape_results_propagates_unchanged(session):
+    aggregate, changes = await scrape_results(session=session)
+    assert len(aggregate["constituencies"]) == 2
+    assert changes.full
+    assert await scrape_results(session=session) is UNCHANGED
+
+
+# ── UpstreamSession ───────────────────────────────────────────────────────────
+
+async def test_session_is_reused_across_cycles(upstream, session):
+    await fetch_candidates(session=session)
+    await fetch_candidates(session=session)
+    assert upstream.bootstrap_requests == 1
+    stats = session.stats()
+    assert stats["bootstraps"] == 1
+    assert stats["rebootstraps"] == 0
+    assert stats["sessionAgeSeconds"] is not None
+
+
+async def test_session_rebootstraps_on_403(upstream, session):
+    await fetch_candidates(session=session)
+    upstream.reject_next = 1
+    reset_fetch_state()
+    result = await fetch_candidates(session=session)
+    assert isinstance(result, list)
+    assert upstream.bootstrap_requests == 2
+    assert upstream.data_requests[-1].headers["X-CSRF-Token"] == "t2"
+    assert session.stats()["rebootstrapReasons"] == {"auth": 1}
+
+
+async def test_session_rebootstraps_after_max_age(upstream):
+    session = UpstreamSession(transport=httpx.MockTransport(upstream), max_age_seconds=0)
+    await session.ensure()
+    await session.ensure()
+    assert upstream.bootstrap_requests == 2
+    assert session.stats()["rebootstrapReasons"] == {"max_age": 1}
+    await session.aclose()
+
+
+# ── fetch_candidates: concurrent optional feeds ──────────────────────────────
+
+async def test_optional_feeds_are_merged_when_on_time(upstream, session):
+    upstream.optional["HOR-T5Leader"] = ([{"CandidateID": 100001, "TotalVoteReceived": 15000}], 0)
+    upstream.optional["HOR-T5Winner"] = ([{"CandidateID": 100002, "TotalVoteReceived": 9500}], 0)
+    records = await fetch_candidates(session=session)
+    by_id = {r["CandidateID"]: r for r in records}
+    assert by_id[100001]["TotalVoteReceived"] == 15000
+    assert by_id[100002]["E_STATUS"] == "W"
+
+
+async def test_optional_feeds_run_concurrently_with_primary(upstream, session, monkeypatch):
+    monkeypatch.setitem(scraper.OPTIONAL_FEED_TIMEOUTS, scraper.UPSTREAM_HOR_MERGE_URL, 2.0)
+    await session.ensure()
+    upstream.primary_delay = 0.3
+    upstream.optional["HOR-T5Leader"] = ([{"CandidateID": 100001, "TotalVoteReceived": 15000}], 0.3)
+    t0 = time.perf_counter()
+    records = await fetch_candidates(session=session)
+    elapsed = time.perf_counter() - t0
+    assert elapsed < 0.55
+    assert records[0]["TotalVoteReceived"] == 15000
+
+
+async def test_slow_optional_feed_does_not_delay_primary(upstream, session, monkeypatch):
+    monkeypatch.setitem(scraper.OPTIONAL_FEED_TIMEOUTS, scraper.UPSTREAM_HOR_MERGE_URL, 0.1)
+    upstream.optional["HOR-T5Leader"] = ([{"CandidateID": 100001, "TotalVoteReceived": 15000}], 5)
+    t0 = time.perf_counter()
+    records = await fetch_candidates(session=session)
+    assert time.perf_counter() - t0 < 1.0
+    assert records[0]["TotalVoteReceived"] == 12000
+
+
+async def test_optional_feed_auth_failure_keeps_the_session(upstream, session):
+    await session.ensure()
+    upstream.primary_delay = 0.1
+    upstream.optional["HOR-T5Leader"] = (403, 0)
+    upstream.optional["HOR-T5Winner"] = (401, 0)
+    records = await fetch_candidates(session=session)
+    assert records[0]["TotalVoteReceived"] == 12000
+    assert upstream.bootstrap_requests == 1
+    assert upstream.data_requests[-1].headers["X-CSRF-Token"] == "t1"
+    assert session.stats()["rebootstraps"] == 0
+
+
+async def test_optional_feeds_are_not_merged_after_direct_fallback(upstream, session):
+    await session.ensure()
+    upstream.reject_next = 2  # secure handler refuses the session twice → direct file
+    upstream.direct = (FIXTURE.read_bytes(), 0)
+    upstream.optional["HOR-T5Leader"] = ([{"CandidateID": 100001, "TotalVoteReceived": 15000}], 0)
+    upstream.optional["HOR-T5Winner"] = ([{"CandidateID": 100002, "TotalVoteReceived": 9500}], 0)
+    records = await fetch_candidates(session=session)
+    by_id = {r["CandidateID"]: r for r in records}
+    assert by_id[100001]["TotalVoteReceived"] == 12000
+    assert by_id[100002].get("E_STATUS") != "W"
+
+
+async def test_optional_feed_deadline_starts_after_the_session(upstream, session, monkeypatch):
+    monkeypatch.setitem(scraper.OPTIONAL_FEED_TIMEOUTS, scraper.UPSTREAM_HOR_MERGE_URL, 0.2)
+    upstream.bootstrap_delay = 0.3
+    upstream.optional["HOR-T5Leader"] = ([{"CandidateID": 100001, "TotalVoteReceived": 15000}], 0.1)
+    records = await fetch_candidates(session=session)
+    assert records[0]["TotalVoteReceived"] == 15000
+
+
+# ── fetch_candidates: hedged requests ────────────────────────────────────────
+
+def _fixture_bytes_with_votes(delta: int) -> bytes:
+    records = load_fixture()
+    for rec in records:
+        rec["TotalVoteReceived"] += delta
+    return json.dumps(records).encode("utf-8")
+
+
+@pytest.fixture
+def hedged(monkeypatch):
+    monkeypatch.setattr(scraper, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(scraper, "HEDGE_DEFAULT_DELAY_SECONDS", 0.05)
+
+
+async def test_hedge_fires_direct_when_secure_is_slow(upstream, session, hedged):
+    await session.ensure()
+    upstream.primary_delay = 2.0
+    upstream.direct = (FIXTURE.read_bytes(), 0)
+    t0 = time.perf_counter()
+    records = await fetch_candidates(session=session)
+    assert time.perf_counter() - t0 < 1.0
+    assert len(records) == 5
+    assert session.health[scraper.DIRECT_UPSTREAM_URL].successes == 1
+
+
+async def test_hedge_prefers_freshest_payload(upstream, session, hedged):
+    await session.ensure()
+    upstream.body = _fixture_bytes_with_votes(+100)
+    upstream.primary_delay = 0.1
+    upstream.direct = (FIXTURE.read_bytes(), 0)
+    records = await fetch_candidates(session=session)
+    assert records[0]["TotalVoteReceived"] == 12100
+
+
+async def test_hedge_not_fired_when_secure_is_fast(upstream, session, hedged):
+    upstream.direct = (FIXTURE.read_bytes(), 0)
+    await session.ensure()
+    await fetch_candidates(session=session)
+    direct = session.health[scraper.DIRECT_UPSTREAM_URL]
+    assert direct.successes == 0 and direct.failures == 0
+
+
+def test_health_scores_steer_source_order():
+    session = UpstreamSession()
+    assert session.rank_sources([scraper.UPSTREAM_URL, scraper.DIRECT_UPSTREAM_URL])[0] == scraper.UPSTREAM_URL
+    for _ in range(5):
+        session.source_health(scraper.UPSTREAM_URL).record(False, 1.0)
+    ranked = session.rank_sources([scraper.UPSTREAM_URL, scraper.DIRECT_UPSTREAM_URL])
+    assert ranked[0] == scraper.DIRECT_UPSTREAM_URL
+
+
+def test_hedge_delay_uses_latency_percentile():
+    session = UpstreamSession()
+    health = session.source_health(scraper.UPSTREAM_URL)
+    assert session.hedge_delay(scraper.UPSTREAM_URL) == scraper.HEDGE_DEFAULT_DELAY_SECONDS
+    for latency in (0.3, 0.4, 0.5, 0.6, 3.0):
+        health.record(True, latency)
+    assert session.hedge_delay(scraper.UPSTREAM_URL) == 3.0
+
+
+# ── ChangeTracker ─────────────────────────────────────────────────────────────
+
+KTM1 = "3-काठमाडौं-1"
+LTP1 = "3-ललितपुर-1"
+
+
+def test_change_tracker_first_update_is_full():
+    changes = ChangeTracker().update(load_fixture())
+    assert changes.full
+    assert changes.constituencies == {KTM1, LTP1}
+
+
+def test_change_tracker_identical_payload_is_empty():
+    tracker = ChangeTracker()
+    tracker.update(load_fixture())
+    changes = tracker.update(load_fixture())
+    assert not changes
+    assert changes.candidates == {}
+
+
+def test_change_tracker_reports_vote_changes_per_constituency():
+    tracker = ChangeTracker()
+    tracker.update(load_fixture())
+    records = load_fixture()
+    records[0]["TotalVoteReceived"] += 50
+    changes = tracker.update(records)
+    assert changes.candidates == {100001: (12000, 12050)}
+    assert changes.constituencies == {KTM1}
+    assert changes.new_winners == []
+
+
+def test_change_tracker_reports_new_winner_and_lead_change():
+    tracker = ChangeTracker()
+    tracker.update(load_fixture())
+    records = load_fixture()
+    sita = next(r for r in records if r["CandidateID"] == 100002)
+    sita["TotalVoteReceived"] = 20000
+    sita["E_STATUS"] = "W"
+    changes = tracker.update(records)
+    assert changes.new_winners == [100002]
+    assert changes.lead_changes == {KTM1: (100001, 100002)}
+
+
+def test_change_tracker_reports_removed_candidates():
+    tracker = ChangeTracker()
+    tracker.update(load_fixture())
+    records = [r for r in load_fixture() if r["CandidateID"] != 100001]
+    changes = tracker.update(records)
+    assert changes.removed == {100001}
+    assert KTM1 in changes.constituencies
+
+
+# ── IncrementalParser ─────────────────────────────────────────────────────────
+
+def _replayed_payloads() -> list[list[dict]]:
+    """A sequence of payloads as they might arrive over a counting day."""
+    payloads = [load_fixture()]
+
+    def step(mutate):
+        records = json.loads(json.dumps(payloads[-1]))
+        mutate(records)
+        payloads.append(records)
+
+    step(lambda rs: None)                                           # identical
+    step(lambda rs: rs[0].__setitem__("TotalVoteReceived", 12500))  # votes in KTM-1
+    step(lambda rs: rs[1].update(TotalVoteReceived=13000, E_STATUS="W"))  # new winner
+    step(lambda rs: rs[4].__setitem__("QUALIFICATION", "स्नातकोत्तर"))  # bio fix in LTP-1
+    step(lambda rs: rs.pop(2))                                      # candidate withdrawn
+    step(lambda rs: rs.append({**rs[0], "CandidateID": 100009, "SCConstID": 2}))  # new constituency
+    return payloads
+
+
+def test_incremental_parse_matches_full_parse_over_replay():
+    parser = scraper.IncrementalParser()
+    now = "2026-03-05T10:00:00+00:00"
+    for payload in _replayed_payloads():
+        assert parser.parse(payload, now=now) == parse_candidates_json(payload, now=now)
+
+
+def test_incremental_parse_rebuilds_only_changed_constituencies():
+    parser = scraper.IncrementalParser()
+    first = [c for c, _ in parser.build_all(load_fixture())]
+    records = load_fixture()
+    records[0]["TotalVoteReceived"] = 12500
+    second = [c for c, _ in parser.build_all(records)]
+    assert (parser.rebuilt, parser.reused) == (1, 1)
+    ltp_before = next(c for c in first if c.code == LTP1)
+    ltp_after = next(c for c in second if c.code == LTP1)
+    assert ltp_after.candidates is ltp_before.candidates
+    assert ltp_after.last_updated >= ltp_before.last_updated
+
+
+# ── RecordExtractor ───────────────────────────────────────────────────────────
+
+def _alternate_spelling_payload() -> list[dict]:
+    records = []
+    for rec in load_fixture():
+        records.append({
+            "CandidateId":        str(rec["CandidateID"]),
+            "CandidateName":      rec["CandidateName"],
+            "Gender":             rec["Gender"],
+            "PoliticalPartyName": rec["PoliticalPartyName"],
+            "SymbolID":           rec["SYMBOLCODE"],
+            "State":              rec["STATE_ID"],
+            "District":           rec["DistrictName"],
+            "ScConstId":          rec["SCConstID"],
+            "TotalVote":          rec["TotalVoteReceived"],
+            "Age":                rec["AGE_YR"],
+            "E_STATUS":           rec["E_STATUS"],
+        })
+    return records
+
+
+def test_specialised_extractor_matches_generic_on_fixture():
+    raw = load_fixture()
+    now = "2026-03-05T10:00:00+00:00"
+    assert (
+        parse_candidates_json(raw, now=now)
+        == parse_candidates_json(raw, now=now, extractor=scraper.GENERIC_EXTRACTOR)
+    )
+
+
+def test_specialised_extractor_matches_generic_on_alternate_spellings():
+    raw = _alternate_spelling_payload()
+    now = "2026-03-05T10:00:00+00:00"
+    specialised = parse_candidates_json(raw, now=now)
+    assert specialised == parse_candidates_json(raw, now=now, extractor=scraper.GENERIC_EXTRACTOR)
+    assert specialised[0]["candidates"][0]["partyId"] == "1001"
+
+
+def test_specialised_extractor_respects_spelling_precedence_in_mixed_payload():
+    raw = _alternate_spelling_payload()
+    raw[1]["SYMBOLCODE"] = 4242   # higher-priority spelling than the sample's SymbolID
+    raw[2]["TotalVote"] = "4200"  # string value → generic path
+    now = "2026-03-05T10:00:00+00:00"
+    specialised = parse_candidates_json(raw, now=now)
+    assert specialised == parse_candidates_json(raw, now=now, extractor=scraper.GENERIC_EXTRACTOR)
+    assert specialised[0]["candidates"][1]["partyId"] == "4242"
+
+
+def test_extractor_is_cached_per_schema_signature():
+    assert scraper.extractor_for(load_fixture()) is scraper.extractor_for(load_fixture()[::-1])
+    assert scraper.extractor_for(load_fixture()) is not scraper.extractor_for(_alternate_spelling_payload())
+    assert scraper.extractor_for([]) is scraper.GENERIC_EXTRACTOR
+
+
+# ── aggregate_records ─────────────────────────────────────────────────────────
+
+def _separate_pass_aggregates(constituencies: list[dict]) -> tuple[dict, dict, dict]:
+    seats: dict[str, int] = {}
+    tally: dict[str, int] = {}
+    votes: dict[str, int] = {}
+    for c in constituencies:
+        for cand in c["candidates"]:
+            votes[cand["partyId"]] = votes.get(cand["partyId"], 0) + cand["votes"]
+        if c["status"] == "DECLARED":
+            top = min(c["candidates"], key=lambda cand: (-cand["votes"], cand["candidateId"]))
+            seats[top["partyId"]] = seats.get(top["partyId"], 0) + 1
+            key = map_party_key(top["partyName"])
+            tally[key] = tally.get(key, 0) + 1
+    return seats, tally, votes
+
+
+def test_aggregate_records_matches_separate_passes_over_replay():
+    now = "2026-03-05T10:00:00+00:00"
+    parser = scraper.IncrementalParser()
+    for payload in _replayed_payloads():
+        agg = scraper.aggregate_records(payload, now=now, parser=parser)
+        constituencies = parse_candidates_json(payload, now=now)
+        constituencies.sort(key=lambda c: (c["province"], c["district"], c["name"]))
+        assert [c.to_dict() for c in agg["constituencies"]] == constituencies
+
+        seats, tally, votes = _separate_pass_aggregates(constituencies)
+        assert agg["snapshot"]["declaredSeats"] == sum(seats.values())
+        assert agg["snapshot"]["seatTally"] == {p: {"fptp": n, "pr": 0} for p, n in tally.items()}
+        assert {p["party"]: p["totalVotes"] for p in agg["parties"]} == votes
+        assert {p["party"]: p["seatsWon"] for p in agg["parties"] if p["seatsWon"]} == seats
+
+
+def test_aggregate_records_province_totals():
+    records = load_fixture()
+    agg = scraper.aggregate_records(records, now="2026-03-05T10:00:00+00:00")
+    (bagmati,) = agg["provinces"]
+    assert bagmati["province"] == "Bagmati"
+    assert (bagmati["constituencies"], bagmati["declared"], bagmati["counting"]) == (2, 1, 1)
+    assert bagmati["votesCast"] == sum(r["TotalVoteReceived"] for r in records)
+    assert bagmati["seatTally"] == {map_party_key(records[3]["PoliticalPartyName"]): 1}
+
+
+def test_aggregate_records_uses_the_official_winner_flag_only():
+    # KTM-1's rank-1 candidate has votes but no E_STATUS: still counting.
+    agg = scraper.aggregate_records(load_fixture(), now="2026-03-05T10:00:00+00:00")
+    ktm = next(c for c in agg["constituencies"] if c.code == "3-काठमाडौं-1")
+    assert ktm.status == "COUNTING"
+    assert not any(c.is_winner for c in ktm.candidates)
+    assert agg["snapshot"]["declaredSeats"] == 1
+
+
+def test_aggregate_records_skips_constituencies_without_a_province():
+    records = load_fixture()
+    stray = dict(records[0], CandidateID=900001, STATE_ID=9)
+    agg = scraper.aggregate_records([*records, stray], now="2026-03-05T10:00:00+00:00")
+    assert [p["province"] for p in agg["provinces"]] == ["Bagmati"]
+    assert all(c.province == "Bagmati" for c in agg["constituencies"])
+    totals = {p["party"]: p["totalVotes"] for p in agg["parties"]}
+    assert totals == {p["party"]: p["totalVotes"] for p in scraper.aggregate_records(records)["parties"]}
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+
+import stream
+from broadcast import Patch
+from stream import EventStream
+
+
+def _patch(base: int | None, version: int) -> Patch:
+    message = {
+        "type": "constituency_patch", "version": version, "base": base,
+        "snapshot": {}, "constituencies": [{"code": f"C-{version}", "candidates": []}],
+    }
+    return Patch(message, [frozenset()])
+
+
+async def _state() -> tuple[int, bytes]:
+    return 3, stream.sse_frame({"type": "state", "version": 3}, 3)
+
+
+def _parse(frame: bytes) -> tuple[int | None, str, dict]:
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    return (
+        int(fields["id"]) if "id" in fields else None,
+        fields["event"],
+        json.loads(fields["data"]),
+    )
+
+
+async def _take(events, n: int) -> list[bytes]:
+    frames = [await anext(events) for _ in range(n)]
+    await events.aclose()
+    return frames
+
+
+@pytest.fixture
+def published() -> EventStream:
+    hub = EventStream()
+    for base, version in ((None, 1), (1, 2), (2, 3)):
+        hub.publish(_patch(base, version))
+    return hub
+
+
+async def test_new_client_gets_full_state(published):
+    retry, state = await _take(published.events(None, _state), 2)
+    assert retry.startswith(b"retry: ")
+    assert _parse(state)[:2] == (3, "state")
+
+
+async def test_reconnect_replays_only_missed_events(published):
+    frames = await _take(published.events("1", _state), 3)
+    assert [_parse(f)[0] for f in frames[1:]] == [2, 3]
+    assert _parse(frames[1])[2]["constituencies"][0]["code"] == "C-2"
+
+
+async def test_reconnect_beyond_ring_gets_full_state():
+    hub = EventStream(history=2)
+    for base, version in ((1, 2), (2, 3), (3, 4)):
+        hub.publish(_patch(base, version))
+    assert hub.missed(1) is None
+    assert [v for v, _ in hub.missed(2)] == [3, 4]
+    assert hub.missed(4) == []
+    assert hub.missed(99) is None
+    retry, state = await _take(hub.events("1", _state), 2)
+    assert _parse(state)[1] == "state"
+
+
+async def test_live_patches_follow_replay_without_duplicates(published):
+    events = published.events("3", _state)
+    await anext(events)  # retry
+    pending = asyncio.ensure_future(anext(events))
+    await asyncio.sleep(0)
+    published.publish(_patch(3, 4))
+    frame = await asyncio.wait_for(pending, 1)
+    await events.aclose()
+    assert _parse(frame)[0] == 4
+    assert len(published) == 0
+
+
+async def test_lagging_listener_is_disconnected(published, monkeypatch):
+    monkeypatch.setattr(stream, "STREAM_QUEUE_SIZE", 1)
+    events = published.events("3", _state)
+    await anext(events)
+    pending = asyncio.ensure_future(anext(events))
+    await asyncio.sleep(0)
+    for version in range(4, 7):
+        published.publish(_patch(version - 1, version))
+    assert _parse(await pending)[0] == 4
+    assert [f async for f in events] == []
+    assert len(published) == 0
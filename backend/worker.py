@@ -4,11 +4,12 @@ worker.py — Background scraper worker for the Nepal Election Live Vote Counter
 Architecture (spike-safe):
   Every 30 s:
     1. Fetch the upstream election JSON from result.election.gov.np
-    2. Normalise + aggregate into snapshot / constituencies / parties
-    3. Upload three static JSON files to Cloudflare R2 (S3-compatible):
+    2. Normalise + aggregate in one pass (scraper.aggregate_records)
+    3. Upload static JSON files to Cloudflare R2 (S3-compatible):
          snapshot.json
          constituencies.json
          parties.json
+         provinces.json
 
 No HTTP server. No WebSocket. No database.
 The frontend reads these files directly from the R2 public CDN URL.
@@ -30,7 +31,12 @@ import os
 
 from dotenv import load_dotenv
 
-from scraper import scrape_results, build_snapshot_from_constituencies
+from scraper import (
+    UNCHANGED,
+    reset_fetch_state,
+    scrape_results,
+    session_stats,
+)
 from r2 import upload_json
 
 load_dotenv()
@@ -44,62 +50,46 @@ logging.basicConfig(
 log = logging.getLogger(__name__)
 
 
-def build_parties(constituencies: list[dict]) -> list[dict]:
-    """
-    Aggregate per-party seat counts and total votes from constituency results.
-    Returns a list of party dicts sorted by seats won (descending).
-    """
-    seat_counts: dict[str, int] = {}
-    total_votes: dict[str, int] = {}
-
-    for c in constituencies:
-        if not c.get("candidates"):
-            continue
-        for cand in c["candidates"]:
-            party = cand["party"]
-            total_votes[party] = total_votes.get(party, 0) + cand.get("votes", 0)
-
-        if c["status"] == "DECLARED":
-            winner = max(c["candidates"], key=lambda x: x.get("votes", 0))
-            party = winner["party"]
-            seat_counts[party] = seat_counts.get(party, 0) + 1
-
-    all_parties = set(seat_counts) | set(total_votes)
-    parties = [
-        {
-            "party":      p,
-            "seatsWon":   seat_counts.get(p, 0),
-            "totalVotes": total_votes.get(p, 0),
-        }
-        for p in all_parties
-    ]
-    parties.sort(key=lambda x: (-x["seatsWon"], -x["totalVotes"]))
-    return parties
-
-
 async def run_loop() -> None:
     log.info("Worker starting. Scrape interval: %ds", SCRAPE_INTERVAL)
     while True:
         try:
             log.info("Scraping upstream…")
-            constituencies, snapshot = await scrape_results()
-
-            parties = build_parties(constituencies)
-
+            result = await scrape_results()
+
+            if result is UNCHANGED:
+                log.info("Upstream unchanged since last cycle — skipping parse and upload")
+            else:
+                aggregate, changes = result
+                constituencies = aggregate["constituencies"]
+                snapshot       = aggregate["snapshot"]
+                parties        = aggregate["parties"]
+
+                log.info(
+                    "Scraped: %d constituencies, %d declared, %d parties (changes: %s)",
+                    len(constituencies),
+                    snapshot["declaredSeats"],
+                    len(parties),
+                    changes.summary(),
+                )
+
+                upload_json("snapshot.json",       snapshot)
+                upload_json("constituencies.json", constituencies)
+                upload_json("parties.json",        parties)
+                upload_json("provinces.json",      aggregate["provinces"])
+
+                log.info("Uploaded snapshot.json, constituencies.json, parties.json, provinces.json → R2")
+
+            stats = session_stats()
             log.info(
-                "Scraped: %d constituencies, %d declared, %d parties",
-                len(constituencies),
-                snapshot["declared_seats"],
-                len(parties),
+                "Upstream session age %ss, %d re-bootstraps",
+                stats["sessionAgeSeconds"],
+                stats["rebootstraps"],
             )
 
-            upload_json("snapshot.json",       snapshot)
-            upload_json("constituencies.json", constituencies)
-            upload_json("parties.json",        parties)
-
-            log.info("Uploaded snapshot.json, constituencies.json, parties.json → R2")
-
         except Exception as exc:
+            # Make sure the next cycle re-publishes even if upstream is unchanged.
+            reset_fetch_state()
             log.error("Scrape/upload cycle failed: %s", exc, exc_info=True)
 
         await asyncio.sleep(SCRAPE_INTERVAL)
@@ -165,9 +165,41 @@ export const RESULTS_MODE: ResultsMode =
 
 // ── WebSocket message ─────────────────────────────────────────────────────────
 
+/** Candidate row as pushed over /ws; `id` addresses it in later patches. */
+export type WsCandidate = { id: number; name: string; party: string; votes: number };
+
+export type WsConstituency = Pick<
+  ConstituencyResult,
+  "province" | "district" | "code" | "name" | "status" | "lastUpdated"
+> & { candidates: WsCandidate[] };
+
+/**
+ * Versioned delta protocol (backend/broadcast.py). Apply a patch only when
+ * `base` equals the version held; on a gap send a ResyncRequest.
+ */
 export type WsMessage =
-  | { type: "snapshot"; data: Snapshot }
-  | { type: "constituencies"; data: ConstituencyResult[] };
+  | { type: "state"; version: number; snapshot: Snapshot; constituencies: WsConstituency[] }
+  | {
+      type: "constituency_patch";
+      version: number;
+      base: number | null;
+      snapshot: Snapshot;
+      /** Changed constituencies, each with only its changed candidates */
+      constituencies: (WsConstituency & { removed?: number[] })[];
+    }
+  | { type: "subscribed"; topics: WsTopic[] };
+
+/**
+ * "constituency:<code>" | "district:<name>" | "province:<name>" | "party:<key>",
+ * where <key> is the party key a WsCandidate carries in `party` (e.g. "party:NC"),
+ * not the upstream partyId.
+ */
+export type WsTopic = `${"constituency" | "district" | "province" | "party"}:${string}`;
+
+/** With no topics a client receives every change. */
+export type SubscriptionRequest = { type: "subscribe" | "unsubscribe"; topics: WsTopic[] };
+
+export type ResyncRequest = { type: "resync"; version: number | null };
 
 // ── Upstream raw record ───────────────────────────────────────────────────────
 